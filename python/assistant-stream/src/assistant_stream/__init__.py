@@ -4,7 +4,19 @@ from assistant_stream.serialization.assistant_stream_response import (
 from assistant_stream.create_run import (
     create_run,
     RunController,
+    RunTimeoutError,
 )
+from assistant_stream.batch import RunResult, RunToolCall, run_many
+from assistant_stream.chunk_queue import RunBufferOverflowError
+from assistant_stream.generator_run import (
+    create_run_from_generator,
+    GeneratorRunController,
+)
+from assistant_stream.loop_lag import LoopLagMonitor, LoopStall
+from assistant_stream.memory_accounting import RunMemoryLimitError, RunMemoryUsage
+from assistant_stream.run_observer import RunObserver
+from assistant_stream.run_options import RunOptions
+from assistant_stream.run_registry import RunInfo, RunRegistry
 
 try:
     from assistant_stream.modules.langgraph import append_langgraph_event, get_tool_call_subgraph_state
@@ -13,8 +25,42 @@ try:
         "AssistantStreamResponse",
         "create_run",
         "RunController",
+        "create_run_from_generator",
+        "GeneratorRunController",
+        "run_many",
+        "RunResult",
+        "RunToolCall",
+        "RunBufferOverflowError",
+        "RunTimeoutError",
+        "RunMemoryLimitError",
+        "RunMemoryUsage",
+        "RunRegistry",
+        "RunInfo",
+        "RunObserver",
+        "RunOptions",
+        "LoopLagMonitor",
+        "LoopStall",
         "append_langgraph_event",
         "get_tool_call_subgraph_state",
     ]
 except ImportError:
-    __all__ = ["AssistantStreamResponse", "create_run", "RunController"]
+    __all__ = [
+        "AssistantStreamResponse",
+        "create_run",
+        "RunController",
+        "create_run_from_generator",
+        "GeneratorRunController",
+        "run_many",
+        "RunResult",
+        "RunToolCall",
+        "RunBufferOverflowError",
+        "RunTimeoutError",
+        "RunMemoryLimitError",
+        "RunMemoryUsage",
+        "RunRegistry",
+        "RunInfo",
+        "RunObserver",
+        "RunOptions",
+        "LoopLagMonitor",
+        "LoopStall",
+    ]
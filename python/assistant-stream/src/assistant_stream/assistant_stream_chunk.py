@@ -8,6 +8,7 @@ class TextDeltaChunk:
     text_delta: str
     type: str = "text-delta"
     parent_id: Optional[str] = None
+    choice_index: int = 0
 
 
 @dataclass
@@ -15,6 +16,7 @@ class ReasoningDeltaChunk:
     reasoning_delta: str
     type: str = "reasoning-delta"
     parent_id: Optional[str] = None
+    choice_index: int = 0
 
 
 @dataclass
@@ -23,6 +25,7 @@ class ToolCallBeginChunk:
     tool_name: str
     type: str = "tool-call-begin"
     parent_id: Optional[str] = None
+    choice_index: int = 0
 
 
 @dataclass
@@ -83,6 +86,7 @@ class SourceChunk:
     title: Optional[str] = None
     type: str = "source"
     parent_id: Optional[str] = None
+    choice_index: int = 0
 
 
 # Define the union type for AssistantStreamChunk
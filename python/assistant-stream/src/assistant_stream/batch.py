@@ -0,0 +1,180 @@
+import asyncio
+import copy
+import time
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Callable,
+    Coroutine,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from assistant_stream.create_run import RunController, RunTimeoutError, create_run
+
+RunCallback = Callable[[RunController], Coroutine[Any, Any, None]]
+
+
+@dataclass
+class RunToolCall:
+    """A tool call made during a run, with its response if one was set."""
+
+    tool_call_id: str
+    tool_name: str
+    args_text: str = ""
+    result: Any = None
+    artifact: Any = None
+    is_error: bool = False
+
+
+@dataclass
+class RunResult:
+    """Accumulated output of one run executed by `run_many`.
+
+    `text` is the text of the first choice; runs streaming several choices
+    through `controller.choice(i)` have all of them in `choices`, by index.
+    `error` holds the message of the exception that failed the run, and
+    `timed_out` is set when the run exceeded its timeout. Both leave the
+    output produced until then in place. Times are in seconds.
+    """
+
+    run_id: str
+    text: str = ""
+    choices: List[str] = field(default_factory=list)
+    reasoning: str = ""
+    state: Any = None
+    tool_calls: List[RunToolCall] = field(default_factory=list)
+    data: List[Any] = field(default_factory=list)
+    error: Optional[str] = None
+    timed_out: bool = False
+    duration: float = 0.0
+    time_to_first_chunk: Optional[float] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the run completed without error or timeout."""
+        return self.error is None and not self.timed_out
+
+
+async def run_many(
+    callbacks: Iterable[Union[RunCallback, Tuple[RunCallback, Dict[str, Any]]]],
+    *,
+    concurrency: int = 16,
+    timeout: Optional[float] = None,
+    **run_options: Any,
+) -> List[RunResult]:
+    """Execute many runs in-process and collect their final output.
+
+    Meant for evals and backfills: chunks are folded straight into a
+    `RunResult` instead of being encoded for the wire. Items are started in
+    order, at most `concurrency` at a time, and pulled from `callbacks`
+    lazily, so a generator of thousands of runs is fine. A failing or
+    timed-out run is recorded in its result and does not affect the others.
+
+    Example:
+        results = await run_many(
+            ((answer, {"state": {"question": q}}) for q in questions),
+            concurrency=32,
+            timeout=60,
+        )
+        texts = [result.text for result in results if result.ok]
+
+    Args:
+        callbacks: Run callbacks, or `(callback, options)` pairs whose
+            options are passed to `create_run` for that run only.
+        concurrency: Maximum number of runs executing at once.
+        timeout: Per-run time limit in seconds, applied like `deadline`.
+        **run_options: Passed to `create_run` for every run. A shared
+            `state` is copied for each run.
+
+    Returns:
+        One `RunResult` per item, in input order.
+    """
+    if concurrency <= 0:
+        raise ValueError("concurrency must be positive")
+    items = enumerate(iter(callbacks))
+    results: Dict[int, RunResult] = {}
+
+    async def worker() -> None:
+        for index, item in items:
+            if isinstance(item, tuple):
+                callback, options = item
+                options = {**run_options, **options}
+            else:
+                callback, options = item, run_options
+            if "state" in options and options["state"] is run_options.get("state"):
+                # Runs update their state in place; don't share one between runs.
+                options = {**options, "state": copy.deepcopy(options["state"])}
+            results[index] = await _collect(callback, timeout, options)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return [results[index] for index in range(len(results))]
+
+
+async def _collect(
+    callback: RunCallback, timeout: Optional[float], run_options: Dict[str, Any]
+) -> RunResult:
+    controllers: List[RunController] = []
+
+    async def run_callback(controller: RunController) -> None:
+        controllers.append(controller)
+        await callback(controller)
+
+    if timeout is not None:
+        run_options = {**run_options, "deadline": timeout}
+    result = RunResult(run_id=run_options.get("run_id") or "")
+    text: Dict[int, List[str]] = {}
+    reasoning: List[str] = []
+    args_text: Dict[str, List[str]] = {}
+    tool_calls: Dict[str, RunToolCall] = {}
+    started = time.perf_counter()
+    try:
+        async for chunk in create_run(run_callback, **run_options):
+            if result.time_to_first_chunk is None:
+                result.time_to_first_chunk = time.perf_counter() - started
+            kind = chunk.type
+            if kind == "text-delta":
+                text.setdefault(chunk.choice_index, []).append(chunk.text_delta)
+            elif kind == "reasoning-delta":
+                reasoning.append(chunk.reasoning_delta)
+            elif kind == "tool-call-begin":
+                tool_calls[chunk.tool_call_id] = RunToolCall(
+                    chunk.tool_call_id, chunk.tool_name
+                )
+                args_text[chunk.tool_call_id] = []
+            elif kind == "tool-call-delta":
+                deltas = args_text.setdefault(chunk.tool_call_id, [])
+                deltas.append(chunk.args_text_delta)
+            elif kind == "tool-result":
+                tool_call = tool_calls.get(chunk.tool_call_id)
+                if tool_call is None:
+                    # Results added with `add_tool_result` have no begin chunk.
+                    tool_call = tool_calls[chunk.tool_call_id] = RunToolCall(
+                        chunk.tool_call_id, ""
+                    )
+                tool_call.result = chunk.result
+                tool_call.artifact = chunk.artifact
+                tool_call.is_error = chunk.is_error
+            elif kind == "data":
+                result.data.append(chunk.data)
+    except RunTimeoutError:
+        result.timed_out = True
+    except Exception as e:
+        result.error = str(e) or type(e).__name__
+    result.duration = time.perf_counter() - started
+    result.choices = [
+        "".join(text.get(index, ())) for index in range(max(text, default=-1) + 1)
+    ]
+    result.text = result.choices[0] if result.choices else ""
+    result.reasoning = "".join(reasoning)
+    for tool_call_id, tool_call in tool_calls.items():
+        tool_call.args_text = "".join(args_text.get(tool_call_id, ()))
+    result.tool_calls = list(tool_calls.values())
+    if controllers:
+        result.run_id = controllers[0].run_id
+        result.state = controllers[0]._state_manager.state_data
+    return result
@@ -0,0 +1,252 @@
+import asyncio
+import logging
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterable,
+    Callable,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Set,
+    TypeVar,
+)
+
+from assistant_stream.assistant_stream_chunk import AssistantStreamChunk
+from assistant_stream.serialization.stream_encoder import StreamEncoder
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class BroadcastOverflowError(Exception):
+    """Raised to a subscriber that fell too far behind the broadcast."""
+
+
+class _Channel(Generic[T]):
+    """Append-only log of items read by any number of independent cursors."""
+
+    def __init__(self) -> None:
+        self.items: List[T] = []
+        self.closed = False
+        self.error: Optional[BaseException] = None
+        self._changed = asyncio.Event()
+
+    def append(self, item: T) -> None:
+        self.items.append(item)
+        self._notify()
+
+    def close(self, error: Optional[BaseException] = None) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self.error = error
+        self._notify()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def read(
+        self, *, replay: bool = True, max_lag: Optional[int] = None
+    ) -> AsyncGenerator[T, None]:
+        """Yield items from the start (or from now), then follow new ones.
+
+        `max_lag` bounds how many items appended after the reader joined may
+        be waiting unread; a slower reader gets `BroadcastOverflowError`.
+        Replayed history does not count towards the bound.
+        """
+        items = self.items
+        joined_at = len(items)
+        cursor = 0 if replay else joined_at
+        while True:
+            while cursor < len(items):
+                if (
+                    max_lag is not None
+                    and len(items) - max(cursor, joined_at) > max_lag
+                ):
+                    raise BroadcastOverflowError(
+                        f"Subscriber fell more than {max_lag} items behind"
+                    )
+                yield items[cursor]
+                cursor += 1
+            if self.closed:
+                if self.error is not None:
+                    raise self.error
+                return
+            await self._changed.wait()
+
+
+class RunBroadcast:
+    """Fans a single run's chunk stream out to many subscribers.
+
+    The source stream (typically `create_run(...)`) is read once. Each
+    subscriber gets a replay of everything emitted so far followed by the
+    live tail, and is disconnected with `BroadcastOverflowError` when more
+    than `max_subscriber_lag` live chunks pile up unread for it, so one
+    stalled client cannot hold the others back.
+
+    `subscribe_encoded` shares encoding as well: each chunk is encoded once
+    per encoder type and the encoded strings are handed to every subscriber
+    using that type. Encoders of one type are treated as interchangeable;
+    the first subscriber's instance does the encoding.
+
+    Example:
+        broadcast = RunBroadcast(create_run(callback))
+
+        # In each request that should follow the run:
+        encoder = DataStreamEncoder()
+        return StreamingResponse(
+            broadcast.subscribe_encoded(encoder),
+            media_type=encoder.get_media_type(),
+        )
+
+    Args:
+        stream: The chunk stream to share.
+        max_subscriber_lag: Live chunks (or encoded strings) a subscriber may
+            have unread before it is dropped. Unbounded when None.
+        close_when_idle: Close the source, cancelling the run, when the last
+            subscriber leaves before it has finished.
+    """
+
+    def __init__(
+        self,
+        stream: AsyncIterable[AssistantStreamChunk],
+        *,
+        max_subscriber_lag: Optional[int] = 1024,
+        close_when_idle: bool = True,
+    ):
+        self._stream = stream
+        self._max_subscriber_lag = max_subscriber_lag
+        self._close_when_idle = close_when_idle
+        self._chunks: _Channel[AssistantStreamChunk] = _Channel()
+        self._encoded: Dict[type, _Channel[Any]] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._source_task: Optional[asyncio.Task] = None
+        self._subscriber_count = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        """Number of subscribers currently reading."""
+        return self._subscriber_count
+
+    @property
+    def done(self) -> bool:
+        """Whether the source stream has ended."""
+        return self._chunks.closed
+
+    @property
+    def chunks(self) -> List[AssistantStreamChunk]:
+        """Chunks emitted so far."""
+        return list(self._chunks.items)
+
+    def start(self) -> None:
+        """Start reading the source. Called automatically on first subscribe."""
+        if self._source_task is None:
+            self._source_task = self._spawn(self._pump_source())
+
+    def add_done_callback(self, callback: Callable[["RunBroadcast"], None]) -> None:
+        """Call `callback(self)` once the source has ended, failed or been closed.
+
+        Starts reading the source if it has not started yet.
+        """
+        self.start()
+        self._source_task.add_done_callback(lambda _: callback(self))
+
+    async def subscribe(
+        self, *, replay: bool = True
+    ) -> AsyncGenerator[AssistantStreamChunk, None]:
+        """Stream chunks, replaying history first unless `replay` is False."""
+        self._on_subscribe()
+        try:
+            async for chunk in self._chunks.read(
+                replay=replay, max_lag=self._max_subscriber_lag
+            ):
+                yield chunk
+        finally:
+            self._on_unsubscribe()
+
+    async def subscribe_encoded(
+        self, encoder: StreamEncoder, *, replay: bool = True
+    ) -> AsyncGenerator[Any, None]:
+        """Stream the output of `encoder`, encoded once per encoder type."""
+        self._on_subscribe()
+        try:
+            channel = self._encoded.get(type(encoder))
+            if channel is None:
+                channel = _Channel()
+                self._encoded[type(encoder)] = channel
+                self._spawn(self._pump_encoded(encoder, channel))
+            async for item in channel.read(
+                replay=replay, max_lag=self._max_subscriber_lag
+            ):
+                yield item
+        finally:
+            self._on_unsubscribe()
+
+    async def aclose(self) -> None:
+        """Stop reading the source and end every subscription."""
+        tasks = [task for task in self._tasks if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._chunks.close()
+        for channel in self._encoded.values():
+            channel.close()
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _pump_source(self) -> None:
+        try:
+            async for chunk in self._stream:
+                self._chunks.append(chunk)
+        except asyncio.CancelledError:
+            self._chunks.close()
+            await _aclose(self._stream)
+            raise
+        except Exception as e:
+            self._chunks.close(e)
+        else:
+            self._chunks.close()
+
+    async def _pump_encoded(self, encoder: StreamEncoder, channel: _Channel) -> None:
+        try:
+            async for item in encoder.encode_stream(self._chunks.read()):
+                channel.append(item)
+        except asyncio.CancelledError:
+            channel.close()
+            raise
+        except Exception as e:
+            channel.close(e)
+        else:
+            channel.close()
+
+    def _on_subscribe(self) -> None:
+        self._subscriber_count += 1
+        self.start()
+
+    def _on_unsubscribe(self) -> None:
+        self._subscriber_count -= 1
+        if (
+            self._subscriber_count == 0
+            and self._close_when_idle
+            and not self._chunks.closed
+        ):
+            self._spawn(self.aclose())
+
+
+async def _aclose(stream: AsyncIterable[Any]) -> None:
+    aclose = getattr(stream, "aclose", None)
+    if aclose is None:
+        return
+    try:
+        await aclose()
+    except Exception:
+        logger.warning("Suppressed error while closing broadcast source", exc_info=True)
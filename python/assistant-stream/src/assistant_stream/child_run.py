@@ -0,0 +1,97 @@
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any, Callable, Coroutine, Optional
+
+# Avoid circular import
+if TYPE_CHECKING:
+    from assistant_stream.create_run import RunController
+
+logger = logging.getLogger(__name__)
+
+
+class ChildRun:
+    """Handle of a child run started with `RunController.spawn_child`.
+
+    Await the handle for the child callback's return value; it raises what
+    the child raised, or `asyncio.CancelledError` if it was cancelled. A
+    failed child never fails the parent run on its own.
+    """
+
+    def __init__(self, controller: "RunController"):
+        self._controller = controller
+        self._task: Optional[asyncio.Task] = None
+        self._error: Optional[BaseException] = None
+
+    @property
+    def controller(self) -> "RunController":
+        """The child's own controller."""
+        return self._controller
+
+    @property
+    def parent_id(self) -> Optional[str]:
+        """Parent id attached to the child's chunks."""
+        return self._controller._parent_id
+
+    def done(self) -> bool:
+        """Whether the child has finished, failed or been cancelled."""
+        return self._task is not None and self._task.done()
+
+    def cancel(self, reason: str = "cancel") -> None:
+        """Cancel the child, its substreams and its own children.
+
+        The child's cancel signal is set right away; its callback is
+        cancelled if it is still running after the run's grace period.
+        """
+        controller = self._controller
+        controller._mark_cancelled(reason)
+        task = self._task
+        if task is not None and not task.done():
+            # `cancel()` is a no-op once the callback has exited by itself.
+            task.get_loop().call_later(controller._cancel_grace_period, task.cancel)
+
+    def __await__(self):
+        return self._wait().__await__()
+
+    async def _wait(self) -> Any:
+        try:
+            return await asyncio.shield(self._task)
+        except asyncio.CancelledError:
+            if self._task.cancelled() and self._error is not None:
+                raise self._error
+            raise
+
+    async def _run(
+        self, callback: Callable[["RunController"], Coroutine[Any, Any, Any]]
+    ) -> Any:
+        controller = self._controller
+        try:
+            return await callback(controller)
+        finally:
+            if controller._children:
+                await asyncio.gather(
+                    *(child._task for child in controller._children),
+                    return_exceptions=True,
+                )
+            for dispose in controller._dispose_callbacks:
+                dispose()
+            await controller._substreams.wait()
+
+    def _start(self, coro: Coroutine[Any, Any, Any], parent: "RunController") -> None:
+        self._task = asyncio.create_task(coro)
+        parent._children.add(self)
+
+        def on_done(task: asyncio.Task) -> None:
+            parent._children.discard(self)
+            if not task.cancelled() and task.exception() is not None:
+                logger.debug("Child run failed", exc_info=task.exception())
+
+        self._task.add_done_callback(on_done)
+
+    def _fail(self, error: BaseException) -> None:
+        """Fail the child because one of its substreams raised."""
+        if self._error is None:
+            self._error = error
+        self._controller._mark_cancelled("error")
+        if self._task is not None:
+            self._task.cancel()
+
@@ -0,0 +1,197 @@
+import asyncio
+import json
+import os
+import struct
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Dict, Iterator, List, Optional, Union
+
+from assistant_stream.assistant_stream_chunk import (
+    AssistantStreamChunk,
+    DataChunk,
+    ErrorChunk,
+    ReasoningDeltaChunk,
+    SourceChunk,
+    TextDeltaChunk,
+    ToolCallBeginChunk,
+    ToolCallDeltaChunk,
+    ToolResultChunk,
+    UpdateStateChunk,
+)
+from assistant_stream.serialization.assistant_transport import StateProxyJSONEncoder
+
+# File layout: the magic line, then one record per chunk. A record is a
+# big-endian uint32 payload length, a float64 timestamp in seconds since the
+# log was opened (monotonic clock) and the chunk as UTF-8 JSON.
+_MAGIC = b"ASSISTANT-STREAM-CHUNK-LOG 1\n"
+_RECORD_HEADER = struct.Struct(">Id")
+
+_CHUNK_TYPES: Dict[str, type] = {
+    "text-delta": TextDeltaChunk,
+    "reasoning-delta": ReasoningDeltaChunk,
+    "tool-call-begin": ToolCallBeginChunk,
+    "tool-call-delta": ToolCallDeltaChunk,
+    "tool-result": ToolResultChunk,
+    "data": DataChunk,
+    "error": ErrorChunk,
+    "update-state": UpdateStateChunk,
+    "source": SourceChunk,
+}
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+
+def chunk_to_dict(chunk: AssistantStreamChunk) -> Dict[str, Any]:
+    """Convert a chunk to a dict that `chunk_from_dict` turns back into it."""
+    data = dict(vars(chunk))
+    if data.get("choice_index") == 0:
+        # The default; keeps single-choice records as compact as before.
+        del data["choice_index"]
+    return data
+
+
+def chunk_from_dict(data: Dict[str, Any]) -> AssistantStreamChunk:
+    """Rebuild a chunk from the output of `chunk_to_dict`."""
+    chunk_type = _CHUNK_TYPES.get(data.get("type"))
+    if chunk_type is None:
+        raise ValueError(f"Unknown chunk type: {data.get('type')!r}")
+    return chunk_type(**data)
+
+
+@dataclass(frozen=True)
+class ChunkLogRecord:
+    """A chunk read from a chunk log, with the time it was written."""
+
+    timestamp: float
+    chunk: AssistantStreamChunk
+
+
+class ChunkLogWriter:
+    """Appends chunks to a length-prefixed chunk log file.
+
+    Each record is flushed to the operating system as it is written, so a
+    crash of the process loses at most the record being written. Surviving
+    a crash of the host needs an fsync: with `fsync_interval`, a write syncs
+    the file once that many seconds have passed since the last sync, and
+    `fsync=True` syncs on close. Appending to an existing log
+    keeps its records; timestamps of the new records restart at zero.
+
+    Args:
+        path: Log file path.
+        fsync: Whether to sync the file to disk on close.
+        fsync_interval: Minimum seconds between syncs on write; 0 syncs
+            every record. Writes never sync when None.
+    """
+
+    def __init__(
+        self,
+        path: PathLike,
+        *,
+        fsync: bool = False,
+        fsync_interval: Optional[float] = None,
+    ):
+        if fsync_interval is not None and fsync_interval < 0:
+            raise ValueError("fsync_interval must not be negative")
+        self._file = open(path, "ab")
+        self._fsync = fsync
+        self._fsync_interval = fsync_interval
+        self._started_at = self._synced_at = time.monotonic()
+        if self._file.tell() == 0:
+            self._file.write(_MAGIC)
+            self._file.flush()
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def write(self, chunk: AssistantStreamChunk) -> None:
+        """Append `chunk`, timestamped with the time since the log was opened."""
+        payload = json.dumps(
+            chunk_to_dict(chunk), cls=StateProxyJSONEncoder
+        ).encode("utf-8")
+        now = time.monotonic()
+        self._file.write(
+            _RECORD_HEADER.pack(len(payload), now - self._started_at) + payload
+        )
+        self._file.flush()
+        if (
+            self._fsync_interval is not None
+            and now - self._synced_at >= self._fsync_interval
+        ):
+            os.fsync(self._file.fileno())
+            self._synced_at = now
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self._file.flush()
+        if self._fsync:
+            os.fsync(self._file.fileno())
+        self._file.close()
+
+    def __enter__(self) -> "ChunkLogWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def iter_chunk_log(path: PathLike) -> Iterator[ChunkLogRecord]:
+    """Read the records of a chunk log in order.
+
+    A truncated final record, left by a process that died mid-write, is
+    ignored.
+    """
+    with open(path, "rb") as file:
+        if file.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError(f"{path} is not a chunk log")
+        while True:
+            header = file.read(_RECORD_HEADER.size)
+            if len(header) < _RECORD_HEADER.size:
+                return
+            length, timestamp = _RECORD_HEADER.unpack(header)
+            payload = file.read(length)
+            if len(payload) < length:
+                return
+            yield ChunkLogRecord(
+                timestamp=timestamp, chunk=chunk_from_dict(json.loads(payload))
+            )
+
+
+async def replay_chunk_log(
+    path: PathLike,
+    *,
+    realtime: bool = True,
+    speed: float = 1.0,
+) -> AsyncGenerator[AssistantStreamChunk, None]:
+    """Stream the chunks of a chunk log, e.g. to load-test encoders and proxies.
+
+    The log is read up front so disk reads do not distort the timing.
+
+    Args:
+        path: Chunk log written by `ChunkLogWriter` or `create_run(chunk_log=...)`.
+        realtime: Reproduce the recorded gaps between chunks. When False,
+            chunks are yielded as fast as the reader consumes them.
+        speed: Playback speed factor for realtime replay; 2.0 halves every gap.
+    """
+    if speed <= 0:
+        raise ValueError("speed must be positive")
+    records: List[ChunkLogRecord] = list(iter_chunk_log(path))
+    if not realtime:
+        for record in records:
+            yield record.chunk
+        return
+
+    loop = asyncio.get_running_loop()
+    started_at = loop.time()
+    previous: Optional[float] = None
+    offset = 0.0
+    for record in records:
+        if previous is not None and record.timestamp < previous:
+            # Records appended by a later writer restart their clock.
+            offset += previous - record.timestamp
+        previous = record.timestamp
+        delay = started_at + (record.timestamp + offset) / speed - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        yield record.chunk
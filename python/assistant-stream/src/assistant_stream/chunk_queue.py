@@ -0,0 +1,351 @@
+import asyncio
+from collections import deque
+from dataclasses import replace
+from typing import Any, Deque, List, Literal, Optional
+
+from assistant_stream.assistant_stream_chunk import AssistantStreamChunk
+
+OverflowPolicy = Literal["suspend", "coalesce", "error"]
+
+_OVERFLOW_POLICIES = ("suspend", "coalesce", "error")
+
+# Rough per-chunk overhead (dataclass instance plus envelope on the wire).
+_CHUNK_OVERHEAD = 64
+
+_DELTA_CHUNK_TYPES = ("text-delta", "reasoning-delta", "tool-call-delta")
+
+
+class RunBufferOverflowError(Exception):
+    """Raised when a run exceeds its chunk buffer limits under the "error" policy."""
+
+
+def approximate_size(value: Any) -> int:
+    """Cheaply estimate the encoded size of a JSON-like value in bytes."""
+    if value is None or isinstance(value, bool):
+        return 4
+    if isinstance(value, str):
+        return len(value) + 2
+    if isinstance(value, (int, float)):
+        return 8
+    if isinstance(value, dict):
+        return 2 + sum(
+            approximate_size(k) + approximate_size(v) + 2 for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        return 2 + sum(approximate_size(item) + 1 for item in value)
+    return _CHUNK_OVERHEAD
+
+
+def approximate_chunk_size(chunk: AssistantStreamChunk) -> int:
+    """Estimate the buffered size of a chunk in bytes."""
+    chunk_type = chunk.type
+    if chunk_type == "text-delta":
+        return _CHUNK_OVERHEAD + len(chunk.text_delta)
+    if chunk_type == "reasoning-delta":
+        return _CHUNK_OVERHEAD + len(chunk.reasoning_delta)
+    if chunk_type == "tool-call-delta":
+        return _CHUNK_OVERHEAD + len(chunk.args_text_delta)
+    if chunk_type == "update-state":
+        return _CHUNK_OVERHEAD + approximate_size(chunk.operations)
+    if chunk_type == "tool-result":
+        return (
+            _CHUNK_OVERHEAD
+            + approximate_size(chunk.result)
+            + approximate_size(chunk.artifact)
+        )
+    if chunk_type == "data":
+        return _CHUNK_OVERHEAD + approximate_size(chunk.data)
+    if chunk_type == "error":
+        return _CHUNK_OVERHEAD + len(chunk.error)
+    return _CHUNK_OVERHEAD
+
+
+def merge_delta_chunks(
+    previous: AssistantStreamChunk, chunk: AssistantStreamChunk
+) -> Optional[AssistantStreamChunk]:
+    """Merge two adjacent delta chunks of the same stream, or return None."""
+    chunk_type = chunk.type
+    if previous.type != chunk_type:
+        return None
+    if chunk_type == "text-delta":
+        if (
+            previous.parent_id != chunk.parent_id
+            or previous.choice_index != chunk.choice_index
+        ):
+            return None
+        return replace(previous, text_delta=previous.text_delta + chunk.text_delta)
+    if chunk_type == "reasoning-delta":
+        if (
+            previous.parent_id != chunk.parent_id
+            or previous.choice_index != chunk.choice_index
+        ):
+            return None
+        return replace(
+            previous,
+            reasoning_delta=previous.reasoning_delta + chunk.reasoning_delta,
+        )
+    if chunk_type == "tool-call-delta":
+        if previous.tool_call_id != chunk.tool_call_id:
+            return None
+        return replace(
+            previous,
+            args_text_delta=previous.args_text_delta + chunk.args_text_delta,
+        )
+    return None
+
+
+class ChunkQueue:
+    """Single-consumer FIFO of stream chunks with optional size limits.
+
+    `put_nowait` never blocks. When the buffer is over its limits the overflow
+    policy decides what happens:
+
+    - "suspend": the chunk is queued; producers that honour backpressure
+      `await wait_for_capacity()` until the consumer catches up.
+    - "coalesce": adjacent text, reasoning and tool-args deltas of the same
+      stream are merged into the tail chunk instead of growing the queue.
+    - "error": the chunk is dropped and the consumer's next `get()` raises
+      `RunBufferOverflowError`.
+
+    With `coalesce_window` or `coalesce_max_bytes` set, adjacent deltas of the
+    same stream are merged into the tail chunk while it is younger than the
+    window and smaller than the byte limit. When the only buffered chunk is a
+    delta, `get()` holds it back until the window elapses, the byte limit is
+    reached or another chunk arrives. Merging only ever touches the tail, so
+    chunks are never reordered.
+
+    A `None` item is the end-of-stream sentinel and is never size-limited.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_chunks: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        overflow_policy: OverflowPolicy = "suspend",
+        coalesce_window: Optional[float] = None,
+        coalesce_max_bytes: Optional[int] = None,
+    ):
+        if overflow_policy not in _OVERFLOW_POLICIES:
+            raise ValueError(f"Invalid overflow policy: {overflow_policy}")
+        if max_chunks is not None and max_chunks <= 0:
+            raise ValueError("max_chunks must be positive")
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        if coalesce_window is not None and coalesce_window < 0:
+            raise ValueError("coalesce_window must not be negative")
+        if coalesce_max_bytes is not None and coalesce_max_bytes <= 0:
+            raise ValueError("coalesce_max_bytes must be positive")
+
+        self._max_chunks = max_chunks
+        self._max_bytes = max_bytes
+        self._overflow_policy = overflow_policy
+        self._items: Deque[Any] = deque()
+        self._sizes: Deque[int] = deque()
+        self._bytes = 0
+        self._getter: Optional[asyncio.Future] = None
+        self._capacity_waiters: List[asyncio.Future] = []
+        self._error: Optional[Exception] = None
+        self._discard_buffered = False
+        self._coalesce = coalesce_window is not None or coalesce_max_bytes is not None
+        self._coalesce_window = coalesce_window
+        self._coalesce_max_bytes = coalesce_max_bytes
+        self._timestamps: Deque[float] = deque()
+
+    @property
+    def depth(self) -> int:
+        """Number of chunks currently buffered."""
+        return len(self._items)
+
+    @property
+    def buffered_bytes(self) -> int:
+        """Approximate size of the buffered chunks in bytes."""
+        return self._bytes
+
+    def is_over_limit(self) -> bool:
+        """Whether the buffer is at or above one of its limits."""
+        return (self._max_chunks is not None and len(self._items) >= self._max_chunks) or (
+            self._max_bytes is not None and self._bytes >= self._max_bytes
+        )
+
+    def put_nowait(self, chunk: Optional[AssistantStreamChunk]) -> None:
+        """Enqueue a chunk, applying the overflow policy if over the limits."""
+        if chunk is None:
+            self._append(None, 0)
+            return
+        if self._error is not None:
+            return
+
+        size = approximate_chunk_size(chunk)
+        if self._coalesce and self._try_coalesce(chunk, size):
+            return
+        if self.is_over_limit():
+            if self._overflow_policy == "error":
+                self.fail(
+                    RunBufferOverflowError(
+                        f"Run buffer overflow: {len(self._items)} chunks, "
+                        f"{self._bytes} bytes buffered"
+                    ),
+                    discard_buffered=True,
+                )
+                return
+            if self._overflow_policy == "coalesce" and self._items:
+                merged = merge_delta_chunks(self._items[-1], chunk)
+                if merged is not None:
+                    self._replace_tail(merged, size)
+                    return
+
+        self._append(chunk, size)
+
+    def put_marker(self, marker: Any) -> None:
+        """Enqueue a control item for the consumer, bypassing limits and merging.
+
+        Markers need a `type` attribute that is not a delta chunk type.
+        """
+        self._append(marker, 0)
+
+    def _try_coalesce(self, chunk: AssistantStreamChunk, size: int) -> bool:
+        """Merge `chunk` into the tail if it is within the coalescing window."""
+        if not self._items or chunk.type not in _DELTA_CHUNK_TYPES:
+            return False
+        tail = self._items[-1]
+        if tail is None:
+            return False
+        if (
+            self._coalesce_max_bytes is not None
+            and self._sizes[-1] + size - _CHUNK_OVERHEAD > self._coalesce_max_bytes
+        ):
+            return False
+        if (
+            self._coalesce_window is not None
+            and self._now() - self._timestamps[-1] >= self._coalesce_window
+        ):
+            return False
+        merged = merge_delta_chunks(tail, chunk)
+        if merged is None:
+            return False
+        self._replace_tail(merged, size)
+        return True
+
+    def _replace_tail(self, merged: AssistantStreamChunk, size: int) -> None:
+        self._items[-1] = merged
+        self._sizes[-1] += size - _CHUNK_OVERHEAD
+        self._bytes += size - _CHUNK_OVERHEAD
+        if self._coalesce:
+            # Let a getter holding the tail back re-check the byte limit.
+            self._wake_getter()
+
+    def _append(self, chunk: Optional[AssistantStreamChunk], size: int) -> None:
+        self._items.append(chunk)
+        self._sizes.append(size)
+        self._bytes += size
+        if self._coalesce:
+            self._timestamps.append(self._now())
+        self._wake_getter()
+
+    def _now(self) -> float:
+        return asyncio.get_running_loop().time()
+
+    def _should_hold_head(self) -> Optional[float]:
+        """Return how long to hold back a lone delta head, or None to release it."""
+        if (
+            self._coalesce_window is None
+            or len(self._items) != 1
+            or self._error is not None
+        ):
+            return None
+        head = self._items[0]
+        if head is None or head.type not in _DELTA_CHUNK_TYPES:
+            return None
+        if (
+            self._coalesce_max_bytes is not None
+            and self._sizes[0] >= self._coalesce_max_bytes
+        ):
+            return None
+        remaining = self._timestamps[0] + self._coalesce_window - self._now()
+        return remaining if remaining > 0 else None
+
+    def fail(self, error: Exception, *, discard_buffered: bool = False) -> None:
+        """Fail the run: `get()` raises `error` once the buffer is drained.
+
+        Chunks buffered so far are still delivered first, unless
+        `discard_buffered` is set, in which case the next `get()` raises.
+        Chunks put afterwards are dropped. Only the first failure is kept.
+        """
+        if self._error is None:
+            self._error = error
+            self._discard_buffered = discard_buffered
+            self._wake_getter()
+            self._wake_capacity_waiters()
+
+    def _wake_getter(self) -> None:
+        getter = self._getter
+        if getter is not None and not getter.done():
+            getter.set_result(None)
+
+    async def get(self) -> Optional[AssistantStreamChunk]:
+        """Remove and return the next chunk, waiting until one is available."""
+        while not self._items:
+            if self._error is not None:
+                raise self._error
+            self._getter = asyncio.get_running_loop().create_future()
+            try:
+                await self._getter
+            finally:
+                self._getter = None
+
+        if self._coalesce_window is not None:
+            await self._hold_head()
+
+        if self._error is not None and (
+            self._discard_buffered or self._items[0] is None
+        ):
+            raise self._error
+
+        chunk = self._items.popleft()
+        self._bytes -= self._sizes.popleft()
+        if self._coalesce:
+            self._timestamps.popleft()
+        if self._capacity_waiters and not self.is_over_limit():
+            self._wake_capacity_waiters()
+        return chunk
+
+    async def _hold_head(self) -> None:
+        """Give a lone delta chunk the rest of its window to absorb more deltas."""
+        loop = asyncio.get_running_loop()
+        while (remaining := self._should_hold_head()) is not None:
+            self._getter = loop.create_future()
+            timer = loop.call_later(remaining, self._wake_getter)
+            try:
+                await self._getter
+            finally:
+                timer.cancel()
+                self._getter = None
+
+    async def wait_for_capacity(self) -> None:
+        """Wait until the buffer is below its limits."""
+        while self.is_over_limit() and self._error is None:
+            waiter = asyncio.get_running_loop().create_future()
+            self._capacity_waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._capacity_waiters:
+                    self._capacity_waiters.remove(waiter)
+
+    def release_waiters(self) -> None:
+        """Wake every producer blocked in `wait_for_capacity`.
+
+        Called when the consumer goes away so suspended producers can observe
+        cancellation instead of waiting forever.
+        """
+        self._max_chunks = None
+        self._max_bytes = None
+        self._wake_capacity_waiters()
+
+    def _wake_capacity_waiters(self) -> None:
+        waiters = self._capacity_waiters
+        self._capacity_waiters = []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
@@ -1,6 +1,26 @@
 import asyncio
+import copy
+import dataclasses
 import logging
-from typing import Any, AsyncGenerator, Callable, Coroutine, List, Optional, Sequence, Union
+import threading
+import time
+import uuid
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
 from assistant_stream.assistant_stream_chunk import (
     AssistantStreamChunk,
     TextDeltaChunk,
@@ -10,16 +30,84 @@ from assistant_stream.assistant_stream_chunk import (
     ErrorChunk,
     SourceChunk,
     ToolCallBeginChunk,
+    UpdateStateChunk,
+)
+from assistant_stream.child_run import ChildRun
+from assistant_stream.chunk_log import ChunkLogWriter
+from assistant_stream.chunk_queue import (
+    ChunkQueue,
+    approximate_chunk_size,
+)
+from assistant_stream.loop_accounting import AccountedCoroutine, LoopTimeAccount
+from assistant_stream.loop_lag import LoopLagMonitor
+from assistant_stream.memory_accounting import (
+    MemoryTrace,
+    RunMemoryLimitError,
+    RunMemoryUsage,
 )
 from assistant_stream.modules.tool_call import (
     create_tool_call,
     ToolCallController,
     generate_openai_style_tool_call_id,
 )
+from assistant_stream.run_observer import RunObserver
+from assistant_stream.run_options import _CANCEL_GRACE_PERIOD, RunOptions
+from assistant_stream.run_registry import RunRegistry
 from assistant_stream.state_manager import StateManager
+from assistant_stream.state_proxy import StateProxy
+from assistant_stream.substreams import SubstreamSupervisor
+
+# Avoid circular import
+if TYPE_CHECKING:
+    from assistant_stream.detached.store import RunStore
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+
+class RunTimeoutError(TimeoutError):
+    """Raised when a run exceeds its `deadline` or `idle_timeout`."""
+
+
+class _RunSuspended:
+    """Queue marker ending the current stream of a suspended run."""
+
+    type = "run-suspended"
+
+
+_SUSPENDED = _RunSuspended()
+
+
+class _RunOutput:
+    """Consumer-side resources of a run, kept across suspend and resume."""
+
+    def __init__(
+        self,
+        log_writer: Optional[ChunkLogWriter],
+        owns_log: bool,
+        lag_monitor: Optional[LoopLagMonitor],
+        time_slice: Optional[float],
+    ):
+        self.log_writer = log_writer
+        self.owns_log = owns_log
+        self.lag_monitor = lag_monitor
+        self.time_slice = time_slice
+        self.first_chunk = True
+        self.attached = False
+        self.closed = False
+
+    def close(self, controller: "RunController") -> None:
+        if self.closed:
+            return
+        self.closed = True
+        if self.lag_monitor is not None:
+            self.lag_monitor._untrack(controller)
+        if controller._memory_trace is not None:
+            controller._memory_trace.close()
+        if self.owns_log:
+            self.log_writer.close()
+
 
 class ReadOnlyCancellationSignal:
     """Read-only view over an asyncio.Event used for cancellation."""
@@ -35,42 +123,119 @@ class ReadOnlyCancellationSignal:
 
 
 class RunController:
-    def __init__(self, queue, state_data, parent_id: Optional[str] = None):
+    def __init__(
+        self,
+        queue,
+        state_data,
+        parent_id: Optional[str] = None,
+        *,
+        run_id: Optional[str] = None,
+        thread_id: Optional[str] = None,
+        observer: Optional[RunObserver] = None,
+        max_concurrent_substreams: Optional[int] = None,
+        cancel_grace_period: float = _CANCEL_GRACE_PERIOD,
+        max_memory_bytes: Optional[int] = None,
+    ):
         self._queue = queue
+        self._observer = observer
+        self._track_activity = False
+        self._last_activity = 0.0
+        self._enqueue = queue.put_nowait
         self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
         self._dispose_callbacks = []
-        self._stream_tasks = []
-        self._state_manager = StateManager(self._put_chunk_nowait, state_data)
+        self._substreams = SubstreamSupervisor(
+            max_concurrency=max_concurrent_substreams,
+            on_error=self._on_substream_error,
+        )
+        self._state_manager = StateManager(self._put_state_chunk, state_data)
         self._parent_id = parent_id
+        self._choice_index = 0
         self._cancelled_event = asyncio.Event()
         self._cancelled_signal = ReadOnlyCancellationSignal(self._cancelled_event)
+        self._cancel_grace_period = cancel_grace_period
+        self._cancellables: Set[asyncio.Future] = set()
+        self._run_id = run_id if run_id is not None else uuid.uuid4().hex
+        self._thread_id = thread_id
+        self._task: Optional[asyncio.Task] = None
+        self._loop_account: Optional[LoopTimeAccount] = None
+        self._registry: Optional[RunRegistry] = None
+        self._tool_calls: List[ToolCallController] = []
+        # Shared by every handle of the run, so a suspend made through a
+        # derived handle is visible to the registry and the idle timer.
+        self._suspension: List[Tuple[str, asyncio.Future]] = []
+        self._tool_results: Dict[str, asyncio.Future] = {}
+        self._children: Set[ChildRun] = set()
+        self._state_path: Tuple[str, ...] = ()
+        self._max_memory_bytes = max_memory_bytes
+        self._memory_trace: Optional[MemoryTrace] = None
+        self._output: Optional[_RunOutput] = None
+        if max_memory_bytes is not None:
+            self._state_manager.track_size()
+        self._bind_enqueue()
+
+    @property
+    def run_id(self) -> str:
+        """Identifier of this run, unique within a `RunRegistry`."""
+        return self._run_id
+
+    @property
+    def thread_id(self) -> Optional[str]:
+        """Thread this run belongs to, if one was given to `create_run`."""
+        return self._thread_id
 
     def with_parent_id(self, parent_id: str) -> 'RunController':
         """Create a new RunController instance with the specified parent_id."""
-        controller = RunController(self._queue, self._state_manager._state_data, parent_id)
-        controller._loop = self._loop
-        controller._dispose_callbacks = self._dispose_callbacks
-        controller._stream_tasks = self._stream_tasks
-        controller._state_manager = self._state_manager
-        controller._cancelled_event = self._cancelled_event
-        controller._cancelled_signal = self._cancelled_signal
+        controller = copy.copy(self)
+        controller._parent_id = parent_id
+        return controller
+
+    def choice(self, index: int) -> 'RunController':
+        """Return a handle emitting the `index`-th of several candidate answers.
+
+        Text, reasoning, tool calls and sources emitted through the handle
+        carry `choice_index=index`, so a single run can stream several
+        choices (like OpenAI's `n`) concurrently. `OpenAIStreamEncoder` sends
+        each choice under its own index; the data stream and assistant
+        transport formats only carry choice 0. State is shared between the
+        choices.
+
+        Example:
+            async def candidate(i):
+                async for token in generate(prompt, seed=i):
+                    controller.choice(i).append_text(token)
+
+            await asyncio.gather(*(candidate(i) for i in range(3)))
+        """
+        if index < 0:
+            raise ValueError("choice index must not be negative")
+        controller = copy.copy(self)
+        controller._choice_index = index
         return controller
 
     def append_text(self, text_delta: str) -> None:
         """Append a text delta to the stream."""
-        chunk = TextDeltaChunk(text_delta=text_delta, parent_id=self._parent_id)
+        chunk = TextDeltaChunk(
+            text_delta=text_delta,
+            parent_id=self._parent_id,
+            choice_index=self._choice_index,
+        )
         self._flush_and_put_chunk(chunk)
 
     def append_reasoning(self, reasoning_delta: str) -> None:
         """Append a reasoning delta to the stream."""
-        chunk = ReasoningDeltaChunk(reasoning_delta=reasoning_delta, parent_id=self._parent_id)
+        chunk = ReasoningDeltaChunk(
+            reasoning_delta=reasoning_delta,
+            parent_id=self._parent_id,
+            choice_index=self._choice_index,
+        )
         self._flush_and_put_chunk(chunk)
 
     def append_state_text(
         self, path: Sequence[Union[str, int]], text_delta: str
     ) -> None:
         """Append a text delta at a state path using an append-text operation."""
-        self._state_manager.append_text(path, text_delta)
+        self._state_manager.append_text([*self._state_path, *path], text_delta)
 
     async def add_tool_call(
         self, tool_name: str, tool_call_id: str = None
@@ -79,12 +244,74 @@ class RunController:
         if tool_call_id is None:
             tool_call_id = generate_openai_style_tool_call_id()
 
-        stream, controller = await create_tool_call(tool_name, tool_call_id, self._parent_id)
+        stream, controller = await create_tool_call(
+            tool_name, tool_call_id, self._parent_id, self._choice_index
+        )
         self._dispose_callbacks.append(controller.close)
+        tool_calls = self._tool_calls
+        tool_calls.append(controller)
+        # Only open tool calls can hold buffered chunks.
+        controller._on_closed = lambda: tool_calls.remove(controller)
+        if self._observer is not None:
+            self._observer.on_tool_call_begin(self, tool_call_id, tool_name)
+            controller._on_response = self._notify_tool_result
 
         self.add_stream(stream)
         return controller
 
+    def spawn_child(
+        self,
+        callback: Callable[["RunController"], Coroutine[Any, Any, Any]],
+        *,
+        parent_id: Optional[str] = None,
+        state_path: Optional[Sequence[Union[str, int]]] = None,
+    ) -> ChildRun:
+        """Run `callback` concurrently as a child of this run, e.g. a subagent.
+
+        The child gets its own controller and emits into this run's stream;
+        chunks of one child keep their order, chunks of different children
+        interleave. The child has its own cancel signal and its own
+        substreams, and a child that raises does not fail this run: the
+        error is raised from awaiting the returned handle instead. Cancelling
+        this run cancels its children, and the run only ends once every child
+        has finished.
+
+        Args:
+            callback: Coroutine function receiving the child's controller.
+            parent_id: Parent id for the child's chunks. Defaults to this
+                controller's.
+            state_path: Path of the child's state namespace; the child's
+                `controller.state` is the state at this path, which must
+                exist. Defaults to sharing this controller's state.
+        """
+        child = copy.copy(self)
+        if parent_id is not None:
+            child._parent_id = parent_id
+        if state_path is not None:
+            child._state_path = (*self._state_path, *(str(key) for key in state_path))
+        child._cancelled_event = asyncio.Event()
+        child._cancelled_signal = ReadOnlyCancellationSignal(child._cancelled_event)
+        child._cancellables = set()
+        child._children = set()
+        child._dispose_callbacks = []
+        # The tool call list stays shared, so the run's memory usage and limit
+        # cover the buffers of its children's tool calls.
+        child._task = None
+
+        handle = ChildRun(child)
+        child._substreams = SubstreamSupervisor(
+            max_concurrency=self._substreams._max_concurrency,
+            on_error=handle._fail,
+        )
+        coro = handle._run(callback)
+        if self._loop_account is not None:
+            coro = AccountedCoroutine(coro, self._loop_account)
+        handle._start(coro, self)
+        child._task = handle._task
+        if self.is_cancelled:
+            handle.cancel()
+        return handle
+
     def add_tool_result(self, tool_call_id: str, result: Any) -> None:
         """Add a tool result to the stream."""
         chunk = ToolResultChunk(
@@ -92,16 +319,29 @@ class RunController:
             result=result,
         )
         self._flush_and_put_chunk(chunk)
+        if self._observer is not None:
+            self._observer.on_tool_result(self, tool_call_id)
 
     def add_stream(self, stream: AsyncGenerator[AssistantStreamChunk, None]) -> None:
-        """Append a substream to the main stream."""
+        """Append a substream to the main stream.
+
+        Substreams are read concurrently, up to the run's
+        `max_concurrent_substreams`; further ones start as earlier ones end.
+        A substream that raises fails the whole run.
+        """
 
         async def reader():
             async for chunk in stream:
                 self._flush_and_put_chunk(chunk)
+                await self._queue.wait_for_capacity()
+                if account is not None:
+                    await account.checkpoint()
 
-        task = asyncio.create_task(reader())
-        self._stream_tasks.append(task)
+        account = self._loop_account
+        if account is None:
+            self._substreams.start(reader)
+        else:
+            self._substreams.start(lambda: AccountedCoroutine(reader(), account))
 
     def add_data(self, data: Any) -> None:
         """Emit an event to the main stream."""
@@ -119,16 +359,157 @@ class RunController:
             id=id,
             url=url,
             title=title,
-            parent_id=self._parent_id
+            parent_id=self._parent_id,
+            choice_index=self._choice_index,
         )
         self._flush_and_put_chunk(chunk)
 
+    @property
+    def queue_depth(self) -> int:
+        """Number of chunks buffered and not yet consumed by the stream reader."""
+        return self._queue.depth
+
+    @property
+    def buffered_bytes(self) -> int:
+        """Approximate size in bytes of the chunks currently buffered."""
+        return self._queue.buffered_bytes
+
+    async def drain(self) -> None:
+        """Wait until the chunk buffer is below its configured limits.
+
+        Producers that emit faster than the client reads should await this
+        between writes when the run was created with `max_buffered_chunks` or
+        `max_buffered_bytes` and the "suspend" overflow policy. Returns
+        immediately when the buffer has capacity or has no limits.
+
+        Also yields to other runs like `checkpoint` when the run was created
+        with a `time_slice`.
+        """
+        await self._queue.wait_for_capacity()
+        if self._loop_account is not None:
+            await self._loop_account.checkpoint()
+
+    async def checkpoint(self) -> None:
+        """Let other runs on the event loop proceed if this one is hogging it.
+
+        Yields to the loop when the run was created with a `time_slice` and
+        the callback has been running without awaiting for longer than that.
+        Cheap enough to call after every emitted chunk or state update in a
+        tight loop.
+        """
+        if self._loop_account is not None:
+            await self._loop_account.checkpoint()
+
+    @property
+    def loop_time(self) -> Optional[float]:
+        """Seconds of event loop time used by the callback and substreams.
+
+        None unless the run was created with `track_loop_time=True` or a
+        `time_slice`.
+        """
+        if self._loop_account is None:
+            return None
+        return self._loop_account.total
+
+    @property
+    def memory_usage(self) -> RunMemoryUsage:
+        """Approximate bytes held by the run's state, chunk buffer and substreams.
+
+        Substream bytes are chunks emitted on open tool calls that the run has
+        not picked up yet. Unless the run was created with
+        `max_memory_bytes`, the state size is computed from the whole state
+        on each access.
+        """
+        return RunMemoryUsage(
+            state_bytes=self._state_manager.approximate_size,
+            queued_bytes=self._queue.buffered_bytes,
+            substream_bytes=self._substream_bytes(),
+            traced_bytes=(
+                self._memory_trace.traced_bytes()
+                if self._memory_trace is not None
+                else None
+            ),
+        )
+
+    @property
+    def _tracked_memory_bytes(self) -> Optional[int]:
+        """Cheap total of `memory_usage`, or None if the run does not track it.
+
+        Runs created with `max_memory_bytes` keep their state size up to date
+        incrementally, which makes this O(1) in the size of the state.
+        """
+        if not self._state_manager.tracks_size:
+            return None
+        return (
+            self._state_manager.approximate_size
+            + self._queue.buffered_bytes
+            + self._substream_bytes()
+        )
+
+    def _substream_bytes(self) -> int:
+        return sum(tool_call.buffered_bytes for tool_call in self._tool_calls)
+
+    def _check_memory(self) -> None:
+        used = self._tracked_memory_bytes
+        if used <= self._max_memory_bytes:
+            return
+        message = (
+            f"Run {self._run_id} exceeded its memory limit: about {used} bytes "
+            f"used, {self._max_memory_bytes} allowed"
+        )
+        if self._memory_trace is not None:
+            logger.warning(
+                "%s. Largest allocation growth since the run started:\n%s",
+                message,
+                "\n".join(self._memory_trace.top_allocations()),
+            )
+        # Stop checking; the run is being failed.
+        self._max_memory_bytes = None
+        self._bind_enqueue()
+        self._fail(RunMemoryLimitError(message), "memory_limit")
+
     def _put_chunk_nowait(self, chunk):
         """Helper method to put a chunk in the queue without waiting.
 
-        This is used as a callback for the StateManager.
+        Emit methods may be called from any thread: calls made off the event
+        loop thread hand the chunk to the loop via `call_soon_threadsafe`.
         """
-        self._loop.call_soon_threadsafe(self._queue.put_nowait, chunk)
+        if threading.get_ident() == self._loop_thread_id:
+            # Already on the loop: skip the self-pipe write of call_soon_threadsafe.
+            self._enqueue(chunk)
+        else:
+            self._loop.call_soon_threadsafe(self._enqueue, chunk)
+
+    def _put_state_chunk(self, chunk: UpdateStateChunk) -> None:
+        """Callback for the StateManager to emit a batch of state operations."""
+        if self._observer is not None:
+            self._observer.on_state_flush(self, len(chunk.operations))
+        self._put_chunk_nowait(chunk)
+
+    def _bind_enqueue(self) -> None:
+        """Pick the enqueue function once so uninstrumented runs pay nothing per chunk."""
+        if (
+            self._observer is None
+            and not self._track_activity
+            and self._max_memory_bytes is None
+        ):
+            self._enqueue = self._queue.put_nowait
+        else:
+            self._enqueue = self._enqueue_instrumented
+
+    def _enqueue_instrumented(self, chunk) -> None:
+        self._queue.put_nowait(chunk)
+        if self._track_activity:
+            self._last_activity = self._loop.time()
+        if self._observer is not None:
+            self._observer.on_chunk_enqueued(
+                self, chunk.type, approximate_chunk_size(chunk)
+            )
+        if self._max_memory_bytes is not None and chunk is not None:
+            self._check_memory()
+
+    def _notify_tool_result(self, tool_call_id: str) -> None:
+        self._observer.on_tool_result(self, tool_call_id)
 
     def _flush_and_put_chunk(self, chunk):
         """Helper method to flush state operations and put a chunk in the queue.
@@ -138,7 +519,7 @@ class RunController:
         # Flush any pending state operations first
         self._state_manager.flush()
         # Add the chunk to the queue
-        self._loop.call_soon_threadsafe(self._queue.put_nowait, chunk)
+        self._put_chunk_nowait(chunk)
 
     @property
     def state(self):
@@ -160,6 +541,8 @@ class RunController:
             # Explicit equivalent:
             controller.append_state_text(["messages", 0, "text"], " chunk")
         """
+        if self._state_path and self._state_manager.state_data is not None:
+            return StateProxy(self._state_manager, list(self._state_path))
         return self._state_manager.state
 
     @state.setter
@@ -170,7 +553,7 @@ class RunController:
             value: The new state value to set
         """
         self._state_manager.add_operations(
-            [{"type": "set", "path": [], "value": value}]
+            [{"type": "set", "path": list(self._state_path), "value": value}]
         )
 
     @property
@@ -183,93 +566,539 @@ class RunController:
         """Return whether this run has been cancelled."""
         return self._cancelled_event.is_set()
 
-    def _mark_cancelled(self) -> None:
-        """Set cancellation signal once."""
+    async def cancellable(self, awaitable: Awaitable[T]) -> T:
+        """Await `awaitable`, cancelling it as soon as the run is cancelled.
+
+        Wrap upstream requests (LLM calls, HTTP fetches) in this so a client
+        disconnect releases their connections right away instead of after the
+        cancel grace period. The cancellation is raised to the caller as
+        `asyncio.CancelledError`.
+
+        Example:
+            response = await controller.cancellable(client.chat(messages))
+        """
+        future = asyncio.ensure_future(awaitable)
+        if self.is_cancelled:
+            future.cancel()
+        self._cancellables.add(future)
+        try:
+            return await future
+        finally:
+            self._cancellables.discard(future)
+
+    async def wait_for_tool_result(
+        self, tool_call_id: str, *, timeout: Optional[float] = None
+    ) -> Any:
+        """Wait for a tool result delivered into the live run.
+
+        Results are submitted with `RunRegistry.submit_tool_result` (or
+        `submit_commands`) from another request while this run's stream stays
+        open, e.g. for human-in-the-loop approvals. A result submitted before
+        this is called is kept until it is awaited.
+
+        Args:
+            tool_call_id: Tool call the result is expected for.
+            timeout: Seconds to wait. Raises `asyncio.TimeoutError` when
+                exceeded.
+        """
+        future = self._tool_results.get(tool_call_id)
+        if future is None:
+            future = self._loop.create_future()
+            self._tool_results[tool_call_id] = future
+        try:
+            if timeout is None:
+                return await future
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            if self._tool_results.get(tool_call_id) is future:
+                del self._tool_results[tool_call_id]
+
+    def _deliver_tool_result(self, tool_call_id: str, result: Any) -> None:
+        future = self._tool_results.get(tool_call_id)
+        if future is None:
+            future = self._loop.create_future()
+            self._tool_results[tool_call_id] = future
+        elif future.done():
+            raise ValueError(f"Tool result already submitted: {tool_call_id}")
+        future.set_result(result)
+
+    @property
+    def suspended_for(self) -> Optional[str]:
+        """Tool call id the run is suspended on, or None."""
+        return self._suspension[0][0] if self._suspension else None
+
+    async def suspend_for_tool_result(
+        self, tool_call_id: str, *, timeout: Optional[float] = None
+    ) -> Any:
+        """End the current stream and wait for a tool result from the client.
+
+        For frontend tools: the response stream finishes after the chunks
+        emitted so far, while the callback stays parked in memory, holding
+        no request or connection. A later request resumes the same run in
+        place with `RunRegistry.resume(run_id, tool_call_id, result)`, which
+        returns the stream for the rest of the run, and this method returns
+        the submitted result.
+
+        Only runs created with a `registry` can be suspended. Chunks of
+        substreams other than tool calls may still arrive after the resume.
+        The run's `deadline` keeps counting while suspended; its
+        `idle_timeout` does not. A suspended run stays in memory and in the
+        registry until it is resumed, cancelled or times out, so pass a
+        `timeout` (or set the registry's `suspend_timeout`) unless the caller
+        expires abandoned runs itself.
+
+        Args:
+            tool_call_id: Tool call the result is expected for.
+            timeout: Seconds to wait for the resume. When exceeded the run is
+                cancelled. Defaults to the registry's `suspend_timeout`.
+        """
+        if self._registry is None:
+            raise RuntimeError("Only runs created with a registry can be suspended")
+        if self._suspension:
+            raise RuntimeError(
+                f"Run is already suspended on {self._suspension[0][0]}"
+            )
+
+        if timeout is None:
+            timeout = self._registry.suspend_timeout
+
+        # Let tool call readers forward what is buffered before the stream ends.
+        pending = sum(tool_call.queue.qsize() for tool_call in self._tool_calls)
+        while pending:
+            await asyncio.sleep(0)
+            remaining = sum(tool_call.queue.qsize() for tool_call in self._tool_calls)
+            if remaining >= pending:
+                break
+            pending = remaining
+
+        self._state_manager.flush()
+        future = self._loop.create_future()
+        self._suspension.append((tool_call_id, future))
+        self._queue.put_marker(_SUSPENDED)
+        try:
+            if timeout is None:
+                return await future
+            try:
+                return await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                self._mark_cancelled("suspend_timeout")
+                raise asyncio.CancelledError() from None
+        finally:
+            self._suspension.clear()
+
+    def _resume(
+        self, tool_call_id: str, result: Any
+    ) -> AsyncGenerator[AssistantStreamChunk, None]:
+        suspension = self._suspension[0] if self._suspension else None
+        if suspension is None or suspension[0] != tool_call_id:
+            raise ValueError(
+                f"Run {self._run_id} is not waiting for a result of {tool_call_id}"
+            )
+        future = suspension[1]
+        if future.done():
+            raise ValueError(f"Run {self._run_id} was already resumed")
+        future.set_result(result)
+        if self._track_activity:
+            self._last_activity = self._loop.time()
+        # Attached right away: the run may end before the stream is iterated.
+        self._output.attached = True
+        return _stream_run(self)
+
+    def _mark_cancelled(self, reason: str = "disconnect") -> None:
+        """Set cancellation signal once and cancel the run's child work.
+
+        Substreams (including tool call streams) and `cancellable` awaits are
+        cancelled immediately; the callback and child runs get a grace period.
+        """
         if not self._cancelled_event.is_set():
             self._cancelled_event.set()
+            self._substreams.cancel()
+            for future in list(self._cancellables):
+                future.cancel()
+            for child in list(self._children):
+                child.cancel(reason)
+            if self._observer is not None:
+                self._observer.on_cancel(self, reason)
+
+    def _request_cancel(self, reason: str = "cancel") -> None:
+        """Cancel the run while its stream is still being read.
+
+        Sets the cancel signal, then cancels the callback task if it has not
+        finished within the grace period. The stream ends once the callback
+        has exited.
+        """
+        self._mark_cancelled(reason)
+        self._queue.release_waiters()
+        task = self._task
+        if task is not None and not task.done():
+            self._loop.call_later(
+                self._cancel_grace_period, _cancel_if_pending, task
+            )
+
+    def _fail(self, error: BaseException, reason: str) -> None:
+        """Cancel the run and end its stream with `error`."""
+        self._request_cancel(reason)
+        self._queue.fail(error)
+
+    def _on_substream_error(self, error: BaseException) -> None:
+        self._fail(error, "error")
+
+
+def _cancel_if_pending(task: asyncio.Task) -> None:
+    if not task.done():
+        task.cancel()
+
+
+def _start_run_timers(
+    controller: RunController,
+    task: asyncio.Task,
+    deadline: Optional[float],
+    idle_timeout: Optional[float],
+) -> List[asyncio.TimerHandle]:
+    """Schedule the deadline and idle-timeout checks of a run."""
+    loop = controller._loop
+    timers: List[asyncio.TimerHandle] = []
+
+    def time_out(reason: str, message: str) -> None:
+        if task.done():
+            return
+        controller._fail(RunTimeoutError(message), reason)
+
+    if deadline is not None:
+        timers.append(
+            loop.call_later(
+                deadline,
+                time_out,
+                "deadline",
+                f"Run exceeded its deadline of {deadline}s",
+            )
+        )
+
+    if idle_timeout is not None:
+        controller._last_activity = loop.time()
+
+        def check_idle() -> None:
+            if controller._suspension:
+                controller._last_activity = loop.time()
+            idle_for = loop.time() - controller._last_activity
+            if idle_for >= idle_timeout:
+                time_out(
+                    "idle_timeout", f"Run was idle for more than {idle_timeout}s"
+                )
+            else:
+                # Reuse the slot so the done callback cancels the latest timer.
+                timers[-1] = loop.call_later(idle_timeout - idle_for, check_idle)
+
+        timers.append(loop.call_later(idle_timeout, check_idle))
+
+    return timers
 
 
 async def create_run(
     callback: Callable[[RunController], Coroutine[Any, Any, None]],
     *,
     state: Any | None = None,
+    options: Optional[RunOptions] = None,
+    registry: Optional[RunRegistry] = None,
+    run_id: Optional[str] = None,
+    thread_id: Optional[str] = None,
+    detached: bool = False,
+    run_store: Optional["RunStore"] = None,
+    **option_overrides: Any,
 ) -> AsyncGenerator[AssistantStreamChunk, None]:
-    queue = asyncio.Queue()
-    controller = RunController(queue, state_data=state)
+    """Run `callback` and stream the chunks it emits.
+
+    Example:
+        create_run(callback, state=state, deadline=60, max_buffered_chunks=256)
+
+    Args:
+        callback: Coroutine function receiving the `RunController`.
+        state: Initial state exposed through `controller.state`.
+        options: Buffering, timeout, logging and accounting options, see
+            `RunOptions`. Defaults to `RunOptions()`.
+        registry: Registry to track the run in while it is active, so it can
+            be listed and cancelled by run id or thread id.
+        run_id: Identifier for the run. A random id is generated when None.
+        thread_id: Thread the run belongs to, used by `RunRegistry.cancel_thread`.
+        detached: Keep the run going when the stream reader goes away. The
+            chunks and the final state are written to `run_store`, and the
+            returned stream reads them back from there, so any request can
+            catch up and follow the run with
+            `assistant_stream.detached.attach_run(run_store, run_id)`.
+            Requires `run_store` and `run_id`.
+        run_store: Store for detached runs, e.g. `InMemoryRunStore` or
+            `SQLiteRunStore` from `assistant_stream.detached`.
+        **option_overrides: `RunOptions` fields, overriding those of `options`.
+    """
+    options = options if options is not None else RunOptions()
+    if option_overrides:
+        options = dataclasses.replace(options, **option_overrides)
+    if detached:
+        if run_store is None or run_id is None:
+            raise ValueError("Detached runs need a run_store and a run_id")
+        # Avoid circular import
+        from assistant_stream.detached.runner import attach_run, start_detached_run
+
+        await start_detached_run(
+            run_store,
+            callback,
+            run_id=run_id,
+            state=state,
+            options=options,
+            registry=registry,
+            thread_id=thread_id,
+        )
+        async for chunk in attach_run(run_store, run_id):
+            yield chunk
+        return
+
+    chunk_log = options.chunk_log
+    lag_monitor = options.lag_monitor
+    observer = options.observer
+    # Opened before anything is started so a bad path leaves nothing running.
+    if chunk_log is None or isinstance(chunk_log, ChunkLogWriter):
+        log_writer = chunk_log
+    else:
+        log_writer = ChunkLogWriter(chunk_log)
+    queue = ChunkQueue(
+        max_chunks=options.max_buffered_chunks,
+        max_bytes=options.max_buffered_bytes,
+        overflow_policy=options.overflow_policy,
+        coalesce_window=options.coalesce_window,
+        coalesce_max_bytes=options.coalesce_max_bytes,
+    )
+    controller = RunController(
+        queue,
+        state_data=state,
+        run_id=run_id,
+        thread_id=thread_id,
+        observer=observer,
+        max_concurrent_substreams=options.max_concurrent_substreams,
+        cancel_grace_period=options.cancel_grace_period,
+        max_memory_bytes=options.max_memory_bytes,
+    )
+    if registry is not None:
+        try:
+            registry.register(controller)
+        except ValueError:
+            if log_writer is not None and log_writer is not chunk_log:
+                log_writer.close()
+            raise
+        controller._registry = registry
+    controller._output = _RunOutput(
+        log_writer, log_writer is not chunk_log, lag_monitor, options.time_slice
+    )
+    if options.trace_memory:
+        controller._memory_trace = MemoryTrace()
+    if options.idle_timeout is not None:
+        controller._track_activity = True
+        controller._bind_enqueue()
 
     async def background_task():
         try:
             await callback(controller)
         except Exception as e:
             controller.add_error(str(e))
+            for child in list(controller._children):
+                child.cancel("error")
             raise
         finally:
+            if controller._children:
+                await asyncio.gather(
+                    *(child._task for child in controller._children),
+                    return_exceptions=True,
+                )
             # Flush any pending state updates before disposing
             controller._state_manager.flush()
 
             for dispose in controller._dispose_callbacks:
                 dispose()
             try:
-                for task in controller._stream_tasks:
-                    await task
+                await controller._substreams.wait()
             finally:
-                asyncio.get_running_loop().call_soon_threadsafe(queue.put_nowait, None)
+                # Scheduled rather than put directly so chunks already handed to
+                # the loop from worker threads are queued ahead of the sentinel.
+                asyncio.get_running_loop().call_soon(queue.put_nowait, None)
+
+    if lag_monitor is not None:
+        lag_monitor._track(controller)
+    if (
+        options.time_slice is not None
+        or options.track_loop_time
+        or lag_monitor is not None
+    ):
+        controller._loop_account = LoopTimeAccount(options.time_slice)
+        task = asyncio.create_task(
+            AccountedCoroutine(background_task(), controller._loop_account)
+        )
+    else:
+        task = asyncio.create_task(background_task())
+    controller._task = task
+    if registry is not None:
+        task.add_done_callback(lambda _: registry.unregister(controller.run_id))
+    if observer is not None:
+        observer.on_run_start(controller)
+        task.add_done_callback(
+            lambda t: observer.on_run_end(
+                controller, None if t.cancelled() else t.exception()
+            )
+        )
+    timers = _start_run_timers(
+        controller, task, options.deadline, options.idle_timeout
+    )
+    if timers:
+
+        def cancel_timers(_: asyncio.Task) -> None:
+            for timer in timers:
+                timer.cancel()
+
+        task.add_done_callback(cancel_timers)
+    output = controller._output
+
+    def close_detached_output(_: asyncio.Task) -> None:
+        # A suspended run can end without a stream attached, e.g. when its
+        # suspend times out; nothing else would release its resources then.
+        if not output.attached:
+            output.close(controller)
+
+    task.add_done_callback(close_detached_output)
+    stream = _stream_run(controller)
+    try:
+        async for chunk in stream:
+            yield chunk
+    finally:
+        await stream.aclose()
 
-    task = asyncio.create_task(background_task())
+
+async def _stream_run(
+    controller: RunController,
+) -> AsyncGenerator[AssistantStreamChunk, None]:
+    """Stream a run's chunks until it ends or suspends.
+
+    Serves both the initial stream and the streams of resumed runs, so the
+    chunk log, observer and loop accounting cover the whole run.
+    """
+    queue = controller._queue
+    task = controller._task
+    observer = controller._observer
+    output = controller._output
+    log_writer = output.log_writer
+    lag_monitor = output.lag_monitor
+    time_slice = output.time_slice
+    output.attached = True
     ended_normally = False
+    suspended = False
+    burst_started = time.perf_counter()
 
     try:
         while True:
-            chunk = await controller._queue.get()
+            if time_slice is not None:
+                if queue.depth == 0:
+                    # `get()` is about to wait, which yields to the loop anyway.
+                    burst_started = time.perf_counter()
+                elif time.perf_counter() - burst_started >= time_slice:
+                    await asyncio.sleep(0)
+                    burst_started = time.perf_counter()
+            try:
+                chunk = await queue.get()
+            except Exception as e:
+                # Only failures reported through `queue.fail` end up here.
+                error_chunk = ErrorChunk(error=str(e))
+                if log_writer is not None:
+                    log_writer.write(error_chunk)
+                yield error_chunk
+                raise
             if chunk is None:
                 ended_normally = True
                 break
-            yield chunk
-            controller._queue.task_done()
+            if chunk is _SUSPENDED:
+                suspended = True
+                break
+            if observer is not None:
+                if output.first_chunk:
+                    output.first_chunk = False
+                    observer.on_first_chunk(controller, chunk)
+                observer.on_chunk_dequeued(
+                    controller, chunk.type, approximate_chunk_size(chunk)
+                )
+            if log_writer is not None:
+                log_writer.write(chunk)
+            if lag_monitor is not None:
+                lag_monitor._chunk_handed_out(controller.run_id, chunk.type)
+                yield chunk
+                lag_monitor._chunk_done(controller.run_id)
+            else:
+                yield chunk
     finally:
+        output.attached = False
+        if not suspended:
+            output.close(controller)
         if ended_normally:
-            # The `None` sentinel is queued at the end of `background_task`, so
-            # normal stream completion implies `task` is already done here.
-            # `result()` preserves normal-path error propagation.
-            task.result()
+            _raise_run_result(controller, task)
+        elif not suspended:
+            await _close_run(controller, task)
+
+
+def _raise_run_result(controller: RunController, task: asyncio.Task) -> None:
+    """Propagate the outcome of a run whose stream ended normally."""
+    # The `None` sentinel is queued at the end of `background_task`, so
+    # normal stream completion implies `task` is already done here.
+    # `result()` preserves normal-path error propagation.
+    try:
+        task.result()
+    except asyncio.CancelledError:
+        # Forced cancellation after `_request_cancel` ends the stream
+        # like a cooperative exit would.
+        if not controller.is_cancelled:
+            raise
+
+
+async def _close_run(controller: RunController, task: asyncio.Task) -> None:
+    """Cancel a run whose stream reader went away early."""
+    controller._mark_cancelled()
+    # Unblock producers suspended in `controller.drain()`.
+    controller._queue.release_waiters()
+    # Yield to the event loop to allow the cancel signal to propagate.
+    await asyncio.sleep(0)
+    if not task.done() and controller._cancel_grace_period > 0:
+        # Give callbacks a brief chance to observe `is_cancelled`
+        # and exit cooperatively before forcing cancellation.
+        try:
+            await asyncio.wait_for(
+                asyncio.shield(task), timeout=controller._cancel_grace_period
+            )
+        except asyncio.TimeoutError:
+            # Timeout means cooperative shutdown did not finish in time.
+            pass
+        except asyncio.CancelledError:
+            # A `cancellable` await was cancelled and the callback let
+            # the cancellation propagate; anything else is the caller's.
+            if not task.cancelled():
+                raise
+        except Exception:
+            # The stream consumer already disconnected, so suppress callback errors
+            # but keep a log signal for postmortem debugging.
+            logger.warning(
+                "Suppressed callback exception during early-close grace period",
+                exc_info=True,
+            )
+    if not task.done():
+        task.cancel()
+    try:
+        # `shield()` lets caller-initiated cancellation interrupt `aclose()`
+        # without conflating it with our own forced `task.cancel()`.
+        await asyncio.shield(task)
+    except asyncio.CancelledError:
+        if task.cancelled():
+            # Expected forced cancellation for early-close cleanup.
+            pass
         else:
-            controller._mark_cancelled()
-            # Yield to the event loop to allow the cancel signal to propagate.
-            await asyncio.sleep(0)
-            if not task.done():
-                # Give callbacks a brief chance to observe `is_cancelled`
-                # and exit cooperatively before forcing cancellation.
-                # 50ms keeps disconnect cleanup responsive without immediately
-                # interrupting callbacks that can stop themselves quickly.
-                try:
-                    await asyncio.wait_for(asyncio.shield(task), timeout=0.05)
-                except asyncio.TimeoutError:
-                    # Timeout means cooperative shutdown did not finish in time.
-                    pass
-                except Exception:
-                    # The stream consumer already disconnected, so suppress callback errors
-                    # but keep a log signal for postmortem debugging.
-                    logger.warning(
-                        "Suppressed callback exception during early-close grace period",
-                        exc_info=True,
-                    )
-            if not task.done():
-                task.cancel()
-            try:
-                # `shield()` lets caller-initiated cancellation interrupt `aclose()`
-                # without conflating it with our own forced `task.cancel()`.
-                await asyncio.shield(task)
-            except asyncio.CancelledError:
-                if task.cancelled():
-                    # Expected forced cancellation for early-close cleanup.
-                    pass
-                else:
-                    # Preserve caller-initiated cancellation (e.g. wait_for timeout).
-                    raise
-            except Exception:
-                # The stream consumer already disconnected, so suppress callback errors
-                # but keep a log signal for postmortem debugging.
-                logger.warning(
-                    "Suppressed callback exception after forced early-close cancellation",
-                    exc_info=True,
-                )
+            # Preserve caller-initiated cancellation (e.g. wait_for timeout).
+            raise
+    except Exception:
+        # The stream consumer already disconnected, so suppress callback errors
+        # but keep a log signal for postmortem debugging.
+        logger.warning(
+            "Suppressed callback exception after forced early-close cancellation",
+            exc_info=True,
+        )
@@ -0,0 +1,21 @@
+from assistant_stream.detached.errors import DetachedRunError, DetachedRunErrorCode
+from assistant_stream.detached.runner import (
+    attach_run,
+    start_detached_run,
+    wait_for_detached_runs,
+)
+from assistant_stream.detached.store import DetachedRunStatus, RunStore, StoredChunk
+from assistant_stream.detached.stores import InMemoryRunStore, SQLiteRunStore
+
+__all__ = [
+    "DetachedRunError",
+    "DetachedRunErrorCode",
+    "DetachedRunStatus",
+    "RunStore",
+    "StoredChunk",
+    "InMemoryRunStore",
+    "SQLiteRunStore",
+    "attach_run",
+    "start_detached_run",
+    "wait_for_detached_runs",
+]
@@ -0,0 +1,11 @@
+from typing import Literal
+
+DetachedRunErrorCode = Literal["missing", "exists", "finished", "failed"]
+
+
+class DetachedRunError(Exception):
+    """Error raised by detached runs and run stores."""
+
+    def __init__(self, code: DetachedRunErrorCode, message: str):
+        super().__init__(message)
+        self.code = code
@@ -0,0 +1,109 @@
+import asyncio
+import logging
+from typing import Any, AsyncGenerator, Callable, Coroutine, Dict, List, Set, Tuple
+
+from assistant_stream.assistant_stream_chunk import AssistantStreamChunk
+from assistant_stream.create_run import RunController, create_run
+from assistant_stream.detached.store import RunStore
+
+logger = logging.getLogger(__name__)
+
+_detached_tasks: Set[asyncio.Task] = set()
+
+
+async def start_detached_run(
+    store: RunStore,
+    callback: Callable[[RunController], Coroutine[Any, Any, None]],
+    *,
+    run_id: str,
+    **run_options: Any,
+) -> None:
+    """Start `create_run(callback, **run_options)` in the background.
+
+    Every chunk is persisted to `store`, followed by the final state once the
+    callback returns. The run does not depend on any reader; read its output
+    with `attach_run`.
+    """
+    await store.create(run_id, thread_id=run_options.get("thread_id"))
+    _start_persisted_run(store, callback, run_id, run_options)
+
+
+async def attach_run(
+    store: RunStore, run_id: str, *, from_index: int = 0
+) -> AsyncGenerator[AssistantStreamChunk, None]:
+    """Stream a detached run's chunks from `from_index`, then its live tail.
+
+    Raises `DetachedRunError("missing")` for unknown runs and
+    `DetachedRunError("failed")`, after the error chunk, for failed ones.
+    Closing the stream does not affect the run.
+    """
+    async for stored in store.read(run_id, from_index):
+        yield stored.chunk
+
+
+async def wait_for_detached_runs() -> None:
+    """Wait for every detached run started in this process to finish."""
+    if _detached_tasks:
+        await asyncio.gather(*_detached_tasks, return_exceptions=True)
+
+
+def _start_persisted_run(
+    store: RunStore,
+    callback: Callable[[RunController], Coroutine[Any, Any, None]],
+    run_id: str,
+    run_options: Dict[str, Any],
+) -> Tuple["asyncio.Task[None]", List[RunController]]:
+    """Run the callback, persisting its output to the already created run.
+
+    Returns the persisting task and a list that receives the run's
+    controller once the callback has started.
+    """
+    controllers: List[RunController] = []
+
+    async def run_callback(controller: RunController) -> None:
+        controllers.append(controller)
+        await callback(controller)
+
+    stream = create_run(run_callback, run_id=run_id, **run_options)
+    task = asyncio.create_task(_persist(store, run_id, stream, controllers))
+    _detached_tasks.add(task)
+    task.add_done_callback(_detached_tasks.discard)
+    return task, controllers
+
+
+async def _persist(
+    store: RunStore,
+    run_id: str,
+    stream: AsyncGenerator[AssistantStreamChunk, None],
+    controllers: List[RunController],
+) -> None:
+    status, error = "done", None
+    batch: List[AssistantStreamChunk] = []
+    writer = None
+    try:
+        try:
+            async for chunk in stream:
+                batch.append(chunk)
+                # One write in flight at a time; chunks arriving meanwhile are
+                # batched into the next one.
+                if writer is None or writer.done():
+                    if writer is not None:
+                        writer.result()
+                    writer = asyncio.create_task(store.append(run_id, batch))
+                    batch = []
+        except Exception as e:
+            status, error = "error", str(e) or type(e).__name__
+        finally:
+            await stream.aclose()
+        if writer is not None:
+            await writer
+        if batch:
+            await store.append(run_id, batch)
+        state = controllers[0]._state_manager.state_data if controllers else None
+        await store.finish(run_id, status, state=state, error=error)
+    except Exception as e:
+        logger.warning("Persisting detached run %s failed", run_id, exc_info=True)
+        try:
+            await store.finish(run_id, "error", error=str(e) or type(e).__name__)
+        except Exception:
+            logger.warning("Finishing detached run %s failed", run_id, exc_info=True)
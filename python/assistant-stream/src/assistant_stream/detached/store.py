@@ -0,0 +1,64 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Literal, Optional, Sequence
+
+from assistant_stream.assistant_stream_chunk import AssistantStreamChunk
+
+DetachedRunStatus = Literal["running", "done", "error", "missing"]
+
+# Finished runs are kept for one day unless configured otherwise.
+DEFAULT_TTL = 24 * 60 * 60
+
+
+@dataclass(frozen=True)
+class StoredChunk:
+    """A persisted chunk and its position in the run's output."""
+
+    index: int
+    chunk: AssistantStreamChunk
+
+
+class RunStore(ABC):
+    """Storage backend for detached runs."""
+
+    @abstractmethod
+    async def create(self, run_id: str, *, thread_id: Optional[str] = None) -> None:
+        """Start recording a run. Raises `DetachedRunError("exists")` if taken."""
+
+    @abstractmethod
+    async def append(self, run_id: str, chunks: Sequence[AssistantStreamChunk]) -> None:
+        """Persist the next chunks of a running run."""
+
+    @abstractmethod
+    async def finish(
+        self,
+        run_id: str,
+        status: Literal["done", "error"],
+        *,
+        state: Any = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """Mark the run as finished and record its final state.
+
+        Starts the run's TTL. No-op when already finished.
+        """
+
+    @abstractmethod
+    def read(self, run_id: str, from_index: int = 0) -> AsyncIterator[StoredChunk]:
+        """Yield chunks from index `from_index` on, then follow new ones.
+
+        Ends when the run has finished, raising `DetachedRunError("failed")`
+        if it finished with an error.
+        """
+
+    @abstractmethod
+    async def status(self, run_id: str) -> DetachedRunStatus:
+        """Return the run's status, or "missing" if it does not exist."""
+
+    @abstractmethod
+    async def get_state(self, run_id: str) -> Any:
+        """Return the final state of a finished run, or None."""
+
+    @abstractmethod
+    async def delete(self, run_id: str) -> None:
+        """Delete the run. Active readers terminate. No-op when missing."""
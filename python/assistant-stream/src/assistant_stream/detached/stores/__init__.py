@@ -0,0 +1,4 @@
+from assistant_stream.detached.stores.memory import InMemoryRunStore
+from assistant_stream.detached.stores.sqlite import SQLiteRunStore
+
+__all__ = ["InMemoryRunStore", "SQLiteRunStore"]
@@ -0,0 +1,112 @@
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Literal, Optional, Sequence
+
+from assistant_stream.assistant_stream_chunk import AssistantStreamChunk
+from assistant_stream.detached.errors import DetachedRunError
+from assistant_stream.detached.store import (
+    DEFAULT_TTL,
+    DetachedRunStatus,
+    RunStore,
+    StoredChunk,
+)
+from assistant_stream.store_base import WatchedEntry, pop_expired
+
+
+@dataclass
+class _RunState(WatchedEntry):
+    thread_id: Optional[str]
+    chunks: List[AssistantStreamChunk] = field(default_factory=list)
+    status: DetachedRunStatus = "running"
+    error: Optional[str] = None
+    state: Any = None
+
+
+class InMemoryRunStore(RunStore):
+    """Process-local run store. Finished runs live until their TTL lapses.
+
+    Args:
+        default_ttl: Seconds a finished run is kept.
+        now: Clock returning seconds, overridable for tests.
+    """
+
+    def __init__(
+        self,
+        *,
+        default_ttl: float = DEFAULT_TTL,
+        now: Callable[[], float] = time.monotonic,
+    ):
+        self._runs: Dict[str, _RunState] = {}
+        self._default_ttl = default_ttl
+        self._now = now
+
+    def _evict_expired(self) -> None:
+        for run in pop_expired(self._runs, self._now()):
+            run.notify()
+
+    def _require(self, run_id: str) -> _RunState:
+        self._evict_expired()
+        run = self._runs.get(run_id)
+        if run is None:
+            raise DetachedRunError("missing", f"Run not found: {run_id}")
+        return run
+
+    async def create(self, run_id: str, *, thread_id: Optional[str] = None) -> None:
+        self._evict_expired()
+        if run_id in self._runs:
+            raise DetachedRunError("exists", f"Run already exists: {run_id}")
+        self._runs[run_id] = _RunState(thread_id=thread_id)
+
+    async def append(self, run_id: str, chunks: Sequence[AssistantStreamChunk]) -> None:
+        run = self._require(run_id)
+        if run.status != "running":
+            raise DetachedRunError("finished", f"Run already finished: {run_id}")
+        run.chunks.extend(chunks)
+        run.notify()
+
+    async def finish(
+        self,
+        run_id: str,
+        status: Literal["done", "error"],
+        *,
+        state: Any = None,
+        error: Optional[str] = None,
+    ) -> None:
+        run = self._require(run_id)
+        if run.status != "running":
+            return
+        run.status = status
+        run.error = (error or "Run errored") if status == "error" else None
+        run.state = state
+        run.expires_at = self._now() + self._default_ttl
+        run.notify()
+
+    async def read(
+        self, run_id: str, from_index: int = 0
+    ) -> AsyncIterator[StoredChunk]:
+        run = self._require(run_id)
+        index = max(from_index, 0)
+        while True:
+            while index < len(run.chunks):
+                yield StoredChunk(index=index, chunk=run.chunks[index])
+                index += 1
+            if run.status == "error":
+                raise DetachedRunError("failed", run.error or "Run errored")
+            if run.status == "done" or self._runs.get(run_id) is not run:
+                return
+            await run.changed.wait()
+
+    async def status(self, run_id: str) -> DetachedRunStatus:
+        self._evict_expired()
+        run = self._runs.get(run_id)
+        return "missing" if run is None else run.status
+
+    async def get_state(self, run_id: str) -> Any:
+        self._evict_expired()
+        run = self._runs.get(run_id)
+        return None if run is None else run.state
+
+    async def delete(self, run_id: str) -> None:
+        run = self._runs.pop(run_id, None)
+        if run is not None:
+            run.notify()
@@ -0,0 +1,192 @@
+import json
+import time
+from typing import Any, AsyncIterator, List, Literal, Optional, Sequence
+
+from assistant_stream.assistant_stream_chunk import AssistantStreamChunk
+from assistant_stream.chunk_log import chunk_from_dict, chunk_to_dict
+from assistant_stream.detached.errors import DetachedRunError
+from assistant_stream.detached.store import (
+    DEFAULT_TTL,
+    DetachedRunStatus,
+    RunStore,
+    StoredChunk,
+)
+from assistant_stream.serialization.assistant_transport import StateProxyJSONEncoder
+from assistant_stream.store_base import SQLiteChunkStore
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS detached_runs (
+    run_id TEXT PRIMARY KEY,
+    thread_id TEXT,
+    status TEXT NOT NULL,
+    error TEXT,
+    state TEXT,
+    expires_at REAL,
+    size INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS detached_run_chunks (
+    run_id TEXT NOT NULL,
+    chunk_index INTEGER NOT NULL,
+    chunk TEXT NOT NULL,
+    PRIMARY KEY (run_id, chunk_index)
+);
+"""
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, cls=StateProxyJSONEncoder)
+
+
+class SQLiteRunStore(SQLiteChunkStore, RunStore):
+    """Run store backed by a local SQLite database file.
+
+    Chunks and final state are stored as JSON, so detached runs survive a
+    restart of the process that serves the reattaching client. Readers in
+    the writing process are woken immediately; others poll. Database calls
+    run in a worker thread so they never block the event loop.
+
+    Args:
+        path: Database file path, or ":memory:".
+        default_ttl: Seconds a finished run is kept.
+        poll_interval: Seconds between polls while waiting for new chunks.
+    """
+
+    _parent_table = "detached_runs"
+    _child_table = "detached_run_chunks"
+    _key_column = "run_id"
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        default_ttl: float = DEFAULT_TTL,
+        poll_interval: float = 0.05,
+    ):
+        super().__init__(path, _SCHEMA, poll_interval=poll_interval)
+        self._default_ttl = default_ttl
+
+    def _missing_error(self, run_id: str) -> Exception:
+        return DetachedRunError("missing", f"Run not found: {run_id}")
+
+    def _failed_error(self, error: Optional[str]) -> Exception:
+        return DetachedRunError("failed", error or "Run errored")
+
+    def _create(self, run_id: str, thread_id: Optional[str]) -> None:
+        self._evict_expired()
+        cursor = self._conn.execute(
+            "INSERT OR IGNORE INTO detached_runs (run_id, thread_id, status) "
+            "VALUES (?, ?, 'running')",
+            (run_id, thread_id),
+        )
+        if cursor.rowcount != 1:
+            raise DetachedRunError("exists", f"Run already exists: {run_id}")
+
+    async def create(self, run_id: str, *, thread_id: Optional[str] = None) -> None:
+        await self._run(self._create, run_id, thread_id)
+
+    def _append(self, run_id: str, chunks: List[str]) -> None:
+        with self._transaction():
+            row = self._conn.execute(
+                "SELECT status, size FROM detached_runs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+            if row is None:
+                raise DetachedRunError("missing", f"Run not found: {run_id}")
+            status, size = row
+            if status != "running":
+                raise DetachedRunError("finished", f"Run already finished: {run_id}")
+            self._conn.executemany(
+                "INSERT INTO detached_run_chunks (run_id, chunk_index, chunk) "
+                "VALUES (?, ?, ?)",
+                [(run_id, size + i, chunk) for i, chunk in enumerate(chunks)],
+            )
+            self._conn.execute(
+                "UPDATE detached_runs SET size = ? WHERE run_id = ?",
+                (size + len(chunks), run_id),
+            )
+
+    async def append(self, run_id: str, chunks: Sequence[AssistantStreamChunk]) -> None:
+        encoded = [_dumps(chunk_to_dict(chunk)) for chunk in chunks]
+        await self._run(self._append, run_id, encoded)
+        self._notify(run_id)
+
+    def _finish(
+        self, run_id: str, status: str, state: str, error: Optional[str]
+    ) -> None:
+        row = self._conn.execute(
+            "SELECT status FROM detached_runs WHERE run_id = ?", (run_id,)
+        ).fetchone()
+        if row is None:
+            raise DetachedRunError("missing", f"Run not found: {run_id}")
+        if row[0] != "running":
+            return
+        self._conn.execute(
+            "UPDATE detached_runs SET status = ?, error = ?, state = ?, expires_at = ? "
+            "WHERE run_id = ?",
+            (status, error, state, time.time() + self._default_ttl, run_id),
+        )
+
+    async def finish(
+        self,
+        run_id: str,
+        status: Literal["done", "error"],
+        *,
+        state: Any = None,
+        error: Optional[str] = None,
+    ) -> None:
+        if status == "error":
+            error = error or "Run errored"
+        await self._run(self._finish, run_id, status, _dumps(state), error)
+        self._notify(run_id)
+
+    def _read_batch(self, run_id: str, from_index: int):
+        row = self._conn.execute(
+            "SELECT status, error FROM detached_runs WHERE run_id = ?", (run_id,)
+        ).fetchone()
+        if row is None:
+            return None, None, []
+        status, error = row
+        chunks = [
+            StoredChunk(index=index, chunk=chunk_from_dict(json.loads(chunk)))
+            for index, chunk in self._conn.execute(
+                "SELECT chunk_index, chunk FROM detached_run_chunks "
+                "WHERE run_id = ? AND chunk_index >= ? ORDER BY chunk_index",
+                (run_id, from_index),
+            )
+        ]
+        return status, error, chunks
+
+    async def read(
+        self, run_id: str, from_index: int = 0
+    ) -> AsyncIterator[StoredChunk]:
+        async for stored in self._follow(
+            run_id,
+            self._read_batch,
+            max(from_index, 0),
+            lambda stored: stored.index + 1,
+        ):
+            yield stored
+
+    def _status(self, run_id: str) -> DetachedRunStatus:
+        self._evict_expired()
+        row = self._conn.execute(
+            "SELECT status FROM detached_runs WHERE run_id = ?", (run_id,)
+        ).fetchone()
+        return "missing" if row is None else row[0]
+
+    async def status(self, run_id: str) -> DetachedRunStatus:
+        return await self._run(self._status, run_id)
+
+    def _get_state(self, run_id: str) -> Any:
+        row = self._conn.execute(
+            "SELECT state FROM detached_runs WHERE run_id = ?", (run_id,)
+        ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return json.loads(row[0])
+
+    async def get_state(self, run_id: str) -> Any:
+        return await self._run(self._get_state, run_id)
+
+    async def delete(self, run_id: str) -> None:
+        await self._run(self._delete, run_id)
+        self._notify(run_id)
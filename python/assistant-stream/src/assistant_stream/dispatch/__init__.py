@@ -0,0 +1,13 @@
+from assistant_stream.dispatch.broker import RunBroker, RunJob
+from assistant_stream.dispatch.brokers import InMemoryRunBroker, SQLiteRunBroker
+from assistant_stream.dispatch.dispatcher import dispatch_run
+from assistant_stream.dispatch.worker import RunWorker
+
+__all__ = [
+    "RunBroker",
+    "RunJob",
+    "InMemoryRunBroker",
+    "SQLiteRunBroker",
+    "RunWorker",
+    "dispatch_run",
+]
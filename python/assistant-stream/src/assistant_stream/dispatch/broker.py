@@ -0,0 +1,56 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Collection, Dict, Optional, Set
+
+
+@dataclass(frozen=True)
+class RunJob:
+    """A run waiting for a worker.
+
+    `callback` names one of the callbacks registered with the `RunWorker`;
+    `state` and `options` (extra `create_run` keyword arguments) must be
+    JSON-serializable for brokers that cross process boundaries.
+    """
+
+    run_id: str
+    callback: str
+    state: Any = None
+    thread_id: Optional[str] = None
+    options: Dict[str, Any] = field(default_factory=dict)
+
+
+class RunBroker(ABC):
+    """Work queue between the front processes and the run workers."""
+
+    @abstractmethod
+    async def enqueue(self, job: RunJob) -> None:
+        """Queue a job for the next free worker."""
+
+    @abstractmethod
+    async def claim(self) -> RunJob:
+        """Wait for the oldest queued job and take it off the queue."""
+
+    @abstractmethod
+    async def request_cancel(self, run_id: str) -> bool:
+        """Ask the worker running the job to cancel it. No-op when missing.
+
+        A job cancelled before it was claimed is dropped from the queue, and
+        True is returned; no worker will then finish its run.
+        """
+
+    @abstractmethod
+    async def is_cancel_requested(self, run_id: str) -> bool:
+        """Return whether cancellation was requested for the job."""
+
+    async def cancel_requests(self, run_ids: Collection[str]) -> Set[str]:
+        """Return the ids among `run_ids` whose cancellation was requested.
+
+        Workers check all their runs with one call per poll. The default
+        asks `is_cancel_requested` for each run; brokers can answer in one
+        round trip instead.
+        """
+        return {run_id for run_id in run_ids if await self.is_cancel_requested(run_id)}
+
+    @abstractmethod
+    async def complete(self, run_id: str) -> None:
+        """Forget a job once its run has finished."""
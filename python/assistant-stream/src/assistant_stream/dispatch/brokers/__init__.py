@@ -0,0 +1,4 @@
+from assistant_stream.dispatch.brokers.memory import InMemoryRunBroker
+from assistant_stream.dispatch.brokers.sqlite import SQLiteRunBroker
+
+__all__ = ["InMemoryRunBroker", "SQLiteRunBroker"]
@@ -0,0 +1,44 @@
+import asyncio
+from collections import OrderedDict
+from typing import Collection, Dict, Set
+
+from assistant_stream.dispatch.broker import RunBroker, RunJob
+
+
+class InMemoryRunBroker(RunBroker):
+    """Process-local broker, for tests and single-process deployments."""
+
+    def __init__(self):
+        self._queued: "OrderedDict[str, RunJob]" = OrderedDict()
+        self._claimed: Dict[str, RunJob] = {}
+        self._cancelled: Set[str] = set()
+        self._changed = asyncio.Event()
+
+    async def enqueue(self, job: RunJob) -> None:
+        self._queued[job.run_id] = job
+        self._changed.set()
+
+    async def claim(self) -> RunJob:
+        while not self._queued:
+            self._changed.clear()
+            await self._changed.wait()
+        _, job = self._queued.popitem(last=False)
+        self._claimed[job.run_id] = job
+        return job
+
+    async def request_cancel(self, run_id: str) -> bool:
+        if self._queued.pop(run_id, None) is not None:
+            return True
+        if run_id in self._claimed:
+            self._cancelled.add(run_id)
+        return False
+
+    async def is_cancel_requested(self, run_id: str) -> bool:
+        return run_id in self._cancelled
+
+    async def cancel_requests(self, run_ids: Collection[str]) -> Set[str]:
+        return self._cancelled.intersection(run_ids)
+
+    async def complete(self, run_id: str) -> None:
+        self._claimed.pop(run_id, None)
+        self._cancelled.discard(run_id)
@@ -0,0 +1,128 @@
+import asyncio
+import json
+import time
+from typing import Collection, List, Optional, Set
+
+from assistant_stream.dispatch.broker import RunBroker, RunJob
+from assistant_stream.serialization.assistant_transport import StateProxyJSONEncoder
+from assistant_stream.store_base import SQLiteDatabase
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS run_jobs (
+    run_id TEXT PRIMARY KEY,
+    callback TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS run_jobs_queue ON run_jobs (status, created_at);
+"""
+
+
+class SQLiteRunBroker(SQLiteDatabase, RunBroker):
+    """Broker backed by a local SQLite database file.
+
+    Front processes and workers on the same host open the same file; a job
+    is claimed by exactly one worker. Workers poll for new jobs. Database
+    calls run in a worker thread so they never block the event loop.
+
+    Args:
+        path: Database file path.
+        poll_interval: Seconds between polls while the queue is empty.
+    """
+
+    def __init__(self, path: str, *, poll_interval: float = 0.05):
+        super().__init__(path, _SCHEMA, poll_interval=poll_interval)
+
+    def _enqueue(self, job: RunJob, payload: str) -> None:
+        self._conn.execute(
+            "INSERT INTO run_jobs (run_id, callback, payload, status, created_at) "
+            "VALUES (?, ?, ?, 'queued', ?)",
+            (job.run_id, job.callback, payload, time.time()),
+        )
+
+    async def enqueue(self, job: RunJob) -> None:
+        payload = json.dumps(
+            {"state": job.state, "thread_id": job.thread_id, "options": job.options},
+            cls=StateProxyJSONEncoder,
+        )
+        await self._run(self._enqueue, job, payload)
+
+    def _claim(self) -> Optional[RunJob]:
+        with self._transaction():
+            row = self._conn.execute(
+                "SELECT run_id, callback, payload FROM run_jobs "
+                "WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                self._conn.execute(
+                    "UPDATE run_jobs SET status = 'claimed' WHERE run_id = ?",
+                    (row[0],),
+                )
+        if row is None:
+            return None
+        run_id, callback, payload = row
+        payload = json.loads(payload)
+        return RunJob(
+            run_id=run_id,
+            callback=callback,
+            state=payload["state"],
+            thread_id=payload["thread_id"],
+            options=payload["options"],
+        )
+
+    async def claim(self) -> RunJob:
+        while True:
+            job = await self._run(self._claim)
+            if job is not None:
+                return job
+            await asyncio.sleep(self._poll_interval)
+
+    def _request_cancel(self, run_id: str) -> bool:
+        cursor = self._conn.execute(
+            "DELETE FROM run_jobs WHERE run_id = ? AND status = 'queued'", (run_id,)
+        )
+        if cursor.rowcount:
+            return True
+        self._conn.execute(
+            "UPDATE run_jobs SET cancel_requested = 1 WHERE run_id = ?", (run_id,)
+        )
+        return False
+
+    async def request_cancel(self, run_id: str) -> bool:
+        return await self._run(self._request_cancel, run_id)
+
+    def _is_cancel_requested(self, run_id: str) -> bool:
+        row = self._conn.execute(
+            "SELECT cancel_requested FROM run_jobs WHERE run_id = ?", (run_id,)
+        ).fetchone()
+        return bool(row and row[0])
+
+    async def is_cancel_requested(self, run_id: str) -> bool:
+        return await self._run(self._is_cancel_requested, run_id)
+
+    def _cancel_requests(self, run_ids: List[str]) -> Set[str]:
+        requested = set()
+        # Stay below SQLite's default limit on bound parameters.
+        for start in range(0, len(run_ids), 500):
+            batch = run_ids[start : start + 500]
+            placeholders = ", ".join("?" * len(batch))
+            requested.update(
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT run_id FROM run_jobs WHERE cancel_requested = 1 "
+                    f"AND run_id IN ({placeholders})",
+                    batch,
+                )
+            )
+        return requested
+
+    async def cancel_requests(self, run_ids: Collection[str]) -> Set[str]:
+        return await self._run(self._cancel_requests, list(run_ids))
+
+    def _complete(self, run_id: str) -> None:
+        self._conn.execute("DELETE FROM run_jobs WHERE run_id = ?", (run_id,))
+
+    async def complete(self, run_id: str) -> None:
+        await self._run(self._complete, run_id)
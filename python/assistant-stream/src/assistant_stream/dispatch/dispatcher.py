@@ -0,0 +1,62 @@
+from typing import Any, AsyncGenerator, Optional
+
+from assistant_stream.assistant_stream_chunk import AssistantStreamChunk
+from assistant_stream.detached.runner import attach_run
+from assistant_stream.detached.store import RunStore
+from assistant_stream.dispatch.broker import RunBroker, RunJob
+
+
+async def dispatch_run(
+    broker: RunBroker,
+    store: RunStore,
+    callback: str,
+    *,
+    run_id: str,
+    state: Any = None,
+    thread_id: Optional[str] = None,
+    **run_options: Any,
+) -> AsyncGenerator[AssistantStreamChunk, None]:
+    """Queue a run for a `RunWorker` and stream its chunks back.
+
+    The calling process only relays chunks from `store`, which the worker
+    writes to, so connection handling and callback execution scale
+    independently. Closing the stream early (e.g. a client disconnect)
+    cancels the run on the worker, or drops it if no worker took it yet.
+
+    Example:
+        @app.post("/assistant")
+        async def assistant(request: AssistantRequest):
+            stream = dispatch_run(
+                broker, store, "chat", run_id=str(uuid4()), state=request.state
+            )
+            return DataStreamResponse(stream)
+
+    Args:
+        broker: Queue the job is put on.
+        store: Run store shared with the workers.
+        callback: Name of a callback registered with the workers.
+        run_id: Unique id of the run.
+        state: Initial state of the run.
+        thread_id: Thread the run belongs to.
+        **run_options: Passed to `create_run` on the worker. Must be
+            serializable by the broker.
+    """
+    await store.create(run_id, thread_id=thread_id)
+    await broker.enqueue(
+        RunJob(
+            run_id=run_id,
+            callback=callback,
+            state=state,
+            thread_id=thread_id,
+            options=run_options,
+        )
+    )
+    finished = False
+    try:
+        async for chunk in attach_run(store, run_id):
+            yield chunk
+        finished = True
+    finally:
+        if not finished and await broker.request_cancel(run_id):
+            # No worker took the job, so nothing else will finish the run.
+            await store.finish(run_id, "error", error="cancelled")
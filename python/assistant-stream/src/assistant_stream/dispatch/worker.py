@@ -0,0 +1,145 @@
+import asyncio
+import logging
+from typing import Any, Callable, Coroutine, Dict, Mapping, Optional, Set
+
+from assistant_stream.create_run import RunController
+from assistant_stream.detached.runner import _start_persisted_run
+from assistant_stream.detached.store import RunStore
+from assistant_stream.dispatch.broker import RunBroker, RunJob
+
+logger = logging.getLogger(__name__)
+
+
+class RunWorker:
+    """Executes runs queued with `dispatch_run`.
+
+    Claims jobs from `broker`, runs the named callback with `create_run` and
+    persists its output to `store`, where the dispatching process reads it.
+    Start as many workers, in as many processes or hosts, as the broker and
+    store can be shared with.
+
+    Example:
+        worker = RunWorker(broker, store, {"chat": chat_callback})
+        await worker.run()
+
+    Args:
+        broker: Queue to claim jobs from.
+        store: Run store shared with the dispatching processes.
+        callbacks: Run callbacks by the name jobs refer to them with.
+        max_concurrency: Maximum number of runs executing at once.
+        cancel_poll_interval: Seconds between checks for cancel requests,
+            made for all of the worker's runs at once.
+    """
+
+    def __init__(
+        self,
+        broker: RunBroker,
+        store: RunStore,
+        callbacks: Mapping[str, Callable[[RunController], Coroutine[Any, Any, None]]],
+        *,
+        max_concurrency: int = 16,
+        cancel_poll_interval: float = 0.1,
+    ):
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be positive")
+        self._broker = broker
+        self._store = store
+        self._callbacks = dict(callbacks)
+        self._max_concurrency = max_concurrency
+        self._cancel_poll_interval = cancel_poll_interval
+        self._active: Set[asyncio.Task] = set()
+        # Controllers of the executing runs, None until their callback starts.
+        self._running: Dict[str, Optional[RunController]] = {}
+        self._cancelled: Set[str] = set()
+        self._slots: asyncio.Semaphore | None = None
+
+    @property
+    def active_count(self) -> int:
+        """Number of runs currently executing."""
+        return len(self._active)
+
+    async def run(self) -> None:
+        """Claim and execute jobs until cancelled.
+
+        On cancellation, runs in progress are cancelled and their output up
+        to that point is persisted before this returns.
+        """
+        self._slots = asyncio.Semaphore(self._max_concurrency)
+        watcher = asyncio.create_task(self._watch_cancels())
+        try:
+            while True:
+                await self._slots.acquire()
+                try:
+                    job = await self._broker.claim()
+                except BaseException:
+                    self._slots.release()
+                    raise
+                task = asyncio.create_task(self._execute(job))
+                self._active.add(task)
+                task.add_done_callback(self._on_done)
+        finally:
+            watcher.cancel()
+            for controller in self._running.values():
+                if controller is not None:
+                    controller._request_cancel("cancel")
+            if self._active:
+                await asyncio.gather(*self._active, return_exceptions=True)
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        self._active.discard(task)
+        self._slots.release()
+
+    async def _execute(self, job: RunJob) -> None:
+        run_id = job.run_id
+        self._running[run_id] = None
+        try:
+            callback = self._callbacks.get(job.callback)
+            if callback is None:
+                await self._store.finish(
+                    run_id, "error", error=f"Unknown run callback: {job.callback}"
+                )
+                return
+
+            async def run_callback(controller: RunController) -> None:
+                self._running[run_id] = controller
+                if run_id in self._cancelled:
+                    controller._request_cancel("disconnect")
+                await callback(controller)
+
+            task, _ = _start_persisted_run(
+                self._store,
+                run_callback,
+                run_id,
+                {"state": job.state, "thread_id": job.thread_id, **job.options},
+            )
+            await task
+        except Exception:
+            logger.warning("Executing run %s failed", run_id, exc_info=True)
+        finally:
+            del self._running[run_id]
+            self._cancelled.discard(run_id)
+            await self._broker.complete(run_id)
+
+    async def _watch_cancels(self) -> None:
+        """Forward cancel requests to the executing runs."""
+        while True:
+            await asyncio.sleep(self._cancel_poll_interval)
+            run_ids = [
+                run_id for run_id in self._running if run_id not in self._cancelled
+            ]
+            if not run_ids:
+                continue
+            try:
+                requested = await self._broker.cancel_requests(run_ids)
+            except Exception:
+                logger.warning("Checking for cancel requests failed", exc_info=True)
+                continue
+            for run_id in requested:
+                if run_id not in self._running:
+                    continue
+                self._cancelled.add(run_id)
+                controller = self._running[run_id]
+                if controller is not None:
+                    # Runs whose callback has not started yet are cancelled
+                    # as it starts.
+                    controller._request_cancel("disconnect")
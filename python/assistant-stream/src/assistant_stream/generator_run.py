@@ -0,0 +1,125 @@
+import asyncio
+from typing import Any, AsyncGenerator, Callable, List, Sequence, Union
+
+from assistant_stream.assistant_stream_chunk import (
+    AssistantStreamChunk,
+    ErrorChunk,
+    ObjectStreamOperation,
+    UpdateStateChunk,
+)
+from assistant_stream.create_run import ReadOnlyCancellationSignal
+from assistant_stream.state_manager import StateManager
+
+GeneratorRunItem = Union[
+    AssistantStreamChunk, ObjectStreamOperation, List[ObjectStreamOperation]
+]
+
+
+class GeneratorRunController:
+    """Controller handed to `create_run_from_generator` callbacks.
+
+    Chunks are emitted by yielding them from the callback; the controller
+    only carries the run state and the cancellation signal.
+    """
+
+    def __init__(self, state_data: Any | None = None):
+        self._state_chunks: List[UpdateStateChunk] = []
+        self._state_manager = StateManager(self._state_chunks.append, state_data)
+        self._cancelled_event = asyncio.Event()
+        self._cancelled_signal = ReadOnlyCancellationSignal(self._cancelled_event)
+
+    @property
+    def state(self):
+        """State proxy, see `RunController.state`.
+
+        Updates are sent as one update-state chunk ahead of the next yielded
+        chunk.
+        """
+        return self._state_manager.state
+
+    @state.setter
+    def state(self, value):
+        self._state_manager.add_operations(
+            [{"type": "set", "path": [], "value": value}]
+        )
+
+    def append_state_text(
+        self, path: Sequence[Union[str, int]], text_delta: str
+    ) -> None:
+        """Append a text delta at a state path using an append-text operation."""
+        self._state_manager.append_text(path, text_delta)
+
+    @property
+    def cancelled_event(self) -> ReadOnlyCancellationSignal:
+        """Expose cancellation signal for cooperative cancellation."""
+        return self._cancelled_signal
+
+    @property
+    def is_cancelled(self) -> bool:
+        """Return whether this run has been cancelled."""
+        return self._cancelled_event.is_set()
+
+    def _take_state_chunks(self) -> List[UpdateStateChunk]:
+        self._state_manager.flush()
+        chunks = self._state_chunks.copy()
+        self._state_chunks.clear()
+        return chunks
+
+
+async def create_run_from_generator(
+    callback: Callable[[GeneratorRunController], AsyncGenerator[GeneratorRunItem, None]],
+    *,
+    state: Any | None = None,
+) -> AsyncGenerator[AssistantStreamChunk, None]:
+    """Stream the chunks yielded by the async generator `callback`.
+
+    A lighter alternative to `create_run` for linear producers: the
+    generator is pulled directly by the stream reader, with no background
+    task, buffer or cross-task handoff per chunk. Besides chunks, the
+    generator may yield a state operation or a list of them, which is
+    equivalent to applying them through `controller.state`.
+
+    Errors raised by the generator are emitted as an error chunk and then
+    re-raised. When the reader stops early, `controller.is_cancelled` is set
+    and the generator is closed at the `yield` it is suspended on.
+
+    Example:
+        async def run(controller):
+            async for token in llm.stream(prompt):
+                yield TextDeltaChunk(text_delta=token)
+            yield {"type": "set", "path": ["status"], "value": "done"}
+
+        create_run_from_generator(run, state={"status": "running"})
+    """
+    controller = GeneratorRunController(state)
+    generator = callback(controller)
+    state_manager = controller._state_manager
+    finished = False
+
+    try:
+        try:
+            async for item in generator:
+                if isinstance(item, dict):
+                    state_manager.add_operations([item])
+                    continue
+                if isinstance(item, list):
+                    state_manager.add_operations(item)
+                    continue
+                # Keep state operations ahead of the chunk, like create_run does.
+                if state_manager._pending_operations or controller._state_chunks:
+                    for state_chunk in controller._take_state_chunks():
+                        yield state_chunk
+                yield item
+        except Exception as e:
+            finished = True
+            for state_chunk in controller._take_state_chunks():
+                yield state_chunk
+            yield ErrorChunk(error=str(e))
+            raise
+        finished = True
+        for state_chunk in controller._take_state_chunks():
+            yield state_chunk
+    finally:
+        if not finished:
+            controller._cancelled_event.set()
+            await generator.aclose()
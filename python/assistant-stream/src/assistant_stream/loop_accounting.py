@@ -0,0 +1,84 @@
+import asyncio
+import collections.abc
+import time
+from typing import Any, Coroutine, Optional
+
+
+class LoopTimeAccount:
+    """Event loop time consumed by the tasks of one run.
+
+    `total` sums the time spent inside task steps of the coroutines wrapped
+    with `AccountedCoroutine`. With a `time_slice`, `checkpoint()` yields to
+    the loop once the current step has run longer than the slice, so a busy
+    run gives other runs on the loop a turn.
+    """
+
+    __slots__ = ("total", "time_slice", "in_step", "_step_started")
+
+    def __init__(self, time_slice: Optional[float] = None):
+        if time_slice is not None and time_slice <= 0:
+            raise ValueError("time_slice must be positive")
+        self.total = 0.0
+        self.time_slice = time_slice
+        # Whether one of the run's task steps is executing right now.
+        self.in_step = False
+        self._step_started = time.perf_counter()
+
+    def start_step(self) -> float:
+        self.in_step = True
+        self._step_started = started = time.perf_counter()
+        return started
+
+    def end_step(self, started: float) -> None:
+        self.in_step = False
+        self.total += time.perf_counter() - started
+
+    def slice_exceeded(self) -> bool:
+        """Whether the running step has used up its time slice."""
+        return (
+            self.time_slice is not None
+            and time.perf_counter() - self._step_started >= self.time_slice
+        )
+
+    async def checkpoint(self) -> None:
+        """Yield to the event loop if the time slice is used up."""
+        if self.slice_exceeded():
+            await asyncio.sleep(0)
+
+
+class AccountedCoroutine(collections.abc.Coroutine):
+    """Coroutine wrapper charging each task step to a `LoopTimeAccount`."""
+
+    __slots__ = ("_coro", "_account")
+
+    def __init__(self, coro: Coroutine[Any, Any, Any], account: LoopTimeAccount):
+        self._coro = coro
+        self._account = account
+
+    def send(self, value: Any) -> Any:
+        account = self._account
+        started = account.start_step()
+        try:
+            return self._coro.send(value)
+        finally:
+            account.end_step(started)
+
+    def throw(self, *args: Any) -> Any:
+        account = self._account
+        started = account.start_step()
+        try:
+            return self._coro.throw(*args)
+        finally:
+            account.end_step(started)
+
+    def close(self) -> None:
+        self._coro.close()
+
+    def __next__(self) -> Any:
+        return self.send(None)
+
+    def __await__(self):
+        return self
+
+    def __iter__(self):
+        return self
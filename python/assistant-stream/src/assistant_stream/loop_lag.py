@@ -0,0 +1,249 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    # Avoid circular import
+    from assistant_stream.create_run import RunController
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class LoopStall:
+    """One period during which the event loop was blocked.
+
+    `run_id` is the run whose callback or substream was executing when the
+    stall was sampled; with `chunk_type` set, the run's stream reader was
+    processing (e.g. encoding) that chunk instead. Both are None when the
+    blocking code did not belong to a monitored run, or the stall ended
+    before the watchdog sampled it.
+    """
+
+    lag: float
+    run_id: Optional[str] = None
+    chunk_type: Optional[str] = None
+    stack: Optional[str] = None
+
+
+class LoopLagMonitor:
+    """Measures event loop scheduling delay and reports stalls.
+
+    A heartbeat callback rescheduled every `interval` seconds measures how
+    late it runs. A watchdog thread notices a missing heartbeat while the
+    loop is still blocked, and samples the loop thread's stack and the
+    monitored run responsible. Once the loop recovers, stalls longer than
+    `threshold` are logged with that information and passed to `on_stall`.
+
+    Pass the monitor to `create_run(lag_monitor=...)` to have stalls
+    attributed to runs. Each event loop running monitored runs gets its own
+    heartbeat and watchdog, started with the loop's first run and stopped
+    once its last run finishes. Call `start()` to keep a loop monitored
+    between runs.
+
+    Example:
+        lag_monitor = LoopLagMonitor(threshold=0.1)
+        create_run(callback, lag_monitor=lag_monitor)
+
+    Args:
+        interval: Seconds between heartbeats.
+        threshold: Lag in seconds from which a delay counts as a stall.
+        on_stall: Called on the loop with each `LoopStall`.
+        capture_stack: Whether to sample the stack of the blocked loop.
+    """
+
+    def __init__(
+        self,
+        *,
+        interval: float = 0.05,
+        threshold: float = 0.1,
+        on_stall: Optional[Callable[[LoopStall], None]] = None,
+        capture_stack: bool = True,
+    ):
+        if interval <= 0 or threshold <= 0:
+            raise ValueError("interval and threshold must be positive")
+        self._interval = interval
+        self._threshold = threshold
+        self._on_stall = on_stall
+        self._capture_stack = capture_stack
+        self._watches: Dict[asyncio.AbstractEventLoop, "_LoopWatch"] = {}
+        # Watch of the loop each tracked run executes on.
+        self._run_watches: Dict[str, "_LoopWatch"] = {}
+        self.max_lag = 0.0
+        self.stall_count = 0
+
+    @property
+    def running(self) -> bool:
+        """Whether any event loop is being monitored."""
+        return bool(self._watches)
+
+    def start(self) -> None:
+        """Start monitoring the running event loop until `stop()`."""
+        loop = asyncio.get_running_loop()
+        watch = self._watches.get(loop)
+        if watch is not None:
+            if not watch.auto_stop:
+                raise RuntimeError("LoopLagMonitor is already running")
+            watch.auto_stop = False
+            return
+        self._watches[loop] = _LoopWatch(self, loop, auto_stop=False)
+
+    def stop(self) -> None:
+        """Stop monitoring every loop. Call on a monitored loop."""
+        watches = list(self._watches.values())
+        self._watches.clear()
+        self._run_watches.clear()
+        for watch in watches:
+            watch.stop()
+        for watch in watches:
+            watch.join()
+
+    def _track(self, controller: "RunController") -> None:
+        loop = asyncio.get_running_loop()
+        watch = self._watches.get(loop)
+        if watch is None:
+            watch = self._watches[loop] = _LoopWatch(self, loop, auto_stop=True)
+        watch.runs[controller.run_id] = controller
+        self._run_watches[controller.run_id] = watch
+
+    def _untrack(self, controller: "RunController") -> None:
+        watch = self._run_watches.pop(controller.run_id, None)
+        if watch is None:
+            return
+        watch.runs.pop(controller.run_id, None)
+        watch.readers.pop(controller.run_id, None)
+        if watch.auto_stop and not watch.runs:
+            # The watchdog exits on its own; joining would block the loop.
+            self._watches.pop(watch.loop, None)
+            watch.stop()
+
+    def _chunk_handed_out(self, run_id: str, chunk_type: str) -> None:
+        watch = self._run_watches.get(run_id)
+        if watch is not None:
+            watch.readers[run_id] = (chunk_type, asyncio.current_task())
+
+    def _chunk_done(self, run_id: str) -> None:
+        watch = self._run_watches.get(run_id)
+        if watch is not None:
+            watch.readers.pop(run_id, None)
+
+    def _report(self, lag: float, sample) -> None:
+        if lag > self.max_lag:
+            self.max_lag = lag
+        if lag < self._threshold:
+            return
+        run_id, chunk_type, stack = sample or (None, None, None)
+        stall = LoopStall(lag=lag, run_id=run_id, chunk_type=chunk_type, stack=stack)
+        self.stall_count += 1
+        if run_id is None:
+            culprit = ""
+        elif chunk_type is None:
+            culprit = f" by run {run_id}"
+        else:
+            culprit = f" by run {run_id} processing a {chunk_type} chunk"
+        if stack:
+            logger.warning("Event loop blocked for %.3fs%s:\n%s", lag, culprit, stack)
+        else:
+            logger.warning("Event loop blocked for %.3fs%s", lag, culprit)
+        if self._on_stall is not None:
+            self._on_stall(stall)
+
+
+class _LoopWatch:
+    """Heartbeat and watchdog thread of a `LoopLagMonitor` on one loop."""
+
+    def __init__(
+        self,
+        monitor: LoopLagMonitor,
+        loop: asyncio.AbstractEventLoop,
+        *,
+        auto_stop: bool,
+    ):
+        self.monitor = monitor
+        self.loop = loop
+        # Whether to stop once the last tracked run on the loop finishes.
+        self.auto_stop = auto_stop
+        self.runs: Dict[str, "RunController"] = {}
+        # Chunk type and task of chunks handed to stream readers, by run id.
+        self.readers: Dict[str, Tuple[str, Optional[asyncio.Task]]] = {}
+        self._loop_thread_id = threading.get_ident()
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._expected = 0.0
+        self._last_tick = time.monotonic()
+        self._ticks = 0
+        self._sampled_tick = -1
+        # (run_id, chunk_type, stack) taken by the watchdog during a stall.
+        self._sample: Optional[tuple] = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._schedule()
+        self._watchdog = threading.Thread(
+            target=self._watch, name="assistant-stream-lag-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._handle is None or self._handle.cancelled():
+            return
+        self._handle.cancel()
+        on_loop = threading.get_ident() == self._loop_thread_id
+        if on_loop and self.loop.time() >= self._expected:
+            # Report the stall an overdue heartbeat has not measured yet.
+            self._tick()
+
+    def join(self) -> None:
+        self._watchdog.join()
+
+    def _schedule(self) -> None:
+        self._expected = self.loop.time() + self.monitor._interval
+        self._handle = self.loop.call_at(self._expected, self._tick)
+
+    def _tick(self) -> None:
+        lag = self.loop.time() - self._expected
+        with self._lock:
+            self._last_tick = time.monotonic()
+            self._ticks += 1
+            sample, self._sample = self._sample, None
+        self.monitor._report(lag, sample)
+        if not self._stopped.is_set():
+            self._schedule()
+
+    def _watch(self) -> None:
+        interval = self.monitor._interval
+        limit = interval + self.monitor._threshold
+        while not self._stopped.wait(interval / 2):
+            with self._lock:
+                if self._sampled_tick == self._ticks:
+                    continue
+                if time.monotonic() - self._last_tick < limit:
+                    continue
+                self._sampled_tick = self._ticks
+                self._sample = self._take_sample()
+
+    def _take_sample(self):
+        """Sample the blocked loop thread. Runs on the watchdog thread."""
+        stack = None
+        if self.monitor._capture_stack:
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is not None:
+                stack = "".join(traceback.format_stack(frame))
+        # The loop is blocked, so the run bookkeeping is not changing under us.
+        for run_id, controller in list(self.runs.items()):
+            account = controller._loop_account
+            if account is not None and account.in_step:
+                return run_id, None, stack
+        try:
+            task = asyncio.current_task(self.loop)
+        except RuntimeError:
+            task = None
+        if task is not None:
+            for run_id, (chunk_type, reader) in list(self.readers.items()):
+                if reader is task:
+                    return run_id, chunk_type, stack
+        return None, None, stack
@@ -0,0 +1,72 @@
+import tracemalloc
+from dataclasses import dataclass
+from typing import List, Optional
+
+
+class RunMemoryLimitError(Exception):
+    """Raised when a run's approximate memory use exceeds `max_memory_bytes`."""
+
+
+@dataclass(frozen=True)
+class RunMemoryUsage:
+    """Approximate bytes held by one run.
+
+    Sizes are estimated like the chunk buffer limits are: roughly the
+    encoded size of the values, not Python object overhead. `traced_bytes`
+    is only set for runs started with `trace_memory=True`; it is the growth
+    of all memory traced by tracemalloc since the run started, so it also
+    includes allocations of other code running meanwhile.
+    """
+
+    state_bytes: int
+    queued_bytes: int
+    substream_bytes: int
+    traced_bytes: Optional[int] = None
+
+    @property
+    def total(self) -> int:
+        """Sum of the state, queued chunk and substream buffer estimates."""
+        return self.state_bytes + self.queued_bytes + self.substream_bytes
+
+
+class MemoryTrace:
+    """tracemalloc snapshot taken when a run starts, for debugging.
+
+    Starts tracemalloc if it is not running, and stops it again once the
+    last trace that started it is closed.
+    """
+
+    _open = 0
+    _started_tracing = False
+
+    def __init__(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            MemoryTrace._started_tracing = True
+        MemoryTrace._open += 1
+        self._closed = False
+        self._start_bytes = tracemalloc.get_traced_memory()[0]
+        self._snapshot = tracemalloc.take_snapshot()
+
+    def traced_bytes(self) -> int:
+        """Growth of traced memory since the run started."""
+        if self._closed or not tracemalloc.is_tracing():
+            return 0
+        return tracemalloc.get_traced_memory()[0] - self._start_bytes
+
+    def top_allocations(self, limit: int = 10) -> List[str]:
+        """Source lines whose allocations grew the most since the run started."""
+        if self._closed or not tracemalloc.is_tracing():
+            return []
+        stats = tracemalloc.take_snapshot().compare_to(self._snapshot, "lineno")
+        return [str(stat) for stat in stats[:limit]]
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._snapshot = None
+        MemoryTrace._open -= 1
+        if MemoryTrace._open == 0 and MemoryTrace._started_tracing:
+            MemoryTrace._started_tracing = False
+            tracemalloc.stop()
@@ -1,11 +1,14 @@
 import asyncio
-from typing import Any, AsyncGenerator
+import threading
+from collections import deque
+from typing import Any, AsyncGenerator, Callable, Deque, Optional
 from assistant_stream.assistant_stream_chunk import (
     AssistantStreamChunk,
     ToolCallBeginChunk,
     ToolCallDeltaChunk,
     ToolResultChunk,
 )
+from assistant_stream.chunk_queue import approximate_chunk_size
 import string
 import random
 
@@ -18,18 +21,32 @@ def generate_openai_style_tool_call_id():
 
 
 class ToolCallController:
-    def __init__(self, queue, tool_name: str, tool_call_id: str, parent_id: str = None):
+    def __init__(
+        self,
+        queue,
+        tool_name: str,
+        tool_call_id: str,
+        parent_id: str = None,
+        choice_index: int = 0,
+    ):
         self.tool_name = tool_name
         self.tool_call_id = tool_call_id
         self.queue = queue
         self.loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._on_response: Optional[Callable[[str], None]] = None
+        self._on_closed: Optional[Callable[[], None]] = None
+        # Approximate size of the chunks not yet read from `queue`.
+        self.buffered_bytes = 0
+        self._sizes: Deque[int] = deque()
 
         begin_chunk = ToolCallBeginChunk(
             tool_call_id=self.tool_call_id,
             tool_name=self.tool_name,
             parent_id=parent_id,
+            choice_index=choice_index,
         )
-        self.queue.put_nowait(begin_chunk)
+        self._enqueue(begin_chunk)
 
     def append_args_text(self, args_text_delta: str) -> None:
         """Append an args text delta to the stream."""
@@ -37,7 +54,7 @@ class ToolCallController:
             tool_call_id=self.tool_call_id,
             args_text_delta=args_text_delta,
         )
-        self.loop.call_soon_threadsafe(self.queue.put_nowait, chunk)
+        self._put(chunk)
 
     def set_result(self, result: Any) -> None:
         """
@@ -65,28 +82,53 @@ class ToolCallController:
             artifact=artifact,
             is_error=is_error,
         )
-        self.loop.call_soon_threadsafe(self.queue.put_nowait, chunk)
+        self._put(chunk)
         self.close()
+        if self._on_response is not None:
+            self._on_response(self.tool_call_id)
 
     def close(self) -> None:
         """Close the stream."""
-        self.loop.call_soon_threadsafe(self.queue.put_nowait, None)
+        self._put(None)
+
+    def _put(self, chunk) -> None:
+        if threading.get_ident() == self._loop_thread_id:
+            self._enqueue(chunk)
+        else:
+            self.loop.call_soon_threadsafe(self._enqueue, chunk)
+
+    def _enqueue(self, chunk) -> None:
+        size = 0 if chunk is None else approximate_chunk_size(chunk)
+        self.buffered_bytes += size
+        self._sizes.append(size)
+        self.queue.put_nowait(chunk)
+
+    def _dequeued(self) -> None:
+        self.buffered_bytes -= self._sizes.popleft()
 
 
 async def create_tool_call(
     tool_name: str,
     tool_call_id: str,
     parent_id: str = None,
+    choice_index: int = 0,
 ) -> tuple[AsyncGenerator[AssistantStreamChunk, None], ToolCallController]:
     queue = asyncio.Queue()
-    controller = ToolCallController(queue, tool_name, tool_call_id, parent_id)
+    controller = ToolCallController(
+        queue, tool_name, tool_call_id, parent_id, choice_index
+    )
 
     async def stream():
-        while True:
-            chunk = await controller.queue.get()
-            if chunk is None:
-                break
-            yield chunk
-            controller.queue.task_done()
+        try:
+            while True:
+                chunk = await controller.queue.get()
+                controller._dequeued()
+                if chunk is None:
+                    break
+                yield chunk
+                controller.queue.task_done()
+        finally:
+            if controller._on_closed is not None:
+                controller._on_closed()
 
     return stream(), controller
@@ -0,0 +1,583 @@
+import asyncio
+import copy
+import logging
+import multiprocessing
+import os
+import pickle
+import struct
+import threading
+from multiprocessing.connection import Connection
+from typing import (
+    Any,
+    AsyncGenerator,
+    Callable,
+    Coroutine,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Union,
+)
+
+from assistant_stream.assistant_stream_chunk import AssistantStreamChunk
+from assistant_stream.create_run import (
+    ReadOnlyCancellationSignal,
+    RunController,
+    create_run,
+)
+from assistant_stream.modules.tool_call import generate_openai_style_tool_call_id
+from assistant_stream.state_manager import StateManager
+
+logger = logging.getLogger(__name__)
+
+# Controller methods a worker may call on the parent's `RunController`.
+_RUN_METHODS = frozenset(
+    {
+        "append_text",
+        "append_reasoning",
+        "add_tool_result",
+        "add_data",
+        "add_error",
+        "add_source",
+    }
+)
+_TOOL_CALL_METHODS = frozenset({"append_args_text", "set_response", "close"})
+
+# Bytes read from a pipe per readable event.
+_READ_SIZE = 64 * 1024
+
+# Messages read ahead of the run before the pipe is left to fill up, which
+# blocks the worker's sends until the run's consumer catches up.
+_MAX_INBOX = 64
+
+
+class WorkerRunError(RuntimeError):
+    """A callback running in a process pool worker raised, or the worker died."""
+
+
+class ProcessRunController:
+    """Stand-in for `RunController` inside a process pool worker.
+
+    Emit calls are sent to the parent process, which replays them on the
+    run's real controller, so chunks and state updates reach the stream in
+    the order they were made. State reads are served from a local copy.
+    """
+
+    def __init__(self, conn: Connection, state_data: Any):
+        self._conn = conn
+        self._state_manager = StateManager(self._send_state, state_data)
+        self._cancelled_event = asyncio.Event()
+        self._cancelled_signal = ReadOnlyCancellationSignal(self._cancelled_event)
+        self._choice_index = 0
+
+    def choice(self, index: int) -> "ProcessRunController":
+        """Handle emitting the `index`-th choice, like `RunController.choice`."""
+        if index < 0:
+            raise ValueError("choice index must not be negative")
+        controller = copy.copy(self)
+        controller._choice_index = index
+        return controller
+
+    def append_text(self, text_delta: str) -> None:
+        """Append a text delta to the stream."""
+        self._call("append_text", text_delta)
+
+    def append_reasoning(self, reasoning_delta: str) -> None:
+        """Append a reasoning delta to the stream."""
+        self._call("append_reasoning", reasoning_delta)
+
+    def append_state_text(
+        self, path: Sequence[Union[str, int]], text_delta: str
+    ) -> None:
+        """Append a text delta at a state path using an append-text operation."""
+        self._state_manager.append_text(path, text_delta)
+
+    async def add_tool_call(
+        self, tool_name: str, tool_call_id: Optional[str] = None
+    ) -> "ProcessToolCallController":
+        """Add a tool call to the stream."""
+        if tool_call_id is None:
+            tool_call_id = generate_openai_style_tool_call_id()
+        self._state_manager.flush()
+        self._conn.send(
+            ("tool-call-begin", tool_call_id, tool_name, self._choice_index)
+        )
+        return ProcessToolCallController(self, tool_name, tool_call_id)
+
+    def add_tool_result(self, tool_call_id: str, result: Any) -> None:
+        """Add a tool result to the stream."""
+        self._call("add_tool_result", tool_call_id, result)
+
+    def add_data(self, data: Any) -> None:
+        """Emit an event to the main stream."""
+        self._call("add_data", data)
+
+    def add_error(self, error: str) -> None:
+        """Emit an error to the main stream."""
+        self._call("add_error", error)
+
+    def add_source(self, id: str, url: str, title: Optional[str] = None) -> None:
+        """Add a source to the stream."""
+        self._call("add_source", id, url, title)
+
+    @property
+    def state(self):
+        """State proxy, see `RunController.state`."""
+        return self._state_manager.state
+
+    @state.setter
+    def state(self, value):
+        self._state_manager.add_operations(
+            [{"type": "set", "path": [], "value": value}]
+        )
+
+    @property
+    def cancelled_event(self) -> ReadOnlyCancellationSignal:
+        """Expose cancellation signal for cooperative cancellation."""
+        return self._cancelled_signal
+
+    @property
+    def is_cancelled(self) -> bool:
+        """Return whether this run has been cancelled."""
+        return self._cancelled_event.is_set()
+
+    def _call(self, method: str, *args: Any) -> None:
+        self._state_manager.flush()
+        self._conn.send(("call", method, args, self._choice_index))
+
+    def _send_state(self, chunk) -> None:
+        self._conn.send(("state", chunk.operations))
+
+
+class ProcessToolCallController:
+    """Stand-in for `ToolCallController` inside a process pool worker."""
+
+    def __init__(
+        self, controller: ProcessRunController, tool_name: str, tool_call_id: str
+    ):
+        self._controller = controller
+        self.tool_name = tool_name
+        self.tool_call_id = tool_call_id
+
+    def append_args_text(self, args_text_delta: str) -> None:
+        """Append an args text delta to the stream."""
+        self._call("append_args_text", args_text_delta)
+
+    def set_response(
+        self, result: Any, *, artifact: Any | None = None, is_error: bool = False
+    ) -> None:
+        """Set the result of the tool call."""
+        self._call("set_response", result, artifact, is_error)
+
+    def close(self) -> None:
+        """Close the stream."""
+        self._call("close")
+
+    def _call(self, method: str, *args: Any) -> None:
+        self._controller._state_manager.flush()
+        self._controller._conn.send(("tool-call", self.tool_call_id, method, args))
+
+
+class _MessageReader:
+    """Reassembles messages sent with `Connection.send` from raw pipe reads.
+
+    `Connection.recv` blocks until a whole message has arrived, which stalls
+    the event loop while a large one is still being written. This reads only
+    what is available and unpickles the messages once they are complete.
+    """
+
+    def __init__(self, conn: Connection) -> None:
+        self._fd = conn.fileno()
+        self._buffer = bytearray()
+
+    def read(self) -> List[Any]:
+        """Read the available bytes and return the messages they complete.
+
+        Raises:
+            EOFError: The other end of the pipe was closed.
+        """
+        data = os.read(self._fd, _READ_SIZE)
+        if not data:
+            raise EOFError
+        buffer = self._buffer
+        buffer += data
+        messages = []
+        start = 0
+        while len(buffer) - start >= 4:
+            # `Connection` frames each pickle with a signed 4-byte big-endian
+            # length, or -1 followed by an 8-byte length for huge messages.
+            (size,) = struct.unpack_from("!i", buffer, start)
+            header = 4
+            if size == -1:
+                if len(buffer) - start < 12:
+                    break
+                (size,) = struct.unpack_from("!Q", buffer, start + 4)
+                header = 12
+            end = start + header + size
+            if len(buffer) < end:
+                break
+            messages.append(pickle.loads(buffer[start + header : end]))
+            start = end
+        del buffer[:start]
+        return messages
+
+
+class _Worker:
+    """Parent-side handle of one worker process."""
+
+    def __init__(self, context) -> None:
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child_conn,), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self._reader = _MessageReader(self.conn)
+        self._send_lock = threading.Lock()
+        self._inbox: Optional[asyncio.Queue] = None
+        self._paused = False
+        # Number of the current run, so messages about an earlier one are
+        # recognised as stale.
+        self.runs = 0
+
+    def start_reading(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._inbox = asyncio.Queue()
+        self._paused = False
+        loop.add_reader(self.conn.fileno(), self._on_readable)
+
+    def stop_reading(self) -> None:
+        asyncio.get_running_loop().remove_reader(self.conn.fileno())
+        self._inbox = None
+
+    async def recv(self) -> tuple:
+        message = await self._inbox.get()
+        if self._paused and self._inbox.qsize() < _MAX_INBOX // 2:
+            self._paused = False
+            asyncio.get_running_loop().add_reader(
+                self.conn.fileno(), self._on_readable
+            )
+        return message
+
+    async def send(self, message: tuple) -> None:
+        # Pickling and writing e.g. a large run state happens off the loop,
+        # as does waiting for a busy worker to drain the pipe.
+        await asyncio.to_thread(self.send_blocking, message)
+
+    def send_blocking(self, message: tuple, timeout: float = -1) -> bool:
+        """Send from any thread. Returns False if the pipe stayed busy."""
+        if not self._send_lock.acquire(timeout=timeout):
+            return False
+        try:
+            self.conn.send(message)
+        finally:
+            self._send_lock.release()
+        return True
+
+    def _on_readable(self) -> None:
+        try:
+            messages = self._reader.read()
+        except (EOFError, OSError):
+            asyncio.get_running_loop().remove_reader(self.conn.fileno())
+            self._inbox.put_nowait(("exited",))
+            return
+        for message in messages:
+            self._inbox.put_nowait(message)
+        if self._inbox.qsize() >= _MAX_INBOX:
+            self._paused = True
+            asyncio.get_running_loop().remove_reader(self.conn.fileno())
+
+    def kill(self) -> None:
+        self.conn.close()
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=1)
+
+
+class RunProcessPool:
+    """Pool of worker processes running CPU-heavy run callbacks.
+
+    Use with `create_process_run`. Each worker runs one callback at a time
+    on its own event loop, so CPU-bound work no longer blocks the loop
+    serving every other stream. Workers are started lazily, with the
+    "spawn" start method unless another multiprocessing context is given,
+    and are reused across runs.
+
+    Args:
+        max_workers: Number of worker processes. Defaults to the CPU count.
+        mp_context: Multiprocessing context to start workers with.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, *, mp_context=None):
+        if max_workers is not None and max_workers <= 0:
+            raise ValueError("max_workers must be positive")
+        self._max_workers = max_workers or os.cpu_count() or 1
+        self._context = mp_context or multiprocessing.get_context("spawn")
+        self._workers: List[_Worker] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._closed = False
+
+    async def _acquire(self) -> _Worker:
+        if self._closed:
+            raise RuntimeError("RunProcessPool is closed")
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+        if self._idle.empty() and len(self._workers) < self._max_workers:
+            worker = _Worker(self._context)
+            self._workers.append(worker)
+            return worker
+        return await self._idle.get()
+
+    def _release(self, worker: _Worker) -> None:
+        if self._closed:
+            self._discard(worker)
+        else:
+            self._idle.put_nowait(worker)
+
+    def _discard(self, worker: _Worker) -> None:
+        if worker in self._workers:
+            self._workers.remove(worker)
+        worker.kill()
+
+    def close(self) -> None:
+        """Stop every worker. Runs still in progress fail."""
+        self._closed = True
+        for worker in list(self._workers):
+            try:
+                if worker.send_blocking(("stop",), timeout=1):
+                    worker.process.join(timeout=1)
+            except OSError:
+                pass
+            self._discard(worker)
+
+    def __enter__(self) -> "RunProcessPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+async def create_process_run(
+    callback: Callable[[ProcessRunController], Coroutine[Any, Any, None]],
+    *,
+    pool: RunProcessPool,
+    **run_options: Any,
+) -> AsyncGenerator[AssistantStreamChunk, None]:
+    """Like `create_run`, with the callback running in a `RunProcessPool` worker.
+
+    `callback` must be picklable, i.e. a module-level coroutine function,
+    and receives a `ProcessRunController` with the emit methods, `state`
+    and cancel signal of `RunController`. The initial state is copied to
+    the worker. Cancelling the run (e.g. a client disconnect) sets the
+    worker's cancel signal and, after the grace period, cancels the
+    callback there too. An exception raised in the worker fails the run
+    with `WorkerRunError`.
+
+    Example:
+        pool = RunProcessPool(max_workers=4)
+
+        async def rerank(controller):
+            for doc in score_documents(controller.state["query"]):
+                controller.append_text(doc)
+
+        create_process_run(rerank, pool=pool, state={"query": query})
+
+    Args:
+        callback: Coroutine function receiving the `ProcessRunController`.
+        pool: Pool whose workers run the callback.
+        **run_options: Passed to `create_run`.
+    """
+
+    async def forward(controller: RunController) -> None:
+        await _forward(pool, controller, callback)
+
+    async for chunk in create_run(forward, **run_options):
+        yield chunk
+
+
+async def _forward(
+    pool: RunProcessPool, controller: RunController, callback: Callable
+) -> None:
+    worker = await pool._acquire()
+    worker.start_reading()
+    worker.runs += 1
+    run_number = worker.runs
+    run_sent = asyncio.ensure_future(
+        worker.send(
+            (
+                "run",
+                run_number,
+                callback,
+                controller._state_manager.state_data,
+                controller._cancel_grace_period,
+            )
+        )
+    )
+    cancel_watcher = None
+    tool_calls: Dict[str, Any] = {}
+    finished = False
+    try:
+        # Shielded so a cancel sent afterwards never overtakes the run.
+        await asyncio.shield(run_sent)
+
+        async def forward_cancel() -> None:
+            await controller.cancelled_event.wait()
+            # May still be written after the run ended; the worker ignores
+            # cancels for runs other than its current one.
+            await worker.send(("cancel", run_number))
+
+        cancel_watcher = asyncio.create_task(forward_cancel())
+        while True:
+            message = await worker.recv()
+            kind = message[0]
+            if kind == "call" and message[1] in _RUN_METHODS:
+                target = controller.choice(message[3]) if message[3] else controller
+                getattr(target, message[1])(*message[2])
+            elif kind == "state":
+                controller._state_manager.add_operations(message[1])
+            elif kind == "tool-call-begin":
+                target = controller.choice(message[3]) if message[3] else controller
+                tool_calls[message[1]] = await target.add_tool_call(
+                    message[2], message[1]
+                )
+            elif kind == "tool-call" and message[2] in _TOOL_CALL_METHODS:
+                tool_call = tool_calls[message[1]]
+                if message[2] == "set_response":
+                    result, artifact, is_error = message[3]
+                    tool_call.set_response(result, artifact=artifact, is_error=is_error)
+                else:
+                    getattr(tool_call, message[2])(*message[3])
+            elif kind == "done":
+                finished = True
+                return
+            elif kind == "cancelled":
+                finished = True
+                raise asyncio.CancelledError()
+            elif kind == "error":
+                finished = True
+                raise WorkerRunError(f"{message[1]}: {message[2]}")
+            elif kind == "exited":
+                finished = True
+                pool._discard(worker)
+                raise WorkerRunError("Process pool worker exited unexpectedly")
+            else:
+                raise WorkerRunError(f"Unexpected message from worker: {kind!r}")
+            # Let the client's backpressure reach the worker: while the run's
+            # buffer is full no more messages are read.
+            await controller.drain()
+    finally:
+        if cancel_watcher is not None:
+            cancel_watcher.cancel()
+        if finished:
+            if worker.process.is_alive():
+                worker.stop_reading()
+                pool._release(worker)
+        else:
+            # Interrupted mid-run: tell the worker, and reuse it once it has
+            # wound the callback down.
+            asyncio.create_task(_reclaim(pool, worker, run_sent, run_number))
+
+
+async def _reclaim(
+    pool: RunProcessPool,
+    worker: _Worker,
+    run_sent: asyncio.Future,
+    run_number: int,
+) -> None:
+    try:
+        await run_sent
+        await worker.send(("cancel", run_number))
+    except OSError:
+        pass  # The worker is gone; its reader reports "exited".
+    except Exception:
+        # The run could not be pickled, so the worker never received it.
+        worker.stop_reading()
+        pool._release(worker)
+        return
+    while True:
+        kind = (await worker.recv())[0]
+        if kind == "exited":
+            pool._discard(worker)
+            return
+        if kind in ("done", "cancelled", "error"):
+            worker.stop_reading()
+            pool._release(worker)
+            return
+
+
+def _worker_main(conn: Connection) -> None:
+    asyncio.run(_serve(conn))
+
+
+async def _serve(conn: Connection) -> None:
+    loop = asyncio.get_running_loop()
+    inbox: asyncio.Queue = asyncio.Queue()
+    reader = _MessageReader(conn)
+
+    def on_readable() -> None:
+        try:
+            messages = reader.read()
+        except (EOFError, OSError):
+            loop.remove_reader(conn.fileno())
+            inbox.put_nowait(("stop",))
+            return
+        for message in messages:
+            inbox.put_nowait(message)
+
+    loop.add_reader(conn.fileno(), on_readable)
+    while True:
+        message = await inbox.get()
+        if message[0] == "stop":
+            return
+        if message[0] == "run":
+            _, run_number, callback, state, grace_period = message
+            if not await _run_job(
+                conn, inbox, run_number, callback, state, grace_period
+            ):
+                return
+        # A "cancel" arriving after its run has finished is ignored.
+
+
+async def _run_job(
+    conn: Connection,
+    inbox: asyncio.Queue,
+    run_number: int,
+    callback: Callable,
+    state: Any,
+    grace_period: float,
+) -> bool:
+    """Run one callback. Returns False when the worker was asked to stop."""
+    controller = ProcessRunController(conn, state)
+    task = asyncio.create_task(callback(controller))
+    keep_serving = True
+    while not task.done():
+        getter = asyncio.ensure_future(inbox.get())
+        await asyncio.wait({task, getter}, return_when=asyncio.FIRST_COMPLETED)
+        if not getter.done():
+            getter.cancel()
+            continue
+        message = getter.result()
+        kind = message[0]
+        if (
+            kind == "cancel"
+            and message[1] == run_number
+            and not controller.is_cancelled
+        ):
+            controller._cancelled_event.set()
+            asyncio.get_running_loop().call_later(grace_period, task.cancel)
+        elif kind == "stop":
+            keep_serving = False
+            task.cancel()
+
+    try:
+        controller._state_manager.flush()
+        if task.cancelled():
+            conn.send(("cancelled",))
+        elif task.exception() is not None:
+            error = task.exception()
+            conn.send(("error", type(error).__name__, str(error)))
+        else:
+            conn.send(("done",))
+    except OSError:
+        return False
+    return keep_serving
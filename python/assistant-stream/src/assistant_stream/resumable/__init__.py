@@ -0,0 +1,35 @@
+from assistant_stream.resumable.context import ResumableStreamContext
+from assistant_stream.resumable.errors import (
+    ResumableStreamError,
+    ResumableStreamErrorCode,
+)
+from assistant_stream.resumable.response import (
+    RESUMABLE_STREAM_ID_HEADER,
+    create_resumable_response,
+    create_resume_response,
+)
+from assistant_stream.resumable.store import (
+    ResumableStreamEntry,
+    ResumableStreamRole,
+    ResumableStreamStatus,
+    ResumableStreamStore,
+)
+from assistant_stream.resumable.stores import (
+    InMemoryResumableStreamStore,
+    SQLiteResumableStreamStore,
+)
+
+__all__ = [
+    "ResumableStreamContext",
+    "ResumableStreamError",
+    "ResumableStreamErrorCode",
+    "ResumableStreamEntry",
+    "ResumableStreamRole",
+    "ResumableStreamStatus",
+    "ResumableStreamStore",
+    "InMemoryResumableStreamStore",
+    "SQLiteResumableStreamStore",
+    "RESUMABLE_STREAM_ID_HEADER",
+    "create_resumable_response",
+    "create_resume_response",
+]
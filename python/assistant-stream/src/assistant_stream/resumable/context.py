@@ -0,0 +1,167 @@
+import asyncio
+import logging
+from typing import (
+    AsyncGenerator,
+    AsyncIterable,
+    Callable,
+    Optional,
+    Set,
+    Union,
+)
+
+from assistant_stream.resumable.errors import ResumableStreamError
+from assistant_stream.resumable.store import (
+    ResumableStreamRole,
+    ResumableStreamStatus,
+    ResumableStreamStore,
+)
+
+logger = logging.getLogger(__name__)
+
+EncodedStream = AsyncIterable[Union[str, bytes]]
+
+
+class ResumableStreamContext:
+    """Makes encoded run streams resumable across client reconnects.
+
+    The first `run` call for a stream id becomes the producer: it drives the
+    stream in a background task and persists every encoded chunk to the
+    store, independent of the client that started it. The returned stream
+    and every `resume` read back from the store, so a reconnecting client
+    replays buffered bytes instead of re-running the LLM call.
+
+    Example:
+        context = ResumableStreamContext(InMemoryResumableStreamStore())
+
+        stream = await context.run(
+            stream_id,
+            lambda: DataStreamEncoder().encode_stream(create_run(callback)),
+        )
+
+        # Later, after a reconnect:
+        stream = await context.resume(stream_id, from_offset=bytes_received)
+
+    Args:
+        store: Where encoded chunks are persisted.
+        ttl: Seconds a stream is kept after its last write. Uses the store's
+            default when None.
+        on_acquire: Called with the stream id and the elected role.
+        on_append: Called with the stream id and size of each persisted chunk.
+        on_finalize: Called with the stream id, final status and error.
+        on_error: Called with the stream id and the exception that failed the
+            producer.
+    """
+
+    def __init__(
+        self,
+        store: ResumableStreamStore,
+        *,
+        ttl: Optional[float] = None,
+        on_acquire: Optional[Callable[[str, ResumableStreamRole], None]] = None,
+        on_append: Optional[Callable[[str, int], None]] = None,
+        on_finalize: Optional[Callable[[str, str, Optional[str]], None]] = None,
+        on_error: Optional[Callable[[str, BaseException], None]] = None,
+    ):
+        self._store = store
+        self._ttl = ttl
+        self._on_acquire = on_acquire
+        self._on_append = on_append
+        self._on_finalize = on_finalize
+        self._on_error = on_error
+        self._producer_tasks: Set[asyncio.Task] = set()
+
+    @property
+    def store(self) -> ResumableStreamStore:
+        return self._store
+
+    async def run(
+        self, stream_id: str, make_stream: Callable[[], EncodedStream]
+    ) -> AsyncGenerator[bytes, None]:
+        """Producer or consumer entrypoint. Atomically elects the role.
+
+        `make_stream` is only called when this call is elected producer.
+        """
+        role = await self._store.acquire(stream_id, ttl=self._ttl)
+        if self._on_acquire is not None:
+            self._on_acquire(stream_id, role)
+        if role == "producer":
+            task = asyncio.create_task(self._produce(stream_id, make_stream))
+            self._producer_tasks.add(task)
+            task.add_done_callback(self._producer_tasks.discard)
+        return self._read(stream_id, 0)
+
+    async def resume(
+        self, stream_id: str, from_offset: int = 0
+    ) -> Optional[AsyncGenerator[bytes, None]]:
+        """Read a stream starting at byte `from_offset`. None when missing."""
+        if await self._store.status(stream_id) == "missing":
+            return None
+        return self._read(stream_id, from_offset)
+
+    async def require_resume(
+        self, stream_id: str, from_offset: int = 0
+    ) -> AsyncGenerator[bytes, None]:
+        """Like `resume`, but raises `ResumableStreamError("missing")`."""
+        stream = await self.resume(stream_id, from_offset)
+        if stream is None:
+            raise ResumableStreamError(
+                "missing", f"resumable stream not found: {stream_id}"
+            )
+        return stream
+
+    async def status(self, stream_id: str) -> ResumableStreamStatus:
+        return await self._store.status(stream_id)
+
+    async def delete(self, stream_id: str) -> None:
+        await self._store.delete(stream_id)
+
+    async def wait_for_producers(self) -> None:
+        """Wait for every producer task started by this context to finish."""
+        if self._producer_tasks:
+            await asyncio.gather(*self._producer_tasks, return_exceptions=True)
+
+    async def _produce(
+        self, stream_id: str, make_stream: Callable[[], EncodedStream]
+    ) -> None:
+        stream = None
+        try:
+            stream = make_stream()
+            async for chunk in stream:
+                data = chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+                if not data:
+                    continue
+                await self._store.append(stream_id, data)
+                if self._on_append is not None:
+                    self._on_append(stream_id, len(data))
+        except (Exception, asyncio.CancelledError) as e:
+            if self._on_error is not None:
+                self._on_error(stream_id, e)
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                try:
+                    await aclose()
+                except Exception:
+                    logger.warning("Resumable stream close failed", exc_info=True)
+            message = str(e) or type(e).__name__
+            try:
+                await self._store.finalize(stream_id, "error", message)
+                if self._on_finalize is not None:
+                    self._on_finalize(stream_id, "error", message)
+            except Exception:
+                logger.warning("Resumable stream finalize failed", exc_info=True)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+        else:
+            await self._store.finalize(stream_id, "done")
+            if self._on_finalize is not None:
+                self._on_finalize(stream_id, "done", None)
+
+    async def _read(
+        self, stream_id: str, from_offset: int
+    ) -> AsyncGenerator[bytes, None]:
+        async for entry in self._store.read(stream_id, from_offset):
+            chunk = entry.chunk
+            if entry.offset < from_offset:
+                chunk = chunk[from_offset - entry.offset :]
+            if chunk:
+                yield chunk
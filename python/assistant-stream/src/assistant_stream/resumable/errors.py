@@ -0,0 +1,25 @@
+import re
+from typing import Literal
+
+ResumableStreamErrorCode = Literal[
+    "missing", "exists", "finalized", "failed", "invalid-id"
+]
+
+_STREAM_ID_PATTERN = re.compile(r"^[A-Za-z0-9_.:-]{1,256}$")
+
+
+class ResumableStreamError(Exception):
+    """Error raised by resumable stream contexts and stores."""
+
+    def __init__(self, code: ResumableStreamErrorCode, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+def validate_stream_id(stream_id: str) -> None:
+    """Raise `ResumableStreamError("invalid-id")` for malformed stream ids."""
+    if not isinstance(stream_id, str) or not _STREAM_ID_PATTERN.match(stream_id):
+        raise ResumableStreamError(
+            "invalid-id",
+            f"Invalid stream_id: {stream_id!r} (must match {_STREAM_ID_PATTERN.pattern})",
+        )
@@ -0,0 +1,67 @@
+from typing import Any, Callable, Coroutine, Dict, Optional
+
+from starlette.responses import JSONResponse, Response, StreamingResponse
+
+from assistant_stream.create_run import RunController, create_run
+from assistant_stream.resumable.context import ResumableStreamContext
+from assistant_stream.serialization.data_stream import DataStreamEncoder
+from assistant_stream.serialization.stream_encoder import StreamEncoder
+
+RESUMABLE_STREAM_ID_HEADER = "x-resumable-stream-id"
+
+
+async def create_resumable_response(
+    context: ResumableStreamContext,
+    stream_id: str,
+    callback: Callable[[RunController], Coroutine[Any, Any, None]],
+    *,
+    encoder: Optional[StreamEncoder] = None,
+    headers: Optional[Dict[str, str]] = None,
+    **run_options: Any,
+) -> StreamingResponse:
+    """Start (or join) a resumable run and stream it to the client.
+
+    The callback only runs when this request is elected producer; otherwise
+    the response tails the run that is already in progress. `run_options` are
+    forwarded to `create_run`. The encoder defaults to `DataStreamEncoder`.
+    """
+    encoder = encoder or DataStreamEncoder()
+    stream = await context.run(
+        stream_id,
+        lambda: encoder.encode_stream(create_run(callback, **run_options)),
+    )
+    return StreamingResponse(
+        stream,
+        media_type=encoder.get_media_type(),
+        headers=_merge_headers(headers, stream_id),
+    )
+
+
+async def create_resume_response(
+    context: ResumableStreamContext,
+    stream_id: str,
+    *,
+    from_offset: int = 0,
+    encoder: Optional[StreamEncoder] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """Replay a resumable run from byte `from_offset`, then tail it.
+
+    The encoder is only consulted for the media type. Responds with a 404
+    JSON body when the stream does not exist.
+    """
+    stream = await context.resume(stream_id, from_offset)
+    if stream is None:
+        return JSONResponse({"error": "stream not found"}, status_code=404)
+    encoder = encoder or DataStreamEncoder()
+    return StreamingResponse(
+        stream,
+        media_type=encoder.get_media_type(),
+        headers=_merge_headers(headers, stream_id),
+    )
+
+
+def _merge_headers(headers: Optional[Dict[str, str]], stream_id: str) -> Dict[str, str]:
+    merged = dict(headers or {})
+    merged[RESUMABLE_STREAM_ID_HEADER] = stream_id
+    return merged
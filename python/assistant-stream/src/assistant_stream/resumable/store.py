@@ -0,0 +1,65 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import AsyncIterator, Literal, Optional
+
+ResumableStreamRole = Literal["producer", "consumer"]
+
+ResumableStreamStatus = Literal["streaming", "done", "error", "missing"]
+
+# Streams expire one day after their last write unless configured otherwise.
+DEFAULT_TTL = 24 * 60 * 60
+
+
+@dataclass(frozen=True)
+class ResumableStreamEntry:
+    """A persisted slice of an encoded stream starting at byte `offset`."""
+
+    offset: int
+    chunk: bytes
+
+
+class ResumableStreamStore(ABC):
+    """Storage backend for `ResumableStreamContext`."""
+
+    @abstractmethod
+    async def acquire(
+        self, stream_id: str, *, ttl: Optional[float] = None
+    ) -> ResumableStreamRole:
+        """Atomically elect a role.
+
+        The first caller for a given `stream_id` observes "producer"; every
+        later caller observes "consumer", including those arriving after
+        `finalize`.
+        """
+
+    @abstractmethod
+    async def append(self, stream_id: str, chunk: bytes) -> None:
+        """Persist the next chunk. Implementations refresh the TTL on each call."""
+
+    @abstractmethod
+    async def finalize(
+        self,
+        stream_id: str,
+        status: Literal["done", "error"],
+        error: Optional[str] = None,
+    ) -> None:
+        """Mark the stream as complete. No-op when already finalized."""
+
+    @abstractmethod
+    def read(
+        self, stream_id: str, from_offset: int = 0
+    ) -> AsyncIterator[ResumableStreamEntry]:
+        """Yield entries containing bytes at or after `from_offset`.
+
+        Waits for new entries until the stream is finalized, and raises
+        `ResumableStreamError` if it finalized with an error. The first entry
+        may start before `from_offset`; callers trim it.
+        """
+
+    @abstractmethod
+    async def status(self, stream_id: str) -> ResumableStreamStatus:
+        """Return the stream's status, or "missing" if it does not exist."""
+
+    @abstractmethod
+    async def delete(self, stream_id: str) -> None:
+        """Delete the stream. Active readers terminate. No-op when missing."""
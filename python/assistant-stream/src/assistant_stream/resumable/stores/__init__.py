@@ -0,0 +1,4 @@
+from assistant_stream.resumable.stores.memory import InMemoryResumableStreamStore
+from assistant_stream.resumable.stores.sqlite import SQLiteResumableStreamStore
+
+__all__ = ["InMemoryResumableStreamStore", "SQLiteResumableStreamStore"]
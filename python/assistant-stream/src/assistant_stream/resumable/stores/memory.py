@@ -0,0 +1,173 @@
+import asyncio
+import bisect
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Dict, List, Literal, Optional
+
+from assistant_stream.resumable.errors import ResumableStreamError, validate_stream_id
+from assistant_stream.resumable.store import (
+    DEFAULT_TTL,
+    ResumableStreamEntry,
+    ResumableStreamRole,
+    ResumableStreamStatus,
+    ResumableStreamStore,
+)
+from assistant_stream.store_base import WatchedEntry, pop_expired
+
+
+@dataclass
+class _StreamState(WatchedEntry):
+    ttl: float
+    entries: List[ResumableStreamEntry] = field(default_factory=list)
+    size: int = 0
+    final: Optional[Literal["done", "error"]] = None
+    error: Optional[str] = None
+
+
+def _entry_offset(entry: ResumableStreamEntry) -> int:
+    return entry.offset
+
+
+class InMemoryResumableStreamStore(ResumableStreamStore):
+    """Process-local store. Streams live until their TTL lapses or `delete`.
+
+    Args:
+        default_ttl: Seconds a stream is kept after its last write.
+        max_chunk_bytes: Reject appended chunks larger than this.
+        max_entries_per_stream: Reject appends beyond this many entries.
+        max_streams: Reject new streams beyond this many live ones.
+        now: Clock returning seconds, overridable for tests.
+    """
+
+    def __init__(
+        self,
+        *,
+        default_ttl: float = DEFAULT_TTL,
+        max_chunk_bytes: Optional[int] = None,
+        max_entries_per_stream: Optional[int] = None,
+        max_streams: Optional[int] = None,
+        now: Callable[[], float] = time.monotonic,
+    ):
+        self._streams: Dict[str, _StreamState] = {}
+        self._default_ttl = default_ttl
+        self._max_chunk_bytes = max_chunk_bytes
+        self._max_entries_per_stream = max_entries_per_stream
+        self._max_streams = max_streams
+        self._now = now
+
+    def _evict_expired(self) -> None:
+        for state in pop_expired(self._streams, self._now()):
+            if state.final is None:
+                state.final = "error"
+                state.error = "Stream expired"
+            state.notify()
+
+    def _require_active(self, stream_id: str) -> _StreamState:
+        self._evict_expired()
+        state = self._streams.get(stream_id)
+        if state is None:
+            raise ResumableStreamError("missing", f"Stream not found: {stream_id}")
+        if state.final is not None:
+            raise ResumableStreamError(
+                "finalized", f"Stream already finalized: {stream_id}"
+            )
+        return state
+
+    async def acquire(
+        self, stream_id: str, *, ttl: Optional[float] = None
+    ) -> ResumableStreamRole:
+        validate_stream_id(stream_id)
+        self._evict_expired()
+        if stream_id in self._streams:
+            return "consumer"
+        if self._max_streams is not None and len(self._streams) >= self._max_streams:
+            raise RuntimeError("max_streams exceeded")
+
+        ttl = self._default_ttl if ttl is None else ttl
+        self._streams[stream_id] = _StreamState(ttl=ttl, expires_at=self._now() + ttl)
+        return "producer"
+
+    async def append(self, stream_id: str, chunk: bytes) -> None:
+        validate_stream_id(stream_id)
+        if self._max_chunk_bytes is not None and len(chunk) > self._max_chunk_bytes:
+            raise ValueError(f"Chunk exceeds max_chunk_bytes: {len(chunk)}")
+        state = self._require_active(stream_id)
+        if (
+            self._max_entries_per_stream is not None
+            and len(state.entries) >= self._max_entries_per_stream
+        ):
+            raise RuntimeError(
+                f"Stream exceeded max_entries_per_stream: {stream_id}"
+            )
+        state.entries.append(ResumableStreamEntry(offset=state.size, chunk=chunk))
+        state.size += len(chunk)
+        state.expires_at = self._now() + state.ttl
+        state.notify()
+
+    async def finalize(
+        self,
+        stream_id: str,
+        status: Literal["done", "error"],
+        error: Optional[str] = None,
+    ) -> None:
+        validate_stream_id(stream_id)
+        self._evict_expired()
+        state = self._streams.get(stream_id)
+        if state is None:
+            raise ResumableStreamError("missing", f"Stream not found: {stream_id}")
+        if state.final is not None:
+            return
+        state.final = status
+        state.error = (error or "Stream errored") if status == "error" else None
+        state.expires_at = self._now() + state.ttl
+        state.notify()
+
+    async def read(
+        self, stream_id: str, from_offset: int = 0
+    ) -> AsyncIterator[ResumableStreamEntry]:
+        validate_stream_id(stream_id)
+        self._evict_expired()
+        state = self._streams.get(stream_id)
+        if state is None:
+            raise ResumableStreamError("missing", f"Stream not found: {stream_id}")
+
+        # Index of the entry containing `from_offset`.
+        idx = bisect.bisect_right(state.entries, from_offset, key=_entry_offset)
+        idx = max(idx - 1, 0)
+        while True:
+            while idx < len(state.entries):
+                yield state.entries[idx]
+                idx += 1
+
+            if state.final == "error":
+                raise ResumableStreamError("failed", state.error or "Stream errored")
+            if state.final == "done":
+                return
+
+            changed = state.changed
+            try:
+                await asyncio.wait_for(
+                    changed.wait(), timeout=max(state.expires_at - self._now(), 0)
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._evict_expired()
+
+    async def status(self, stream_id: str) -> ResumableStreamStatus:
+        validate_stream_id(stream_id)
+        self._evict_expired()
+        state = self._streams.get(stream_id)
+        if state is None:
+            return "missing"
+        if state.final is None:
+            return "streaming"
+        return state.final
+
+    async def delete(self, stream_id: str) -> None:
+        validate_stream_id(stream_id)
+        state = self._streams.pop(stream_id, None)
+        if state is None:
+            return
+        if state.final is None:
+            state.final = "done"
+        state.notify()
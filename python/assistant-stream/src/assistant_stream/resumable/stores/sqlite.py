@@ -0,0 +1,184 @@
+import time
+from typing import AsyncIterator, List, Literal, Optional
+
+from assistant_stream.resumable.errors import ResumableStreamError, validate_stream_id
+from assistant_stream.resumable.store import (
+    DEFAULT_TTL,
+    ResumableStreamEntry,
+    ResumableStreamRole,
+    ResumableStreamStatus,
+    ResumableStreamStore,
+)
+from assistant_stream.store_base import SQLiteChunkStore
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS resumable_streams (
+    stream_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    error TEXT,
+    ttl REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    size INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS resumable_stream_entries (
+    stream_id TEXT NOT NULL,
+    byte_offset INTEGER NOT NULL,
+    chunk BLOB NOT NULL,
+    PRIMARY KEY (stream_id, byte_offset)
+);
+"""
+
+
+class SQLiteResumableStreamStore(SQLiteChunkStore, ResumableStreamStore):
+    """Store backed by a local SQLite database file.
+
+    Several worker processes on one host can share the file: election is an
+    atomic insert, and readers poll for entries written by other processes.
+    Readers in the producing process are woken immediately. Database calls
+    run in a worker thread so they never block the event loop.
+
+    Args:
+        path: Database file path, or ":memory:".
+        default_ttl: Seconds a stream is kept after its last write.
+        poll_interval: Seconds between polls while waiting for new entries.
+    """
+
+    _parent_table = "resumable_streams"
+    _child_table = "resumable_stream_entries"
+    _key_column = "stream_id"
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        default_ttl: float = DEFAULT_TTL,
+        poll_interval: float = 0.05,
+    ):
+        super().__init__(path, _SCHEMA, poll_interval=poll_interval)
+        self._default_ttl = default_ttl
+
+    def _missing_error(self, stream_id: str) -> Exception:
+        return ResumableStreamError("missing", f"Stream not found: {stream_id}")
+
+    def _failed_error(self, error: Optional[str]) -> Exception:
+        return ResumableStreamError("failed", error or "Stream errored")
+
+    def _acquire(self, stream_id: str, ttl: float) -> ResumableStreamRole:
+        self._evict_expired()
+        cursor = self._conn.execute(
+            "INSERT OR IGNORE INTO resumable_streams (stream_id, status, ttl, expires_at) "
+            "VALUES (?, 'streaming', ?, ?)",
+            (stream_id, ttl, time.time() + ttl),
+        )
+        return "producer" if cursor.rowcount == 1 else "consumer"
+
+    async def acquire(
+        self, stream_id: str, *, ttl: Optional[float] = None
+    ) -> ResumableStreamRole:
+        validate_stream_id(stream_id)
+        ttl = self._default_ttl if ttl is None else ttl
+        return await self._run(self._acquire, stream_id, ttl)
+
+    def _append(self, stream_id: str, chunk: bytes) -> None:
+        with self._transaction():
+            row = self._conn.execute(
+                "SELECT status, size, ttl FROM resumable_streams WHERE stream_id = ?",
+                (stream_id,),
+            ).fetchone()
+            if row is None:
+                raise ResumableStreamError("missing", f"Stream not found: {stream_id}")
+            status, size, ttl = row
+            if status != "streaming":
+                raise ResumableStreamError(
+                    "finalized", f"Stream already finalized: {stream_id}"
+                )
+            self._conn.execute(
+                "INSERT INTO resumable_stream_entries (stream_id, byte_offset, chunk) "
+                "VALUES (?, ?, ?)",
+                (stream_id, size, chunk),
+            )
+            self._conn.execute(
+                "UPDATE resumable_streams SET size = ?, expires_at = ? WHERE stream_id = ?",
+                (size + len(chunk), time.time() + ttl, stream_id),
+            )
+
+    async def append(self, stream_id: str, chunk: bytes) -> None:
+        validate_stream_id(stream_id)
+        await self._run(self._append, stream_id, bytes(chunk))
+        self._notify(stream_id)
+
+    def _finalize(
+        self, stream_id: str, status: str, error: Optional[str]
+    ) -> None:
+        row = self._conn.execute(
+            "SELECT status FROM resumable_streams WHERE stream_id = ?", (stream_id,)
+        ).fetchone()
+        if row is None:
+            raise ResumableStreamError("missing", f"Stream not found: {stream_id}")
+        if row[0] != "streaming":
+            return
+        self._conn.execute(
+            "UPDATE resumable_streams SET status = ?, error = ?, expires_at = ttl + ? "
+            "WHERE stream_id = ?",
+            (status, error, time.time(), stream_id),
+        )
+
+    async def finalize(
+        self,
+        stream_id: str,
+        status: Literal["done", "error"],
+        error: Optional[str] = None,
+    ) -> None:
+        validate_stream_id(stream_id)
+        if status == "error":
+            error = error or "Stream errored"
+        await self._run(self._finalize, stream_id, status, error)
+        self._notify(stream_id)
+
+    def _read_batch(self, stream_id: str, from_offset: int):
+        row = self._conn.execute(
+            "SELECT status, error FROM resumable_streams WHERE stream_id = ?",
+            (stream_id,),
+        ).fetchone()
+        if row is None:
+            return None, None, []
+        status, error = row
+        # Include the entry containing `from_offset`, which may start before it.
+        entries: List[ResumableStreamEntry] = [
+            ResumableStreamEntry(offset=offset, chunk=bytes(chunk))
+            for offset, chunk in self._conn.execute(
+                "SELECT byte_offset, chunk FROM resumable_stream_entries "
+                "WHERE stream_id = ? AND byte_offset + length(chunk) > ? "
+                "ORDER BY byte_offset",
+                (stream_id, from_offset),
+            )
+        ]
+        return status, error, entries
+
+    async def read(
+        self, stream_id: str, from_offset: int = 0
+    ) -> AsyncIterator[ResumableStreamEntry]:
+        validate_stream_id(stream_id)
+        async for entry in self._follow(
+            stream_id,
+            self._read_batch,
+            from_offset,
+            lambda entry: entry.offset + len(entry.chunk),
+        ):
+            yield entry
+
+    def _status(self, stream_id: str) -> ResumableStreamStatus:
+        self._evict_expired()
+        row = self._conn.execute(
+            "SELECT status FROM resumable_streams WHERE stream_id = ?", (stream_id,)
+        ).fetchone()
+        return "missing" if row is None else row[0]
+
+    async def status(self, stream_id: str) -> ResumableStreamStatus:
+        validate_stream_id(stream_id)
+        return await self._run(self._status, stream_id)
+
+    async def delete(self, stream_id: str) -> None:
+        validate_stream_id(stream_id)
+        await self._run(self._delete, stream_id)
+        self._notify(stream_id)
@@ -0,0 +1,82 @@
+from typing import TYPE_CHECKING, Optional
+
+from assistant_stream.assistant_stream_chunk import AssistantStreamChunk
+
+# Avoid circular import
+if TYPE_CHECKING:
+    from assistant_stream.create_run import RunController
+
+
+class RunObserver:
+    """Instrumentation hooks for `create_run`.
+
+    Subclass and override the events you need; every method is a no-op by
+    default. Runs created without an observer skip the hooks entirely, so
+    instrumentation costs nothing unless it is enabled.
+
+    Hooks are called synchronously, on the event loop thread except where
+    noted, and must be cheap and must not raise. Sizes are the approximate
+    byte sizes used for buffer accounting.
+
+    Example:
+        class LatencyObserver(RunObserver):
+            def on_run_start(self, controller):
+                self.started = time.perf_counter()
+
+            def on_first_chunk(self, controller, chunk):
+                ttfc.observe(time.perf_counter() - self.started)
+
+        create_run(callback, observer=LatencyObserver())
+    """
+
+    def on_run_start(self, controller: "RunController") -> None:
+        """The callback task was started."""
+
+    def on_run_end(
+        self, controller: "RunController", error: Optional[BaseException]
+    ) -> None:
+        """The callback task finished, with the exception it raised if any.
+
+        A callback that was cancelled reports `error=None`; `on_cancel` has
+        already been called for it.
+        """
+
+    def on_first_chunk(
+        self, controller: "RunController", chunk: AssistantStreamChunk
+    ) -> None:
+        """The first chunk of the run was handed to the stream reader."""
+
+    def on_chunk_enqueued(
+        self, controller: "RunController", chunk_type: str, size: int
+    ) -> None:
+        """A chunk was added to the run's buffer."""
+
+    def on_chunk_dequeued(
+        self, controller: "RunController", chunk_type: str, size: int
+    ) -> None:
+        """A chunk was taken from the run's buffer by the stream reader."""
+
+    def on_state_flush(self, controller: "RunController", op_count: int) -> None:
+        """A batch of state operations was emitted as one update-state chunk."""
+
+    def on_tool_call_begin(
+        self, controller: "RunController", tool_call_id: str, tool_name: str
+    ) -> None:
+        """A tool call was started with `add_tool_call`."""
+
+    def on_tool_result(self, controller: "RunController", tool_call_id: str) -> None:
+        """A tool result was emitted.
+
+        Called on the thread that set the result.
+        """
+
+    def on_cancel(self, controller: "RunController", reason: str) -> None:
+        """The run was cancelled.
+
+        `reason` is "disconnect" when the stream reader went away early,
+        "cancel" when the run was cancelled through a `RunRegistry`,
+        "deadline" or "idle_timeout" when a run timeout was exceeded,
+        "suspend_timeout" when a suspended run was not resumed in time,
+        "memory_limit" when the run exceeded `max_memory_bytes`, and
+        "error" when a substream failed.
+        """
@@ -0,0 +1,108 @@
+from dataclasses import dataclass
+from typing import Optional, Union
+
+from assistant_stream.chunk_log import ChunkLogWriter, PathLike
+from assistant_stream.chunk_queue import OverflowPolicy
+from assistant_stream.loop_lag import LoopLagMonitor
+from assistant_stream.run_observer import RunObserver
+
+# Default for how long a cancelled callback gets to observe `is_cancelled` and
+# exit cooperatively before its task is cancelled. 50ms keeps cleanup responsive
+# without immediately interrupting callbacks that can stop themselves quickly.
+_CANCEL_GRACE_PERIOD = 0.05
+
+
+@dataclass(frozen=True)
+class RunOptions:
+    """Tuning options of a `create_run` call.
+
+    Pass one as `create_run(options=...)` to share a configuration between
+    runs; keyword arguments of the same names given to `create_run`
+    override its fields.
+
+    Example:
+        options = RunOptions(max_buffered_chunks=256, deadline=60)
+        create_run(callback, options=options, run_id=run_id)
+
+    Args:
+        max_buffered_chunks: Limit on chunks buffered between the callback and
+            the stream reader. Unbounded when None.
+        max_buffered_bytes: Limit on the approximate size of buffered chunks.
+            Unbounded when None.
+        overflow_policy: What to do once a limit is reached. "suspend" keeps
+            queueing and makes `await controller.drain()` block until the
+            reader catches up; "coalesce" merges adjacent deltas of the same
+            stream in the buffer; "error" fails the run with
+            `RunBufferOverflowError`.
+        coalesce_window: Merge adjacent text, reasoning and tool-args deltas
+            of the same stream that arrive within this many seconds into a
+            single chunk. Trades up to one window of latency for far fewer
+            encoder calls and socket writes.
+        coalesce_max_bytes: Upper bound on the size of a coalesced delta.
+            Setting only this merges deltas opportunistically while the
+            reader is behind, without holding any back.
+        observer: Receives lifecycle and per-chunk events for instrumentation.
+        deadline: Maximum run time in seconds. When exceeded the stream emits
+            an error chunk and raises `RunTimeoutError`, and the callback is
+            cancelled like on a client disconnect.
+        idle_timeout: Maximum time in seconds between two emitted chunks
+            (counted from the start of the run for the first one). Handled
+            like `deadline` when exceeded.
+        max_concurrent_substreams: Limit on substreams (including tool calls)
+            read at the same time; the rest wait their turn. Unbounded when
+            None. A failing substream cancels the others and the callback,
+            and the stream emits an error chunk and re-raises its exception.
+        cancel_grace_period: Seconds a cancelled callback gets to notice
+            `controller.is_cancelled` and return before its task is cancelled.
+            Substreams and `controller.cancellable` awaits are cancelled
+            without waiting. 0 cancels the callback immediately.
+        chunk_log: Path of a chunk log to append every emitted chunk to, or
+            an open `ChunkLogWriter`. A path is opened for the duration of
+            the run; a writer is left open. Replay it with
+            `assistant_stream.chunk_log.replay_chunk_log`.
+        time_slice: Share the event loop fairly with other runs. The callback
+            and substreams yield to the loop in `controller.drain()` and
+            `controller.checkpoint()`, and the stream reader yields between
+            chunks, once they have run this many seconds without awaiting.
+            Implies `track_loop_time`.
+        track_loop_time: Measure the event loop time used by the run's tasks,
+            exposed as `controller.loop_time` and `RunInfo.loop_time`.
+        lag_monitor: `LoopLagMonitor` to attribute event loop stalls to the
+            run: to its callback and substreams while they execute, and to
+            the chunk being processed while the stream reader holds one.
+            Enables loop time tracking.
+        max_memory_bytes: Limit on the approximate bytes held by the run's
+            state, buffered chunks and tool call buffers, see
+            `controller.memory_usage`; checked whenever a chunk reaches the
+            run's buffer, which state updates do within a loop tick. When
+            exceeded the stream emits an error chunk and raises
+            `RunMemoryLimitError`, and the callback is cancelled like on a
+            client disconnect. Unbounded when None.
+        trace_memory: Debug mode recording a tracemalloc snapshot when the
+            run starts. Adds `traced_bytes` to `controller.memory_usage`, and
+            the allocation sites that grew the most are logged when
+            `max_memory_bytes` is exceeded. Slows down the whole process.
+    """
+
+    max_buffered_chunks: Optional[int] = None
+    max_buffered_bytes: Optional[int] = None
+    overflow_policy: OverflowPolicy = "suspend"
+    coalesce_window: Optional[float] = None
+    coalesce_max_bytes: Optional[int] = None
+    observer: Optional[RunObserver] = None
+    deadline: Optional[float] = None
+    idle_timeout: Optional[float] = None
+    max_concurrent_substreams: Optional[int] = None
+    cancel_grace_period: float = _CANCEL_GRACE_PERIOD
+    chunk_log: Optional[Union[PathLike, ChunkLogWriter]] = None
+    time_slice: Optional[float] = None
+    track_loop_time: bool = False
+    lag_monitor: Optional[LoopLagMonitor] = None
+    max_memory_bytes: Optional[int] = None
+    trace_memory: bool = False
+
+    def __post_init__(self) -> None:
+        if self.cancel_grace_period < 0:
+            raise ValueError("cancel_grace_period must not be negative")
+        if self.max_memory_bytes is not None and self.max_memory_bytes <= 0:
+            raise ValueError("max_memory_bytes must be positive")
@@ -0,0 +1,192 @@
+import time
+from dataclasses import dataclass
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncGenerator,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+)
+
+from assistant_stream.assistant_stream_chunk import AssistantStreamChunk
+
+# Avoid circular import
+if TYPE_CHECKING:
+    from assistant_stream.create_run import RunController
+
+
+@dataclass(frozen=True)
+class RunInfo:
+    """Snapshot of an active run tracked by a `RunRegistry`."""
+
+    run_id: str
+    thread_id: Optional[str]
+    started_at: float
+    is_cancelled: bool
+    queue_depth: int
+    loop_time: Optional[float] = None
+    suspended_for: Optional[str] = None
+    memory_bytes: Optional[int] = None
+
+
+class RunRegistry:
+    """Tracks in-flight `create_run` calls by run id and thread id.
+
+    Pass the same registry to every `create_run` call in a process; runs are
+    registered when their stream starts and removed once their callback has
+    finished. The registry is bound to the event loop the runs execute on and
+    must only be used from that loop.
+
+    Example:
+        registry = RunRegistry()
+
+        @app.post("/assistant")
+        async def assistant(request):
+            stream = create_run(callback, registry=registry, thread_id=request.thread_id)
+            return DataStreamResponse(stream)
+
+        @app.post("/api/cancel")
+        async def cancel(request):
+            registry.cancel_thread(request.thread_id)
+
+    Args:
+        suspend_timeout: Seconds a run suspended in `suspend_for_tool_result`
+            without a timeout of its own waits to be resumed before it is
+            cancelled. Such runs wait indefinitely when None.
+    """
+
+    def __init__(self, *, suspend_timeout: Optional[float] = None) -> None:
+        if suspend_timeout is not None and suspend_timeout <= 0:
+            raise ValueError("suspend_timeout must be positive")
+        self.suspend_timeout = suspend_timeout
+        self._runs: Dict[str, "RunController"] = {}
+        self._started_at: Dict[str, float] = {}
+
+    def register(self, controller: "RunController") -> None:
+        """Start tracking a run. Raises ValueError if its run id is taken."""
+        run_id = controller.run_id
+        if run_id in self._runs:
+            raise ValueError(f"Run already registered: {run_id}")
+        self._runs[run_id] = controller
+        self._started_at[run_id] = time.time()
+
+    def unregister(self, run_id: str) -> None:
+        """Stop tracking a run. No-op when the run is unknown."""
+        self._runs.pop(run_id, None)
+        self._started_at.pop(run_id, None)
+
+    def get_controller(self, run_id: str) -> Optional["RunController"]:
+        """Return the controller of an active run, or None."""
+        return self._runs.get(run_id)
+
+    def get(self, run_id: str) -> Optional[RunInfo]:
+        """Return a snapshot of an active run, or None."""
+        controller = self._runs.get(run_id)
+        if controller is None:
+            return None
+        return self._info(controller)
+
+    def list_runs(self, thread_id: Optional[str] = None) -> List[RunInfo]:
+        """List active runs, optionally restricted to one thread."""
+        return [
+            self._info(controller)
+            for controller in self._runs.values()
+            if thread_id is None or controller.thread_id == thread_id
+        ]
+
+    def cancel(self, run_id: str) -> bool:
+        """Cancel a run. Returns False when no such run is active.
+
+        The run's cancel signal is set so the callback can stop cooperatively;
+        callbacks still running after the run's grace period are cancelled.
+        """
+        controller = self._runs.get(run_id)
+        if controller is None:
+            return False
+        controller._request_cancel()
+        return True
+
+    def submit_tool_result(self, run_id: str, tool_call_id: str, result: Any) -> bool:
+        """Deliver a tool result to a run awaiting `wait_for_tool_result`.
+
+        Returns False when no such run is active. Raises ValueError when a
+        result for `tool_call_id` was already submitted and not yet consumed.
+        """
+        controller = self._runs.get(run_id)
+        if controller is None:
+            return False
+        controller._deliver_tool_result(tool_call_id, result)
+        return True
+
+    def submit_commands(
+        self, run_id: str, commands: Iterable[Mapping[str, Any]]
+    ) -> List[str]:
+        """Deliver the "add-tool-result" commands of an assistant-transport request.
+
+        Endpoint helper for the side channel of `wait_for_tool_result`: pass
+        the request's `commands` and the id of the run they target. Other
+        command types are ignored. Returns the tool call ids delivered, which
+        is empty when the run is not active.
+
+        Example:
+            @app.post("/assistant/{run_id}/commands")
+            async def commands(run_id: str, request: Request):
+                body = await request.json()
+                return {"delivered": registry.submit_commands(run_id, body["commands"])}
+        """
+        delivered = []
+        for command in commands:
+            if command.get("type") != "add-tool-result":
+                continue
+            tool_call_id = command["toolCallId"]
+            if not self.submit_tool_result(run_id, tool_call_id, command.get("result")):
+                break
+            delivered.append(tool_call_id)
+        return delivered
+
+    def resume(
+        self, run_id: str, tool_call_id: str, result: Any
+    ) -> AsyncGenerator[AssistantStreamChunk, None]:
+        """Resume a run suspended in `suspend_for_tool_result`.
+
+        Hands `result` to the callback and returns the stream of the rest of
+        the run, to be sent as the response of the resuming request. Raises
+        KeyError when no such run is active and ValueError when it is not
+        waiting for a result of `tool_call_id`.
+        """
+        controller = self._runs.get(run_id)
+        if controller is None:
+            raise KeyError(run_id)
+        return controller._resume(tool_call_id, result)
+
+    def cancel_thread(self, thread_id: str) -> List[str]:
+        """Cancel every active run of a thread and return their run ids."""
+        run_ids = [
+            run_id
+            for run_id, controller in self._runs.items()
+            if controller.thread_id == thread_id
+        ]
+        for run_id in run_ids:
+            self.cancel(run_id)
+        return run_ids
+
+    def __len__(self) -> int:
+        return len(self._runs)
+
+    def __contains__(self, run_id: object) -> bool:
+        return run_id in self._runs
+
+    def _info(self, controller: "RunController") -> RunInfo:
+        return RunInfo(
+            run_id=controller.run_id,
+            thread_id=controller.thread_id,
+            started_at=self._started_at[controller.run_id],
+            is_cancelled=controller.is_cancelled,
+            queue_depth=controller.queue_depth,
+            loop_time=controller.loop_time,
+            suspended_for=controller.suspended_for,
+            memory_bytes=controller._tracked_memory_bytes,
+        )
@@ -2,7 +2,10 @@ from assistant_stream.assistant_stream_chunk import AssistantStreamChunk
 from assistant_stream.serialization.assistant_stream_response import (
     AssistantStreamResponse,
 )
-from assistant_stream.serialization.stream_encoder import StreamEncoder
+from assistant_stream.serialization.stream_encoder import (
+    StreamEncoder,
+    first_choice_only,
+)
 from assistant_stream.state_proxy import StateProxy
 from typing import AsyncGenerator, Any
 import json
@@ -32,8 +35,12 @@ class AssistantTransportEncoder(StreamEncoder):
 
         # Add all attributes from the chunk
         for key, value in vars(chunk).items():
-            if key != "type":  # Already added
-                chunk_dict[self._snake_to_camel(key)] = value
+            if key == "type":  # Already added
+                continue
+            if key == "choice_index":
+                # Only choice 0 is sent; see `encode_stream`.
+                continue
+            chunk_dict[self._snake_to_camel(key)] = value
 
         return chunk_dict
 
@@ -45,7 +52,8 @@ class AssistantTransportEncoder(StreamEncoder):
     async def encode_stream(
         self, stream: AsyncGenerator[AssistantStreamChunk, None]
     ) -> AsyncGenerator[str, None]:
-        async for chunk in stream:
+        # Clients render a single answer, so other choices are not sent.
+        async for chunk in first_choice_only(stream):
             chunk_dict = self._chunk_to_dict(chunk)
             chunk_json = json.dumps(chunk_dict, cls=StateProxyJSONEncoder)
             yield f"data: {chunk_json}\n\n"
@@ -6,7 +6,10 @@ from typing import AsyncGenerator, Any
 from assistant_stream.serialization.assistant_stream_response import (
     AssistantStreamResponse,
 )
-from assistant_stream.serialization.stream_encoder import StreamEncoder
+from assistant_stream.serialization.stream_encoder import (
+    StreamEncoder,
+    first_choice_only,
+)
 from assistant_stream.state_proxy import StateProxy
 
 
@@ -71,7 +74,8 @@ class DataStreamEncoder(StreamEncoder):
     async def encode_stream(
         self, stream: AsyncGenerator[AssistantStreamChunk, None]
     ) -> AsyncGenerator[str, None]:
-        async for chunk in stream:
+        # The data stream format has no notion of choices.
+        async for chunk in first_choice_only(stream):
             encoded = self.encode_chunk(chunk)
             if encoded is None:
                 continue
@@ -18,16 +18,23 @@ def generate_openai_style_id():
 
 
 class OpenAIStreamEncoder(StreamEncoder):
+    """Encodes text deltas as OpenAI chat completion chunks.
+
+    Chunks emitted through `controller.choice(i)` are sent as choice `i`,
+    and every choice seen gets its own finish chunk (choice 0 when the run
+    produced no text).
+    """
+
     def __init__(self, model="assistant_stream", system_fingerprint="fp_0000000000"):
         self.id = generate_openai_style_id()
         self.model = model
         self.system_fingerprint = system_fingerprint
-        pass
+        self._choices = set()
 
     def get_media_type(self) -> str:
         return "text/event-stream"
 
-    def _create_chunk(self, delta={}, finish_reason=None):
+    def _create_chunk(self, delta={}, finish_reason=None, index=0):
         response = {
             "id": self.id,
             "object": "chat.completion.chunk",
@@ -36,7 +43,7 @@ class OpenAIStreamEncoder(StreamEncoder):
             "system_fingerprint": self.system_fingerprint,
             "choices": [
                 {
-                    "index": 0,
+                    "index": index,
                     "delta": delta,
                     "logprobs": None,
                     "finish_reason": finish_reason,
@@ -51,7 +58,9 @@ class OpenAIStreamEncoder(StreamEncoder):
         """
         if chunk.type == "text-delta":
             # Construct the delta for text content
-            return self._create_chunk({"content": chunk.text_delta})
+            index = getattr(chunk, "choice_index", 0)
+            self._choices.add(index)
+            return self._create_chunk({"content": chunk.text_delta}, index=index)
         else:
             # Handle unknown chunk types gracefully
             return ""
@@ -67,7 +76,8 @@ class OpenAIStreamEncoder(StreamEncoder):
             if encoded_chunk:
                 yield encoded_chunk
 
-        yield self._create_chunk(finish_reason="stop")
+        for index in sorted(self._choices or {0}):
+            yield self._create_chunk(finish_reason="stop", index=index)
         yield "data: [DONE]\n\n"
 
 
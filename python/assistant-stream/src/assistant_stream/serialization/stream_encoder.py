@@ -1,8 +1,26 @@
 from abc import ABC, abstractmethod
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Set
 from assistant_stream.assistant_stream_chunk import AssistantStreamChunk
 
 
+async def first_choice_only(
+    stream: AsyncGenerator[AssistantStreamChunk, None],
+) -> AsyncGenerator[AssistantStreamChunk, None]:
+    """
+    Yield only the chunks of choice 0, for formats whose clients render a
+    single answer. Tool call deltas and results follow their begin chunk.
+    """
+    dropped_tool_calls: Set[str] = set()
+    async for chunk in stream:
+        if getattr(chunk, "choice_index", 0):
+            if chunk.type == "tool-call-begin":
+                dropped_tool_calls.add(chunk.tool_call_id)
+            continue
+        if getattr(chunk, "tool_call_id", None) in dropped_tool_calls:
+            continue
+        yield chunk
+
+
 class StreamEncoder(ABC):
     """
     Abstract base class for stream encoders, requiring an implementation of `encode_stream`.
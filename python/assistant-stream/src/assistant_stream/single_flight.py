@@ -0,0 +1,78 @@
+import hashlib
+import json
+from typing import Any, AsyncGenerator, AsyncIterable, Callable, Dict, Optional
+
+from assistant_stream.assistant_stream_chunk import AssistantStreamChunk
+from assistant_stream.broadcast import RunBroadcast
+from assistant_stream.serialization.stream_encoder import StreamEncoder
+
+StreamFactory = Callable[[], AsyncIterable[AssistantStreamChunk]]
+
+
+def single_flight_key(*parts: Any) -> str:
+    """Hash JSON-serializable request parts, e.g. a thread id and its commands."""
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """Deduplicates identical concurrent runs.
+
+    The first request for a key starts the run; requests with the same key
+    arriving while it is in flight subscribe to it through a `RunBroadcast`
+    and get its whole output, replayed from the start, instead of starting
+    a second generation. Once the run has finished the key is free again.
+    The run is cancelled when every request following it has gone away.
+
+    Example:
+        single_flight = SingleFlight()
+
+        @app.post("/assistant")
+        async def assistant(request: AssistantRequest):
+            key = single_flight_key(request.thread_id, request.commands)
+            stream = single_flight.run(key, lambda: create_run(callback))
+            return DataStreamResponse(stream)
+
+    Args:
+        max_subscriber_lag: Passed to each `RunBroadcast`.
+    """
+
+    def __init__(self, *, max_subscriber_lag: Optional[int] = 1024):
+        self._max_subscriber_lag = max_subscriber_lag
+        self._broadcasts: Dict[str, RunBroadcast] = {}
+
+    def run(
+        self, key: str, make_stream: StreamFactory
+    ) -> AsyncGenerator[AssistantStreamChunk, None]:
+        """Follow the in-flight run for `key`, or start it with `make_stream()`."""
+        return self._broadcast(key, make_stream).subscribe()
+
+    def run_encoded(
+        self, key: str, make_stream: StreamFactory, encoder: StreamEncoder
+    ) -> AsyncGenerator[Any, None]:
+        """Like `run`, sharing the encoding between the requests as well."""
+        return self._broadcast(key, make_stream).subscribe_encoded(encoder)
+
+    def get(self, key: str) -> Optional[RunBroadcast]:
+        """Return the broadcast of the in-flight run for `key`, or None."""
+        return self._broadcasts.get(key)
+
+    def __len__(self) -> int:
+        return len(self._broadcasts)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._broadcasts
+
+    def _broadcast(self, key: str, make_stream: StreamFactory) -> RunBroadcast:
+        broadcast = self._broadcasts.get(key)
+        if broadcast is None:
+            broadcast = RunBroadcast(
+                make_stream(), max_subscriber_lag=self._max_subscriber_lag
+            )
+            self._broadcasts[key] = broadcast
+            broadcast.add_done_callback(lambda done: self._forget(key, done))
+        return broadcast
+
+    def _forget(self, key: str, broadcast: RunBroadcast) -> None:
+        if self._broadcasts.get(key) is broadcast:
+            del self._broadcasts[key]
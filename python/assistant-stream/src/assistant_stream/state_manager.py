@@ -1,10 +1,12 @@
 import asyncio
-from typing import Any, Callable, Dict, List, Sequence, Union
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
 
 from assistant_stream.assistant_stream_chunk import (
     ObjectStreamOperation,
     UpdateStateChunk,
 )
+from assistant_stream.chunk_queue import approximate_size
 from assistant_stream.state_proxy import StateProxy
 
 
@@ -22,7 +24,9 @@ class StateManager:
         self._update_scheduled = False
         self._put_chunk_callback = put_chunk_callback
         self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
         self._state_proxy = StateProxy(self, [])
+        self._state_bytes: Optional[int] = None
 
     @property
     def state(self) -> Any:
@@ -40,6 +44,27 @@ class StateManager:
         """Current state data."""
         return self._state_data
 
+    @property
+    def approximate_size(self) -> int:
+        """Estimated size of the state in bytes.
+
+        Kept up to date incrementally once `track_size()` was called,
+        otherwise computed from the whole state.
+        """
+        if self._state_bytes is not None:
+            return self._state_bytes
+        return approximate_size(self._state_data)
+
+    @property
+    def tracks_size(self) -> bool:
+        """Whether `approximate_size` is maintained incrementally."""
+        return self._state_bytes is not None
+
+    def track_size(self) -> None:
+        """Maintain `approximate_size` incrementally as operations are applied."""
+        if self._state_bytes is None:
+            self._state_bytes = approximate_size(self._state_data)
+
     def add_operations(self, operations: List[ObjectStreamOperation]) -> None:
         """Add operations to pending batch and apply locally."""
         # Apply to local state immediately
@@ -52,7 +77,10 @@ class StateManager:
         # Schedule batch update if needed
         if not self._update_scheduled:
             self._update_scheduled = True
-            self._loop.call_soon_threadsafe(self._flush_updates)
+            if threading.get_ident() == self._loop_thread_id:
+                self._loop.call_soon(self._flush_updates)
+            else:
+                self._loop.call_soon_threadsafe(self._flush_updates)
 
     def append_text(self, path: Sequence[Union[str, int]], value: str) -> None:
         """Append text at a path using an explicit append-text delta operation."""
@@ -91,6 +119,8 @@ class StateManager:
     def _apply_operation_to_local_state(self, operation: ObjectStreamOperation) -> None:
         """Apply operation to local state."""
         op_type = operation["type"]
+        if self._state_bytes is not None:
+            size_delta = self._size_delta(operation)
 
         if op_type == "set":
             self._update_path(operation["path"], lambda _: operation["value"])
@@ -108,6 +138,30 @@ class StateManager:
         else:
             raise TypeError(f"Invalid operation type: {op_type}")
 
+        if self._state_bytes is not None:
+            self._state_bytes += size_delta
+
+    def _size_delta(self, operation: ObjectStreamOperation) -> int:
+        """Estimate how much applying `operation` grows the state."""
+        if operation["type"] == "append-text":
+            return len(operation["value"])
+        path = operation["path"]
+        try:
+            previous = approximate_size(self.get_value_at_path(path))
+        except KeyError:
+            if operation["value"] is None or not path:
+                return 0
+            # A new entry; count its key (or list separator) as well.
+            try:
+                parent = self.get_value_at_path(path[:-1])
+            except KeyError:
+                parent = None
+            if isinstance(parent, list):
+                previous = -1
+            else:
+                previous = -(approximate_size(path[-1]) + 2)
+        return approximate_size(operation["value"]) - previous
+
     def get_value_at_path(self, path: List[str]) -> Any:
         """Get value at path, raising KeyError for invalid paths."""
         if not path:
@@ -0,0 +1,240 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+T = TypeVar("T")
+_Entry = TypeVar("_Entry", bound="WatchedEntry")
+
+# (status, error, items) of one poll; status is None when the key is missing.
+ReadBatch = Tuple[Optional[str], Optional[str], Sequence[Any]]
+
+
+@dataclass
+class WatchedEntry:
+    """Base for in-memory store entries that readers wait on."""
+
+    changed: asyncio.Event = field(default_factory=asyncio.Event, kw_only=True)
+    expires_at: Optional[float] = field(default=None, kw_only=True)
+
+    def notify(self) -> None:
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+def pop_expired(entries: Dict[str, _Entry], now: float) -> List[_Entry]:
+    """Remove and return the entries whose `expires_at` has passed."""
+    expired = [
+        key
+        for key, entry in entries.items()
+        if entry.expires_at is not None and entry.expires_at <= now
+    ]
+    return [entries.pop(key) for key in expired]
+
+
+class SQLiteDatabase:
+    """Connection to a local SQLite database shared by several processes.
+
+    Calls go through `_run`, which executes them in a worker thread under a
+    lock so they never block the event loop. File databases use WAL mode so
+    readers in other processes are not blocked by writers.
+
+    Args:
+        path: Database file path, or ":memory:".
+        schema: Script creating the tables if they do not exist yet.
+        poll_interval: Seconds between polls while waiting on other processes.
+    """
+
+    def __init__(self, path: str, schema: str, *, poll_interval: float):
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._lock = threading.Lock()
+        self._poll_interval = poll_interval
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(schema)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    async def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        return await asyncio.to_thread(self._locked, fn, *args)
+
+    def _locked(self, fn: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            return fn(*args)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+
+class SQLiteChunkStore(SQLiteDatabase, ABC):
+    """Base for stores keeping a growing list of items per key in SQLite.
+
+    Subclasses name a parent table with one row per key, holding its
+    `status`, item count or `size`, and an optional `expires_at`, and a child
+    table with the items. Readers in the writing process are woken through
+    `_notify`. Changes made by other processes are picked up by one poll of
+    the parent table for all followed keys, which wakes the readers of the
+    keys whose status or size moved.
+    """
+
+    _parent_table: str
+    _child_table: str
+    _key_column: str
+
+    def __init__(self, path: str, schema: str, *, poll_interval: float):
+        super().__init__(path, schema, poll_interval=poll_interval)
+        self._waiters: Dict[str, Set[asyncio.Event]] = {}
+        # (status, size) of each followed key at the last poll.
+        self._versions: Dict[str, Optional[Tuple[str, int]]] = {}
+        self._poller: Optional[asyncio.Task] = None
+
+    @abstractmethod
+    def _missing_error(self, key: str) -> Exception:
+        """Return the error raised when following a key that does not exist."""
+
+    @abstractmethod
+    def _failed_error(self, error: Optional[str]) -> Exception:
+        """Return the error raised when a followed key ends in an error."""
+
+    def _notify(self, key: str) -> None:
+        for event in self._waiters.get(key, ()):
+            event.set()
+
+    def _read_versions(
+        self, keys: Sequence[str]
+    ) -> Dict[str, Optional[Tuple[str, int]]]:
+        versions: Dict[str, Optional[Tuple[str, int]]] = dict.fromkeys(keys)
+        # Stay below SQLite's default limit on bound parameters.
+        for start in range(0, len(keys), 500):
+            batch = keys[start : start + 500]
+            placeholders = ", ".join("?" * len(batch))
+            for key, status, size in self._conn.execute(
+                f"SELECT {self._key_column}, status, size FROM {self._parent_table} "
+                f"WHERE {self._key_column} IN ({placeholders})",
+                batch,
+            ):
+                versions[key] = (status, size)
+        return versions
+
+    async def _poll_followed(self) -> None:
+        """Wake the readers of keys changed by other processes."""
+        try:
+            while self._waiters:
+                await asyncio.sleep(self._poll_interval)
+                keys = list(self._waiters)
+                versions = await self._run(self._read_versions, keys)
+                for key in list(self._versions):
+                    if key not in self._waiters:
+                        del self._versions[key]
+                for key, version in versions.items():
+                    # A key seen for the first time wakes its readers too, in
+                    # case it changed between their last read and this poll.
+                    if key not in self._versions or self._versions[key] != version:
+                        self._versions[key] = version
+                        self._notify(key)
+        except Exception:
+            # Let the readers re-read; their own query surfaces the failure.
+            for key in list(self._waiters):
+                self._notify(key)
+        finally:
+            if self._poller is asyncio.current_task():
+                self._poller = None
+
+    def _evict_expired(self) -> None:
+        expired = [
+            row[0]
+            for row in self._conn.execute(
+                f"SELECT {self._key_column} FROM {self._parent_table} "
+                "WHERE expires_at <= ?",
+                (time.time(),),
+            )
+        ]
+        for key in expired:
+            self._delete(key)
+
+    def _delete(self, key: str) -> None:
+        with self._transaction():
+            for table in (self._child_table, self._parent_table):
+                self._conn.execute(
+                    f"DELETE FROM {table} WHERE {self._key_column} = ?", (key,)
+                )
+
+    async def _follow(
+        self,
+        key: str,
+        read_batch: Callable[[str, Any], ReadBatch],
+        position: Any,
+        advance: Callable[[Any], Any],
+    ) -> AsyncIterator[Any]:
+        """Yield items from `position` on until the key is done or errored.
+
+        `read_batch(key, position)` is polled for new items, and
+        `advance(item)` gives the position after a yielded item.
+        """
+        event = asyncio.Event()
+        waiters = self._waiters.setdefault(key, set())
+        waiters.add(event)
+        if self._poller is None:
+            self._poller = asyncio.create_task(self._poll_followed())
+        try:
+            seen_any = False
+            while True:
+                event.clear()
+                status, error, items = await self._run(read_batch, key, position)
+                if status is None:
+                    if seen_any:
+                        # Deleted while being read.
+                        return
+                    raise self._missing_error(key)
+                seen_any = True
+                for item in items:
+                    yield item
+                    position = advance(item)
+
+                if items:
+                    # Items may have landed between the status read and the
+                    # batch query; only stop once a read comes back empty.
+                    continue
+                if status == "error":
+                    raise self._failed_error(error)
+                if status == "done":
+                    return
+
+                await event.wait()
+        finally:
+            waiters.discard(event)
+            if not waiters:
+                self._waiters.pop(key, None)
+            if not self._waiters and self._poller is not None:
+                self._poller.cancel()
+                self._poller = None
@@ -0,0 +1,87 @@
+import asyncio
+from collections import deque
+from typing import Any, Callable, Coroutine, Deque, Optional, Set
+
+SubstreamFactory = Callable[[], Coroutine[Any, Any, None]]
+
+
+class SubstreamSupervisor:
+    """Runs the substream readers of a run as one structured group.
+
+    At most `max_concurrency` readers run at a time; further substreams wait
+    in FIFO order and start as slots free up, so fan-out-heavy agents do not
+    spawn hundreds of tasks at once. The first reader to fail cancels every
+    other reader and is reported through `on_error`; substreams added after
+    that, or after `cancel()`, are dropped.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: Optional[int] = None,
+        on_error: Optional[Callable[[BaseException], None]] = None,
+    ):
+        if max_concurrency is not None and max_concurrency <= 0:
+            raise ValueError("max_concurrency must be positive")
+        self._max_concurrency = max_concurrency
+        self._on_error = on_error
+        self._tasks: Set[asyncio.Task] = set()
+        self._pending: Deque[SubstreamFactory] = deque()
+        self._closed = False
+        self._error: Optional[BaseException] = None
+
+    @property
+    def active_count(self) -> int:
+        """Number of readers currently running."""
+        return len(self._tasks)
+
+    @property
+    def pending_count(self) -> int:
+        """Number of readers waiting for a free slot."""
+        return len(self._pending)
+
+    @property
+    def error(self) -> Optional[BaseException]:
+        """The first reader failure, if any."""
+        return self._error
+
+    def start(self, factory: SubstreamFactory) -> None:
+        """Run `factory()` now, or once a slot is free."""
+        if self._closed:
+            return
+        if self._has_capacity():
+            self._launch(factory)
+        else:
+            self._pending.append(factory)
+
+    def cancel(self) -> None:
+        """Cancel every running reader and drop the waiting ones."""
+        self._closed = True
+        self._pending.clear()
+        for task in self._tasks:
+            task.cancel()
+
+    async def wait(self) -> None:
+        """Wait until every reader, including waiting ones, has finished."""
+        while self._tasks:
+            await asyncio.wait(set(self._tasks))
+
+    def _has_capacity(self) -> bool:
+        return self._max_concurrency is None or len(self._tasks) < self._max_concurrency
+
+    def _launch(self, factory: SubstreamFactory) -> None:
+        task = asyncio.create_task(factory())
+        self._tasks.add(task)
+        task.add_done_callback(self._on_done)
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            if self._error is None:
+                self._error = task.exception()
+                self.cancel()
+                if self._on_error is not None:
+                    self._on_error(self._error)
+            return
+        while self._pending and self._has_capacity():
+            self._launch(self._pending.popleft())
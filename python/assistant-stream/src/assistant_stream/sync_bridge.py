@@ -0,0 +1,109 @@
+import asyncio
+import threading
+from typing import Any, AsyncGenerator, Callable, Coroutine, Optional
+
+from assistant_stream.create_run import RunController, create_run
+from assistant_stream.serialization.data_stream import DataStreamEncoder
+from assistant_stream.serialization.stream_encoder import StreamEncoder
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def get_background_loop() -> asyncio.AbstractEventLoop:
+    """Return the event loop shared by every `create_run_sync` call.
+
+    The loop runs forever in a daemon thread started on first use.
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=loop.run_forever, name="assistant-stream-loop", daemon=True
+            )
+            thread.start()
+            _loop = loop
+        return _loop
+
+
+class SyncRunIterator:
+    """Blocking iterator over the encoded output of a run.
+
+    Each `next()` waits for the next encoded chunk from the background loop.
+    `close()`, which WSGI servers call when the client goes away, cancels
+    the run like closing the async stream would.
+    """
+
+    def __init__(
+        self,
+        stream: AsyncGenerator[Any, None],
+        loop: asyncio.AbstractEventLoop,
+        media_type: str,
+    ):
+        self._stream = stream
+        self._loop = loop
+        self._closed = False
+        self.media_type = media_type
+
+    def __iter__(self) -> "SyncRunIterator":
+        return self
+
+    def __next__(self) -> bytes:
+        if self._closed:
+            raise StopIteration
+        future = asyncio.run_coroutine_threadsafe(self._stream.__anext__(), self._loop)
+        try:
+            item = future.result()
+        except StopAsyncIteration:
+            self._closed = True
+            raise StopIteration from None
+        except BaseException:
+            self._closed = True
+            raise
+        return item.encode("utf-8") if isinstance(item, str) else item
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        asyncio.run_coroutine_threadsafe(self._stream.aclose(), self._loop).result()
+
+
+def create_run_sync(
+    callback: Callable[[RunController], Coroutine[Any, Any, None]],
+    *,
+    encoder: Optional[StreamEncoder] = None,
+    **run_options: Any,
+) -> SyncRunIterator:
+    """Run `callback` for a synchronous (e.g. WSGI) server.
+
+    The run executes on a single event loop shared by all requests, running
+    in a background thread, so a sync worker needs no loop of its own. The
+    callback is still a coroutine function and runs on that loop.
+
+    Example:
+        @app.post("/assistant")
+        def assistant():
+            body = create_run_sync(callback, state=initial_state)
+            return Response(body, mimetype=body.media_type)
+
+    Args:
+        callback: Coroutine function receiving the `RunController`.
+        encoder: Encoder for the output. Defaults to `DataStreamEncoder`.
+        **run_options: Passed to `create_run`.
+    """
+    if encoder is None:
+        encoder = DataStreamEncoder()
+    loop = get_background_loop()
+
+    async def encoded() -> AsyncGenerator[Any, None]:
+        run_stream = create_run(callback, **run_options)
+        try:
+            async for item in encoder.encode_stream(run_stream):
+                yield item
+        finally:
+            # Closing the encoder's stream would not reach the run itself.
+            await run_stream.aclose()
+
+    return SyncRunIterator(encoded(), loop, encoder.get_media_type())
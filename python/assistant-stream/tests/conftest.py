@@ -0,0 +1,8 @@
+import time
+
+
+def busy_wait(seconds: float) -> None:
+    """Block the calling thread, e.g. the event loop, for `seconds`."""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
@@ -148,3 +148,23 @@ async def test_assistant_transport_encoder_update_state_shape():
     assert collected_output[-1] == "data: [DONE]\n\n"
     update_state_payload = json.loads(collected_output[0][6:-2])
     assert update_state_payload == {"type": "update-state", "operations": operations}
+
+
+@pytest.mark.anyio
+async def test_assistant_transport_encoder_sends_only_first_choice():
+    """Payloads keep their shape; other choices are not sent."""
+    encoder = AssistantTransportEncoder()
+
+    async def run_callback(controller: RunController):
+        controller.append_text("a")
+        controller.choice(1).append_text("b")
+
+    collected = [
+        json.loads(line[6:-2])
+        async for line in encoder.encode_stream(create_run(run_callback))
+        if line != "data: [DONE]\n\n"
+    ]
+
+    assert collected == [
+        {"type": "text-delta", "textDelta": "a", "parentId": None},
+    ]
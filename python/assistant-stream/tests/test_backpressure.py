@@ -0,0 +1,166 @@
+import asyncio
+
+import pytest
+
+from assistant_stream import RunBufferOverflowError, RunController, create_run
+from assistant_stream.assistant_stream_chunk import TextDeltaChunk
+from assistant_stream.chunk_queue import ChunkQueue
+
+
+@pytest.mark.anyio
+async def test_controller_exposes_queue_depth():
+    observed: dict[str, int] = {}
+
+    async def run_callback(controller: RunController):
+        controller.append_text("a")
+        controller.append_text("b")
+        observed["depth"] = controller.queue_depth
+        observed["bytes"] = controller.buffered_bytes
+
+    chunks = [chunk async for chunk in create_run(run_callback)]
+
+    assert [chunk.text_delta for chunk in chunks] == ["a", "b"]
+    assert observed["depth"] == 2
+    assert observed["bytes"] > 0
+
+
+@pytest.mark.anyio
+async def test_suspend_policy_blocks_drain_until_reader_catches_up():
+    depths: list[int] = []
+
+    async def run_callback(controller: RunController):
+        for i in range(10):
+            controller.append_text(str(i))
+            await controller.drain()
+            depths.append(controller.queue_depth)
+
+    stream = create_run(run_callback, max_buffered_chunks=2)
+    chunks = []
+    async for chunk in stream:
+        chunks.append(chunk.text_delta)
+        await asyncio.sleep(0.001)
+
+    assert chunks == [str(i) for i in range(10)]
+    assert max(depths) < 2
+
+
+@pytest.mark.anyio
+async def test_coalesce_policy_merges_deltas_in_queue():
+    async def run_callback(controller: RunController):
+        for i in range(10):
+            controller.append_text(str(i))
+        controller.add_data({"done": True})
+
+    stream = create_run(run_callback, max_buffered_chunks=2, overflow_policy="coalesce")
+    chunks = [chunk async for chunk in stream]
+
+    assert [chunk.type for chunk in chunks] == ["text-delta", "text-delta", "data"]
+    assert "".join(chunk.text_delta for chunk in chunks[:2]) == "0123456789"
+
+
+@pytest.mark.anyio
+async def test_error_policy_fails_the_run():
+    async def run_callback(controller: RunController):
+        for i in range(10):
+            controller.append_text(str(i))
+        await asyncio.sleep(1)
+
+    chunk_types: list[str] = []
+    stream = create_run(run_callback, max_buffered_chunks=3, overflow_policy="error")
+    with pytest.raises(RunBufferOverflowError):
+        async for chunk in stream:
+            chunk_types.append(chunk.type)
+
+    assert chunk_types == ["error"]
+
+
+@pytest.mark.anyio
+async def test_max_buffered_bytes_limit():
+    queue = ChunkQueue(max_bytes=200)
+    queue.put_nowait(TextDeltaChunk(text_delta="x" * 100))
+    assert queue.is_over_limit() is False
+    queue.put_nowait(TextDeltaChunk(text_delta="x" * 100))
+    assert queue.is_over_limit() is True
+
+    await queue.get()
+    assert queue.is_over_limit() is False
+
+
+def test_invalid_overflow_policy():
+    with pytest.raises(ValueError):
+        ChunkQueue(overflow_policy="drop")
+
+
+@pytest.mark.anyio
+async def test_coalesce_window_merges_adjacent_deltas():
+    async def run_callback(controller: RunController):
+        controller.append_text("Hel")
+        controller.append_text("lo")
+        controller.append_reasoning("think")
+        controller.append_reasoning("ing")
+        controller.append_text("!")
+        tool = await controller.add_tool_call("search", "call_1")
+        tool.append_args_text('{"q": ')
+        tool.append_args_text('"x"}')
+        tool.set_response("ok")
+
+    chunks = [chunk async for chunk in create_run(run_callback, coalesce_window=0.01)]
+
+    assert [chunk.type for chunk in chunks] == [
+        "text-delta",
+        "reasoning-delta",
+        "text-delta",
+        "tool-call-begin",
+        "tool-call-delta",
+        "tool-result",
+    ]
+    assert chunks[0].text_delta == "Hello"
+    assert chunks[1].reasoning_delta == "thinking"
+    assert chunks[4].args_text_delta == '{"q": "x"}'
+
+
+@pytest.mark.anyio
+async def test_coalesce_does_not_merge_across_parent_ids():
+    async def run_callback(controller: RunController):
+        controller.append_text("a")
+        controller.with_parent_id("p1").append_text("b")
+        controller.with_parent_id("p1").append_text("c")
+
+    chunks = [chunk async for chunk in create_run(run_callback, coalesce_window=0.01)]
+
+    assert [(chunk.parent_id, chunk.text_delta) for chunk in chunks] == [
+        (None, "a"),
+        ("p1", "bc"),
+    ]
+
+
+@pytest.mark.anyio
+async def test_coalesce_max_bytes_splits_large_deltas():
+    async def run_callback(controller: RunController):
+        for _ in range(4):
+            controller.append_text("x" * 100)
+
+    chunks = [
+        chunk
+        async for chunk in create_run(
+            run_callback, coalesce_window=0.01, coalesce_max_bytes=300
+        )
+    ]
+
+    assert [len(chunk.text_delta) for chunk in chunks] == [200, 200]
+
+
+@pytest.mark.anyio
+async def test_coalesce_window_releases_lone_delta_after_window():
+    loop = asyncio.get_running_loop()
+    released_at: list[float] = []
+
+    async def run_callback(controller: RunController):
+        controller.append_text("a")
+        await asyncio.sleep(0.2)
+
+    start = loop.time()
+    async for _ in create_run(run_callback, coalesce_window=0.02):
+        released_at.append(loop.time() - start)
+
+    assert 0.015 <= released_at[0] < 0.15
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from assistant_stream import RunController, run_many
+
+
+@pytest.mark.anyio
+async def test_results_are_accumulated_in_input_order():
+    def make_callback(n: int):
+        async def run_callback(controller: RunController):
+            await asyncio.sleep(0.01 * (3 - n))
+            controller.append_text("answer ")
+            controller.append_text(str(n))
+            controller.state["n"] = n
+            tool_call = await controller.add_tool_call("lookup", f"call_{n}")
+            tool_call.append_args_text('{"n": ')
+            tool_call.append_args_text(f"{n}}}")
+            tool_call.set_response(n * 2)
+
+        return run_callback
+
+    results = await run_many(
+        (make_callback(n) for n in range(3)), concurrency=2, state={}
+    )
+
+    assert [result.text for result in results] == ["answer 0", "answer 1", "answer 2"]
+    assert [result.state for result in results] == [{"n": 0}, {"n": 1}, {"n": 2}]
+    assert all(result.ok for result in results)
+    [tool_call] = results[1].tool_calls
+    assert (tool_call.tool_name, tool_call.args_text, tool_call.result) == (
+        "lookup",
+        '{"n": 1}',
+        2,
+    )
+    assert results[0].time_to_first_chunk <= results[0].duration
+
+
+@pytest.mark.anyio
+async def test_concurrency_is_bounded():
+    active = 0
+    peak = 0
+
+    async def run_callback(controller: RunController):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+
+    results = await run_many([run_callback] * 10, concurrency=3)
+
+    assert len(results) == 10
+    assert peak == 3
+
+
+@pytest.mark.anyio
+async def test_failures_and_timeouts_are_recorded_per_run():
+    async def ok(controller: RunController):
+        controller.append_text("fine")
+
+    async def failing(controller: RunController):
+        controller.append_text("partial")
+        raise RuntimeError("boom")
+
+    async def slow(controller: RunController):
+        await asyncio.sleep(10)
+
+    results = await run_many(
+        [ok, failing, (slow, {"run_id": "slow_run"})], timeout=0.05
+    )
+
+    assert results[0].ok and results[0].text == "fine"
+    assert results[1].error == "boom" and results[1].text == "partial"
+    assert results[2].timed_out and results[2].run_id == "slow_run"
@@ -0,0 +1,143 @@
+import asyncio
+
+import pytest
+
+from assistant_stream import RunController, create_run
+from assistant_stream.broadcast import BroadcastOverflowError, RunBroadcast
+from assistant_stream.serialization import AssistantTransportEncoder, DataStreamEncoder
+
+
+class CountingDataStreamEncoder(DataStreamEncoder):
+    calls = 0
+
+    def encode_chunk(self, chunk):
+        type(self).calls += 1
+        return super().encode_chunk(chunk)
+
+
+@pytest.mark.anyio
+async def test_subscribers_share_one_run():
+    calls = 0
+    release = asyncio.Event()
+
+    async def run_callback(controller: RunController):
+        nonlocal calls
+        calls += 1
+        controller.append_text("a")
+        await release.wait()
+        controller.append_text("b")
+
+    broadcast = RunBroadcast(create_run(run_callback))
+
+    async def collect():
+        return [chunk.text_delta async for chunk in broadcast.subscribe()]
+
+    first = asyncio.create_task(collect())
+    second = asyncio.create_task(collect())
+    await asyncio.sleep(0.01)
+    release.set()
+
+    assert await first == await second == ["a", "b"]
+    assert calls == 1
+
+
+@pytest.mark.anyio
+async def test_late_subscriber_gets_replay():
+    async def run_callback(controller: RunController):
+        controller.append_text("a")
+        controller.append_text("b")
+
+    broadcast = RunBroadcast(create_run(run_callback))
+    first = [chunk.text_delta async for chunk in broadcast.subscribe()]
+    late = [chunk.text_delta async for chunk in broadcast.subscribe()]
+
+    assert first == late == ["a", "b"]
+
+
+@pytest.mark.anyio
+async def test_encoding_happens_once_per_encoder_type():
+    CountingDataStreamEncoder.calls = 0
+
+    async def run_callback(controller: RunController):
+        controller.append_text("a")
+        controller.append_text("b")
+
+    broadcast = RunBroadcast(create_run(run_callback))
+
+    results = await asyncio.gather(
+        *[
+            _collect(broadcast.subscribe_encoded(CountingDataStreamEncoder()))
+            for _ in range(3)
+        ],
+        _collect(broadcast.subscribe_encoded(AssistantTransportEncoder())),
+    )
+
+    assert results[0] == results[1] == results[2] == ['0:"a"\n', '0:"b"\n']
+    assert results[3][-1] == "data: [DONE]\n\n"
+    assert CountingDataStreamEncoder.calls == 2
+
+
+@pytest.mark.anyio
+async def test_slow_subscriber_is_dropped():
+    release = asyncio.Event()
+
+    async def run_callback(controller: RunController):
+        await release.wait()
+        for i in range(10):
+            controller.append_text(str(i))
+            await asyncio.sleep(0.001)
+
+    broadcast = RunBroadcast(create_run(run_callback), max_subscriber_lag=3)
+
+    async def read_slowly():
+        chunks = []
+        async for chunk in broadcast.subscribe():
+            chunks.append(chunk)
+            await asyncio.sleep(0.05)
+        return chunks
+
+    slow = asyncio.create_task(read_slowly())
+    fast = asyncio.create_task(_collect(broadcast.subscribe()))
+    await asyncio.sleep(0.01)
+    release.set()
+
+    with pytest.raises(BroadcastOverflowError):
+        await slow
+    assert len(await fast) == 10
+
+
+@pytest.mark.anyio
+async def test_last_subscriber_leaving_cancels_run():
+    cancelled = asyncio.Event()
+
+    async def run_callback(controller: RunController):
+        controller.append_text("a")
+        await controller.cancelled_event.wait()
+        cancelled.set()
+
+    broadcast = RunBroadcast(create_run(run_callback))
+    subscription = broadcast.subscribe()
+    await anext(subscription)
+    await subscription.aclose()
+
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+    assert broadcast.subscriber_count == 0
+
+
+@pytest.mark.anyio
+async def test_source_error_reaches_subscribers():
+    async def run_callback(controller: RunController):
+        controller.append_text("a")
+        raise RuntimeError("boom")
+
+    broadcast = RunBroadcast(create_run(run_callback))
+    chunk_types = []
+    with pytest.raises(RuntimeError, match="boom"):
+        async for chunk in broadcast.subscribe():
+            chunk_types.append(chunk.type)
+
+    assert chunk_types == ["text-delta", "error"]
+
+
+async def _collect(stream):
+    return [item async for item in stream]
@@ -176,3 +176,65 @@ async def test_early_stream_close_does_not_swallow_close_task_cancellation():
         await asyncio.wait_for(callback_finished.wait(), timeout=2)
         if not close_task.done():
             await asyncio.wait({close_task}, timeout=1)
+
+
+@pytest.mark.anyio
+async def test_cancel_grace_period_is_configurable():
+    loop = asyncio.get_running_loop()
+    observed: dict[str, float] = {}
+
+    async def run_callback(controller: RunController):
+        controller.append_text("start")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            observed["cancelled_at"] = loop.time()
+            raise
+
+    stream = create_run(run_callback, cancel_grace_period=0.3)
+    await anext(stream)
+    closed_at = loop.time()
+    await stream.aclose()
+
+    assert observed["cancelled_at"] - closed_at >= 0.25
+
+
+@pytest.mark.anyio
+async def test_cancellable_is_cancelled_without_grace_period():
+    upstream_cancelled = asyncio.Event()
+
+    async def upstream_request():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            upstream_cancelled.set()
+            raise
+
+    async def run_callback(controller: RunController):
+        controller.append_text("start")
+        await controller.cancellable(upstream_request())
+
+    stream = create_run(run_callback, cancel_grace_period=10)
+    await anext(stream)
+    await asyncio.wait_for(stream.aclose(), timeout=1)
+
+    assert upstream_cancelled.is_set()
+
+
+@pytest.mark.anyio
+async def test_early_stream_close_cancels_tool_call_streams():
+    observed: dict[str, int] = {}
+
+    async def run_callback(controller: RunController):
+        tool_call = await controller.add_tool_call("search", "call_1")
+        tool_call.append_args_text("{")
+        await controller.cancelled_event.wait()
+        await asyncio.sleep(0.01)
+        # The tool call is still open, but its stream reader is already gone.
+        observed["active_substreams"] = controller._substreams.active_count
+
+    stream = create_run(run_callback, cancel_grace_period=10)
+    assert (await anext(stream)).type == "tool-call-begin"
+    await asyncio.wait_for(stream.aclose(), timeout=1)
+
+    assert observed["active_substreams"] == 0
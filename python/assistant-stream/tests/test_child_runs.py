@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from assistant_stream import RunController, create_run
+
+
+@pytest.mark.anyio
+async def test_children_merge_into_parent_stream_in_order():
+    async def child(controller: RunController):
+        for i in range(3):
+            controller.append_text(str(i))
+            await asyncio.sleep(0)
+        return controller._parent_id
+
+    async def run_callback(controller: RunController):
+        handles = [
+            controller.spawn_child(child, parent_id=f"agent_{n}") for n in range(4)
+        ]
+        assert await asyncio.gather(*handles) == [f"agent_{n}" for n in range(4)]
+
+    chunks = [chunk async for chunk in create_run(run_callback)]
+
+    for n in range(4):
+        own = [chunk.text_delta for chunk in chunks if chunk.parent_id == f"agent_{n}"]
+        assert own == ["0", "1", "2"]
+
+
+@pytest.mark.anyio
+async def test_failed_child_does_not_abort_parent():
+    async def failing_child(controller: RunController):
+        controller.append_text("partial")
+        raise RuntimeError("boom")
+
+    async def run_callback(controller: RunController):
+        handle = controller.spawn_child(failing_child, parent_id="agent")
+        with pytest.raises(RuntimeError, match="boom"):
+            await handle
+        controller.append_text("parent continues")
+
+    chunks = [chunk async for chunk in create_run(run_callback)]
+
+    assert [chunk.text_delta for chunk in chunks] == ["partial", "parent continues"]
+
+
+@pytest.mark.anyio
+async def test_child_can_be_cancelled_independently():
+    async def slow_child(controller: RunController):
+        await controller.cancelled_event.wait()
+        controller.append_text("child stopped")
+
+    async def run_callback(controller: RunController):
+        handle = controller.spawn_child(slow_child)
+        await asyncio.sleep(0)
+        handle.cancel()
+        await handle
+        assert handle.controller.is_cancelled
+        assert not controller.is_cancelled
+        controller.append_text("parent done")
+
+    chunks = [chunk.text_delta async for chunk in create_run(run_callback)]
+
+    assert chunks == ["child stopped", "parent done"]
+
+
+@pytest.mark.anyio
+async def test_child_state_namespace():
+    async def child(controller: RunController):
+        controller.state["status"] = "done"
+
+    async def run_callback(controller: RunController):
+        await controller.spawn_child(child, state_path=["agents", "search"])
+
+    chunks = [
+        chunk
+        async for chunk in create_run(
+            run_callback, state={"agents": {"search": {"status": "running"}}}
+        )
+    ]
+
+    assert chunks[-1].operations == [
+        {"type": "set", "path": ["agents", "search", "status"], "value": "done"}
+    ]
+
+
+@pytest.mark.anyio
+async def test_parent_disconnect_cancels_children():
+    child_cancelled = asyncio.Event()
+
+    async def child(controller: RunController):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            child_cancelled.set()
+            raise
+
+    async def run_callback(controller: RunController):
+        controller.spawn_child(child)
+        controller.append_text("started")
+        await asyncio.sleep(10)
+
+    stream = create_run(run_callback)
+    await anext(stream)
+    await stream.aclose()
+
+    assert child_cancelled.is_set()
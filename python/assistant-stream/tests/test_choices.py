@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+import pytest
+
+from assistant_stream import RunController, create_run, run_many
+from assistant_stream.serialization.openai_stream import OpenAIStreamEncoder
+
+
+async def three_candidates(controller: RunController):
+    async def candidate(i: int):
+        for token in ("answer", f" {i}"):
+            controller.choice(i).append_text(token)
+            await asyncio.sleep(0)
+
+    await asyncio.gather(*(candidate(i) for i in range(3)))
+
+
+@pytest.mark.anyio
+async def test_choices_are_tagged_on_chunks():
+    chunks = [chunk async for chunk in create_run(three_candidates)]
+
+    for i in range(3):
+        text = "".join(c.text_delta for c in chunks if c.choice_index == i)
+        assert text == f"answer {i}"
+
+
+@pytest.mark.anyio
+async def test_choices_are_not_coalesced_together():
+    chunks = [
+        chunk
+        async for chunk in create_run(three_candidates, coalesce_max_bytes=1024)
+    ]
+
+    for i in range(3):
+        text = "".join(c.text_delta for c in chunks if c.choice_index == i)
+        assert text == f"answer {i}"
+
+
+@pytest.mark.anyio
+async def test_openai_encoder_multiplexes_choices():
+    encoder = OpenAIStreamEncoder()
+    events = [
+        json.loads(item[len("data: ") :])
+        async for item in encoder.encode_stream(create_run(three_candidates))
+        if item != "data: [DONE]\n\n"
+    ]
+
+    texts = {}
+    finished = []
+    for event in events:
+        [choice] = event["choices"]
+        if choice["finish_reason"] is not None:
+            finished.append(choice["index"])
+        else:
+            texts[choice["index"]] = (
+                texts.get(choice["index"], "") + choice["delta"]["content"]
+            )
+
+    assert texts == {0: "answer 0", 1: "answer 1", 2: "answer 2"}
+    assert finished == [0, 1, 2]
+
+
+@pytest.mark.anyio
+async def test_openai_encoder_finishes_only_produced_choices():
+    async def second_only(controller: RunController):
+        controller.choice(1).append_text("b")
+
+    async def silent(controller: RunController):
+        pass
+
+    for callback, expected in ((second_only, [1]), (silent, [0])):
+        events = [
+            json.loads(item[len("data: ") :])
+            async for item in OpenAIStreamEncoder().encode_stream(create_run(callback))
+            if item != "data: [DONE]\n\n"
+        ]
+        finished = [
+            choice["index"]
+            for event in events
+            for choice in event["choices"]
+            if choice["finish_reason"] is not None
+        ]
+        assert finished == expected
+
+
+@pytest.mark.anyio
+async def test_run_many_collects_each_choice():
+    [result] = await run_many([three_candidates])
+
+    assert result.choices == ["answer 0", "answer 1", "answer 2"]
+    assert result.text == "answer 0"
@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from assistant_stream import RunController, RunRegistry, create_run
+from assistant_stream.assistant_stream_chunk import TextDeltaChunk
+from assistant_stream.chunk_log import (
+    ChunkLogWriter,
+    iter_chunk_log,
+    replay_chunk_log,
+)
+from assistant_stream.serialization import DataStreamEncoder
+
+
+@pytest.mark.anyio
+async def test_run_chunks_round_trip_through_log(tmp_path):
+    path = tmp_path / "run.log"
+
+    async def run_callback(controller: RunController):
+        controller.append_text("Hello")
+        tool_call = await controller.add_tool_call("search", "call_1")
+        tool_call.append_args_text('{"q": "x"}')
+        tool_call.set_response({"hits": 1})
+        controller.state["status"] = "done"
+
+    live = [chunk async for chunk in create_run(run_callback, state={}, chunk_log=path)]
+    replayed = [chunk async for chunk in replay_chunk_log(path, realtime=False)]
+
+    assert replayed == live
+
+
+@pytest.mark.anyio
+async def test_unopenable_log_starts_nothing(tmp_path):
+    registry = RunRegistry()
+    started = []
+
+    async def run_callback(controller: RunController):
+        started.append(controller.run_id)
+
+    stream = create_run(
+        run_callback, registry=registry, chunk_log=tmp_path / "missing" / "run.log"
+    )
+    with pytest.raises(FileNotFoundError):
+        await anext(stream)
+    await asyncio.sleep(0)
+
+    assert started == []
+    assert len(registry) == 0
+
+
+@pytest.mark.anyio
+async def test_replay_feeds_encoders(tmp_path):
+    path = tmp_path / "run.log"
+
+    async def run_callback(controller: RunController):
+        controller.append_text("a")
+        controller.append_text("b")
+
+    live = [
+        item
+        async for item in DataStreamEncoder().encode_stream(
+            create_run(run_callback, chunk_log=path)
+        )
+    ]
+    replayed = [
+        item
+        async for item in DataStreamEncoder().encode_stream(
+            replay_chunk_log(path, realtime=False)
+        )
+    ]
+
+    assert replayed == live
+
+
+@pytest.mark.anyio
+async def test_realtime_replay_keeps_recorded_gaps(tmp_path):
+    path = tmp_path / "run.log"
+
+    async def run_callback(controller: RunController):
+        controller.append_text("a")
+        await asyncio.sleep(0.1)
+        controller.append_text("b")
+
+    [chunk async for chunk in create_run(run_callback, chunk_log=path)]
+
+    loop = asyncio.get_running_loop()
+    arrivals = []
+    async for _ in replay_chunk_log(path, speed=2.0):
+        arrivals.append(loop.time())
+
+    assert 0.04 <= arrivals[1] - arrivals[0] < 0.1
+
+
+def test_truncated_record_is_ignored(tmp_path):
+    path = tmp_path / "run.log"
+    with ChunkLogWriter(path) as writer:
+        writer.write(TextDeltaChunk(text_delta="a"))
+        writer.write(TextDeltaChunk(text_delta="b"))
+    path.write_bytes(path.read_bytes()[:-3])
+
+    assert [record.chunk.text_delta for record in iter_chunk_log(path)] == ["a"]
+
+
+def test_non_log_file_is_rejected(tmp_path):
+    path = tmp_path / "other.txt"
+    path.write_bytes(b"hello")
+
+    with pytest.raises(ValueError):
+        list(iter_chunk_log(path))
+
+
+def test_records_are_readable_before_close(tmp_path, monkeypatch):
+    synced = []
+    monkeypatch.setattr("assistant_stream.chunk_log.os.fsync", synced.append)
+    path = tmp_path / "run.log"
+
+    with ChunkLogWriter(path, fsync_interval=0) as writer:
+        writer.write(TextDeltaChunk(text_delta="a"))
+        writer.write(TextDeltaChunk(text_delta="b"))
+        records = list(iter_chunk_log(path))
+
+    assert [record.chunk.text_delta for record in records] == ["a", "b"]
+    assert len(synced) == 2
@@ -1,6 +1,13 @@
 import json
 
-from assistant_stream.assistant_stream_chunk import UpdateStateChunk
+import pytest
+
+from assistant_stream.assistant_stream_chunk import (
+    TextDeltaChunk,
+    ToolCallBeginChunk,
+    ToolCallDeltaChunk,
+    UpdateStateChunk,
+)
 from assistant_stream.serialization.data_stream import DataStreamEncoder
 
 
@@ -15,3 +22,17 @@ def test_data_stream_encoder_update_state_shape() -> None:
     assert encoded.startswith("aui-state:")
     assert encoded.endswith("\n")
     assert json.loads(encoded[len("aui-state:") :].strip()) == operations
+
+
+@pytest.mark.anyio
+async def test_data_stream_encoder_sends_only_first_choice() -> None:
+    async def stream():
+        yield TextDeltaChunk(text_delta="a")
+        yield TextDeltaChunk(text_delta="b", choice_index=1)
+        yield ToolCallBeginChunk(tool_call_id="c1", tool_name="t", choice_index=1)
+        yield ToolCallDeltaChunk(tool_call_id="c1", args_text_delta="{}")
+        yield TextDeltaChunk(text_delta="c")
+
+    encoded = [line async for line in DataStreamEncoder().encode_stream(stream())]
+
+    assert encoded == ['0:"a"\n', '0:"c"\n']
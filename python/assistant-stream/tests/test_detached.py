@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from assistant_stream import RunController, create_run
+from assistant_stream.detached import (
+    DetachedRunError,
+    InMemoryRunStore,
+    SQLiteRunStore,
+    attach_run,
+    wait_for_detached_runs,
+)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        yield InMemoryRunStore()
+    else:
+        store = SQLiteRunStore(str(tmp_path / "runs.db"), poll_interval=0.01)
+        yield store
+        store.close()
+
+
+@pytest.mark.anyio
+async def test_detached_run_streams_like_a_normal_run(store):
+    async def run_callback(controller: RunController):
+        controller.append_text("Hello")
+        controller.state["status"] = "done"
+
+    chunks = [
+        chunk
+        async for chunk in create_run(
+            run_callback, state={}, detached=True, run_store=store, run_id="run_1"
+        )
+    ]
+
+    assert [chunk.type for chunk in chunks] == ["text-delta", "update-state"]
+    await wait_for_detached_runs()
+    assert await store.status("run_1") == "done"
+    assert await store.get_state("run_1") == {"status": "done"}
+
+
+@pytest.mark.anyio
+async def test_detached_run_survives_disconnect_and_can_be_reattached(store):
+    release = asyncio.Event()
+    finished = asyncio.Event()
+
+    async def run_callback(controller: RunController):
+        controller.append_text("a")
+        await release.wait()
+        controller.append_text("b")
+        finished.set()
+
+    stream = create_run(run_callback, detached=True, run_store=store, run_id="run_1")
+    assert (await anext(stream)).text_delta == "a"
+    await stream.aclose()
+
+    attached = attach_run(store, "run_1")
+    assert (await anext(attached)).text_delta == "a"
+    release.set()
+    assert (await anext(attached)).text_delta == "b"
+    await attached.aclose()
+
+    await asyncio.wait_for(finished.wait(), timeout=1)
+    await wait_for_detached_runs()
+    tail = [chunk.text_delta async for chunk in attach_run(store, "run_1", from_index=1)]
+    assert tail == ["b"]
+
+
+@pytest.mark.anyio
+async def test_detached_run_error_reaches_attached_readers(store):
+    async def run_callback(controller: RunController):
+        controller.append_text("a")
+        raise RuntimeError("boom")
+
+    chunk_types = []
+    with pytest.raises(DetachedRunError) as exc_info:
+        async for chunk in create_run(
+            run_callback, detached=True, run_store=store, run_id="run_1"
+        ):
+            chunk_types.append(chunk.type)
+
+    assert chunk_types == ["text-delta", "error"]
+    assert exc_info.value.code == "failed"
+    assert await store.status("run_1") == "error"
+
+
+@pytest.mark.anyio
+async def test_attach_to_unknown_run(store):
+    with pytest.raises(DetachedRunError) as exc_info:
+        await anext(attach_run(store, "missing"))
+    assert exc_info.value.code == "missing"
+
+
+@pytest.mark.anyio
+async def test_detached_run_requires_store_and_run_id():
+    async def run_callback(controller: RunController):
+        pass
+
+    with pytest.raises(ValueError):
+        await anext(create_run(run_callback, detached=True, run_id="run_1"))
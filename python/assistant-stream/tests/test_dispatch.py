@@ -0,0 +1,160 @@
+import asyncio
+
+import pytest
+
+from assistant_stream import RunController
+from assistant_stream.detached import DetachedRunError, InMemoryRunStore, SQLiteRunStore
+from assistant_stream.dispatch import (
+    InMemoryRunBroker,
+    RunWorker,
+    SQLiteRunBroker,
+    dispatch_run,
+)
+
+stopped_runs = []
+
+
+async def chat(controller: RunController):
+    controller.append_text(f"hello {controller.state['name']}")
+    controller.state["done"] = True
+
+
+async def slow(controller: RunController):
+    controller.append_text("started")
+    await controller.cancelled_event.wait()
+    stopped_runs.append(controller.run_id)
+
+
+async def failing(controller: RunController):
+    raise RuntimeError("boom")
+
+
+CALLBACKS = {"chat": chat, "slow": slow, "failing": failing}
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    """Yield (front broker, front store, worker broker, worker store)."""
+    if request.param == "memory":
+        broker, store = InMemoryRunBroker(), InMemoryRunStore()
+        yield broker, store, broker, store
+        return
+    # Separate connections stand in for separate front and worker nodes.
+    path = str(tmp_path / "runs.db")
+    nodes = [
+        (
+            SQLiteRunBroker(path, poll_interval=0.01),
+            SQLiteRunStore(path, poll_interval=0.01),
+        )
+        for _ in range(2)
+    ]
+    yield (*nodes[0], *nodes[1])
+    for resource in (*nodes[0], *nodes[1]):
+        resource.close()
+
+
+@pytest.fixture
+async def worker(backend):
+    _, _, broker, store = backend
+    worker = RunWorker(broker, store, CALLBACKS, cancel_poll_interval=0.01)
+    task = asyncio.create_task(worker.run())
+    yield worker
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+
+@pytest.mark.anyio
+async def test_dispatched_run_streams_from_worker(backend, worker):
+    broker, store, _, _ = backend
+
+    chunks = [
+        chunk
+        async for chunk in dispatch_run(
+            broker, store, "chat", run_id="run_1", state={"name": "Ada"}
+        )
+    ]
+
+    assert [chunk.type for chunk in chunks] == ["text-delta", "update-state"]
+    assert chunks[0].text_delta == "hello Ada"
+    await asyncio.sleep(0.05)
+    assert await store.get_state("run_1") == {"name": "Ada", "done": True}
+
+
+@pytest.mark.anyio
+async def test_disconnect_cancels_run_on_worker(backend, worker):
+    broker, store, _, _ = backend
+    stream = dispatch_run(broker, store, "slow", run_id="run_1")
+    assert (await anext(stream)).text_delta == "started"
+    await stream.aclose()
+
+    for _ in range(200):
+        if "run_1" in stopped_runs:
+            break
+        await asyncio.sleep(0.01)
+    assert stopped_runs.count("run_1") == 1
+    stopped_runs.clear()
+
+
+@pytest.mark.anyio
+async def test_worker_errors_reach_the_front(backend, worker):
+    broker, store, _, _ = backend
+
+    for callback in ("failing", "missing"):
+        with pytest.raises(DetachedRunError) as exc_info:
+            async for _ in dispatch_run(broker, store, callback, run_id=callback):
+                pass
+        assert exc_info.value.code == "failed"
+
+
+@pytest.mark.anyio
+async def test_disconnect_before_claim_finishes_run(backend):
+    broker, store, worker_broker, _ = backend
+    stream = dispatch_run(broker, store, "chat", run_id="run_1", state={})
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(anext(stream), 0.05)
+    await stream.aclose()
+
+    assert await store.status("run_1") == "error"
+    claim = asyncio.create_task(worker_broker.claim())
+    await asyncio.sleep(0.05)
+    assert not claim.done()
+    claim.cancel()
+
+
+class CountingBroker(InMemoryRunBroker):
+    def __init__(self):
+        super().__init__()
+        self.cancel_checks = 0
+
+    async def cancel_requests(self, run_ids):
+        self.cancel_checks += 1
+        return await super().cancel_requests(run_ids)
+
+
+@pytest.mark.anyio
+async def test_worker_checks_cancels_for_all_runs_at_once():
+    broker, store = CountingBroker(), InMemoryRunStore()
+    worker = RunWorker(broker, store, CALLBACKS, cancel_poll_interval=0.01)
+    task = asyncio.create_task(worker.run())
+    streams = [
+        dispatch_run(broker, store, "slow", run_id=f"run_{i}") for i in range(10)
+    ]
+    for stream in streams:
+        assert (await anext(stream)).text_delta == "started"
+
+    checks = broker.cancel_checks
+    await asyncio.sleep(0.1)
+    assert broker.cancel_checks - checks <= 12
+
+    for stream in streams:
+        await stream.aclose()
+    for _ in range(200):
+        if worker.active_count == 0:
+            break
+        await asyncio.sleep(0.01)
+    assert sorted(stopped_runs) == sorted(f"run_{i}" for i in range(10))
+    stopped_runs.clear()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
@@ -0,0 +1,87 @@
+import asyncio
+import time
+
+import pytest
+
+from assistant_stream import RunController, RunRegistry, create_run
+from tests.conftest import busy_wait
+
+
+@pytest.mark.anyio
+async def test_loop_time_is_tracked_per_run():
+    controllers = {}
+
+    async def run_callback(controller: RunController):
+        controllers["run"] = controller
+        busy_wait(0.02)
+        controller.append_text("a")
+        await asyncio.sleep(0.05)
+
+    [chunk async for chunk in create_run(run_callback, track_loop_time=True)]
+
+    assert 0.02 <= controllers["run"].loop_time < 0.05
+
+
+@pytest.mark.anyio
+async def test_loop_time_is_not_tracked_by_default():
+    controllers = {}
+
+    async def run_callback(controller: RunController):
+        controllers["run"] = controller
+
+    [chunk async for chunk in create_run(run_callback)]
+
+    assert controllers["run"].loop_time is None
+
+
+@pytest.mark.anyio
+async def test_registry_reports_loop_time():
+    registry = RunRegistry()
+    release = asyncio.Event()
+
+    async def run_callback(controller: RunController):
+        busy_wait(0.01)
+        controller.append_text("a")
+        await release.wait()
+
+    stream = create_run(run_callback, registry=registry, run_id="run_1", track_loop_time=True)
+    await anext(stream)
+
+    assert registry.get("run_1").loop_time >= 0.01
+    release.set()
+    [chunk async for chunk in stream]
+
+
+async def hog(controller: RunController):
+    end = time.perf_counter() + 0.2
+    while time.perf_counter() < end:
+        busy_wait(0.001)
+        controller.state["n"] += 1
+        controller.append_text("x")
+        await controller.checkpoint()
+
+
+@pytest.mark.anyio
+async def test_time_slice_lets_other_work_run():
+    assert await _max_loop_gap(hog) >= 0.15
+    assert await _max_loop_gap(hog, time_slice=0.005) < 0.05
+
+
+async def _max_loop_gap(callback, **run_options) -> float:
+    loop = asyncio.get_running_loop()
+    gaps = [0.0]
+    done = False
+
+    async def ticker():
+        last = loop.time()
+        while not done:
+            await asyncio.sleep(0)
+            now = loop.time()
+            gaps.append(now - last)
+            last = now
+
+    ticks = asyncio.create_task(ticker())
+    [chunk async for chunk in create_run(callback, state={"n": 0}, **run_options)]
+    done = True
+    await ticks
+    return max(gaps)
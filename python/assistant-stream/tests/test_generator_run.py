@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from assistant_stream import GeneratorRunController, create_run_from_generator
+from assistant_stream.assistant_stream_chunk import TextDeltaChunk
+from assistant_stream.serialization import DataStreamEncoder
+
+
+@pytest.mark.anyio
+async def test_yielded_chunks_are_streamed_in_order():
+    async def run_callback(controller: GeneratorRunController):
+        yield TextDeltaChunk(text_delta="Hello")
+        yield TextDeltaChunk(text_delta=" world")
+
+    encoded = [
+        item
+        async for item in DataStreamEncoder().encode_stream(
+            create_run_from_generator(run_callback)
+        )
+    ]
+
+    assert encoded == ['0:"Hello"\n', '0:" world"\n']
+
+
+@pytest.mark.anyio
+async def test_state_updates_precede_next_chunk():
+    async def run_callback(controller: GeneratorRunController):
+        controller.state["status"] = "thinking"
+        yield TextDeltaChunk(text_delta="a")
+        yield {"type": "set", "path": ["status"], "value": "done"}
+        controller.append_state_text(["log"], "!")
+
+    chunks = [
+        chunk
+        async for chunk in create_run_from_generator(
+            run_callback, state={"status": "idle", "log": ""}
+        )
+    ]
+
+    assert [chunk.type for chunk in chunks] == [
+        "update-state",
+        "text-delta",
+        "update-state",
+    ]
+    assert chunks[0].operations == [
+        {"type": "set", "path": ["status"], "value": "thinking"}
+    ]
+    assert chunks[2].operations == [
+        {"type": "set", "path": ["status"], "value": "done"},
+        {"type": "append-text", "path": ["log"], "value": "!"},
+    ]
+
+
+@pytest.mark.anyio
+async def test_error_is_emitted_then_raised():
+    async def run_callback(controller: GeneratorRunController):
+        yield TextDeltaChunk(text_delta="a")
+        raise RuntimeError("boom")
+
+    chunk_types = []
+    with pytest.raises(RuntimeError, match="boom"):
+        async for chunk in create_run_from_generator(run_callback):
+            chunk_types.append(chunk.type)
+
+    assert chunk_types == ["text-delta", "error"]
+
+
+@pytest.mark.anyio
+async def test_early_close_cancels_and_closes_generator():
+    closed = asyncio.Event()
+    seen_controller = None
+
+    async def run_callback(controller: GeneratorRunController):
+        nonlocal seen_controller
+        seen_controller = controller
+        try:
+            while True:
+                yield TextDeltaChunk(text_delta="a")
+        finally:
+            closed.set()
+
+    stream = create_run_from_generator(run_callback)
+    await anext(stream)
+    await stream.aclose()
+
+    assert closed.is_set()
+    assert seen_controller.is_cancelled
@@ -0,0 +1,124 @@
+import asyncio
+import threading
+
+import pytest
+
+from assistant_stream import LoopLagMonitor, RunController, create_run
+from tests.conftest import busy_wait
+
+
+def blocking_tool_call() -> None:
+    busy_wait(0.3)
+
+
+@pytest.mark.anyio
+async def test_stall_in_callback_is_attributed_to_run():
+    stalls = []
+    monitor = LoopLagMonitor(interval=0.01, threshold=0.1, on_stall=stalls.append)
+
+    async def run_callback(controller: RunController):
+        await asyncio.sleep(0.03)
+        blocking_tool_call()
+        controller.append_text("done")
+
+    try:
+        [
+            chunk
+            async for chunk in create_run(
+                run_callback, run_id="run_1", lag_monitor=monitor
+            )
+        ]
+        await asyncio.sleep(0.03)
+    finally:
+        monitor.stop()
+
+    assert monitor.stall_count == 1
+    assert monitor.max_lag >= 0.25
+    [stall] = stalls
+    assert stall.run_id == "run_1"
+    assert stall.chunk_type is None
+    assert "blocking_tool_call" in stall.stack
+
+
+@pytest.mark.anyio
+async def test_stall_in_reader_is_attributed_to_chunk():
+    stalls = []
+    monitor = LoopLagMonitor(interval=0.01, threshold=0.1, on_stall=stalls.append)
+
+    async def run_callback(controller: RunController):
+        controller.add_data({"large": "result"})
+
+    try:
+        async for chunk in create_run(
+            run_callback, run_id="run_1", lag_monitor=monitor
+        ):
+            # Stands in for a slow synchronous encode of a huge chunk.
+            busy_wait(0.3)
+        await asyncio.sleep(0.03)
+    finally:
+        monitor.stop()
+
+    [stall] = stalls
+    assert stall.run_id == "run_1"
+    assert stall.chunk_type == "data"
+
+
+@pytest.mark.anyio
+async def test_no_stalls_when_loop_is_responsive():
+    monitor = LoopLagMonitor(interval=0.01, threshold=0.1)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.1)
+    finally:
+        monitor.stop()
+
+    assert monitor.stall_count == 0
+    assert not monitor.running
+
+
+def watchdog_threads():
+    return [
+        thread
+        for thread in threading.enumerate()
+        if thread.name == "assistant-stream-lag-watchdog"
+    ]
+
+
+@pytest.mark.anyio
+async def test_monitor_stops_after_last_run():
+    monitor = LoopLagMonitor(interval=0.01, threshold=0.1)
+
+    async def run_callback(controller: RunController):
+        controller.append_text("done")
+
+    [chunk async for chunk in create_run(run_callback, lag_monitor=monitor)]
+    assert not monitor.running
+
+    await asyncio.sleep(0.05)
+    assert watchdog_threads() == []
+
+
+def test_each_loop_is_monitored_separately():
+    stalls = []
+    monitor = LoopLagMonitor(interval=0.01, threshold=0.1, on_stall=stalls.append)
+
+    async def run_callback(controller: RunController):
+        await asyncio.sleep(0.03)
+        blocking_tool_call()
+        controller.append_text("done")
+
+    async def consume(run_id: str):
+        async for _ in create_run(run_callback, run_id=run_id, lag_monitor=monitor):
+            pass
+
+    threads = [
+        threading.Thread(target=asyncio.run, args=(consume(f"run_{i}"),))
+        for i in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(stall.run_id for stall in stalls) == ["run_0", "run_1"]
+    assert not monitor.running
@@ -0,0 +1,154 @@
+import asyncio
+import tracemalloc
+
+import pytest
+
+from assistant_stream import (
+    RunController,
+    RunMemoryLimitError,
+    RunRegistry,
+    create_run,
+)
+
+
+@pytest.mark.anyio
+async def test_memory_usage_tracks_state_and_queued_chunks():
+    usages = []
+
+    async def run_callback(controller: RunController):
+        usages.append(controller.memory_usage)
+        controller.state["notes"] = "x" * 1000
+        controller.append_text("y" * 500)
+        usages.append(controller.memory_usage)
+
+    stream = create_run(run_callback, state={}, max_memory_bytes=1_000_000)
+    chunks = [chunk async for chunk in stream]
+
+    before, after = usages
+    assert after.state_bytes - before.state_bytes >= 1000
+    assert after.queued_bytes >= 1500
+    assert after.traced_bytes is None
+    assert after.total == after.state_bytes + after.queued_bytes
+    assert len(chunks) == 2
+
+
+@pytest.mark.anyio
+async def test_incremental_state_size_matches_full_estimate():
+    controllers = []
+
+    async def run_callback(controller: RunController):
+        controllers.append(controller)
+        controller.state["messages"] = [{"text": "hi"}]
+        controller.state["messages"][0]["text"] += " there"
+        controller.state["messages"] = []
+        controller.state["title"] = "t"
+
+    stream = create_run(run_callback, state={}, max_memory_bytes=1_000_000)
+    [chunk async for chunk in stream]
+
+    state_manager = controllers[0]._state_manager
+    tracked = state_manager.approximate_size
+    state_manager._state_bytes = None
+    assert tracked == state_manager.approximate_size
+
+
+@pytest.mark.anyio
+async def test_exceeding_memory_limit_fails_run():
+    cancelled = asyncio.Event()
+
+    async def run_callback(controller: RunController):
+        try:
+            for _ in range(100):
+                controller.state["log"] += "x" * 100
+                await asyncio.sleep(0.001)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        await controller.cancelled_event.wait()
+        cancelled.set()
+
+    chunks = []
+    with pytest.raises(RunMemoryLimitError, match="memory limit"):
+        async for chunk in create_run(
+            run_callback, state={"log": ""}, max_memory_bytes=2000
+        ):
+            chunks.append(chunk)
+
+    assert chunks[-1].type == "error"
+    assert cancelled.is_set()
+
+
+@pytest.mark.anyio
+async def test_trace_memory_reports_traced_bytes():
+    assert not tracemalloc.is_tracing()
+    usages = []
+
+    async def run_callback(controller: RunController):
+        data = [str(i) * 50 for i in range(1000)]
+        usages.append(controller.memory_usage)
+        del data
+
+    [chunk async for chunk in create_run(run_callback, trace_memory=True)]
+
+    assert usages[0].traced_bytes > 100_000
+    assert not tracemalloc.is_tracing()
+
+
+@pytest.mark.anyio
+async def test_tool_call_buffers_are_counted_until_read():
+    usages = []
+    controllers = []
+
+    async def run_callback(controller: RunController):
+        controllers.append(controller)
+        tool_call = await controller.add_tool_call("search", "call_1")
+        tool_call.set_response("r" * 1000)
+        usages.append(controller.memory_usage)
+
+    [chunk async for chunk in create_run(run_callback)]
+
+    assert usages[0].substream_bytes >= 1000
+    # Finished tool calls are forgotten.
+    assert controllers[0]._tool_calls == []
+    assert controllers[0].memory_usage.substream_bytes == 0
+
+
+@pytest.mark.anyio
+async def test_registry_reports_memory_only_for_tracked_runs():
+    registry = RunRegistry()
+    infos = {}
+
+    async def run_callback(controller: RunController):
+        controller.state["notes"] = "x" * 1000
+        await asyncio.sleep(0)
+        infos[controller.run_id] = registry.get(controller.run_id)
+
+    for run_id, limit in (("tracked", 1_000_000), ("untracked", None)):
+        stream = create_run(
+            run_callback,
+            state={},
+            registry=registry,
+            run_id=run_id,
+            max_memory_bytes=limit,
+        )
+        [chunk async for chunk in stream]
+
+    assert infos["tracked"].memory_bytes >= 1000
+    assert infos["untracked"].memory_bytes is None
+
+
+@pytest.mark.anyio
+async def test_child_tool_call_buffers_count_toward_parent():
+    usages = []
+
+    async def run_callback(controller: RunController):
+        async def child_callback(child: RunController):
+            tool_call = await child.add_tool_call("search", "call_1")
+            tool_call.set_response("r" * 1000)
+            usages.append(controller.memory_usage)
+
+        await controller.spawn_child(child_callback)
+
+    [chunk async for chunk in create_run(run_callback)]
+
+    assert usages[0].substream_bytes >= 1000
@@ -0,0 +1,171 @@
+import asyncio
+import os
+
+import pytest
+
+from assistant_stream import RunRegistry
+from assistant_stream.process_pool import (
+    _MAX_INBOX,
+    _READ_SIZE,
+    RunProcessPool,
+    WorkerRunError,
+    create_process_run,
+)
+
+# Callbacks run in spawned worker processes, so they must be module-level.
+
+
+async def _emit_pid(controller):
+    controller.append_text(str(os.getpid()))
+    controller.state["count"] = controller.state["count"] + 1
+    tool_call = await controller.add_tool_call("lookup", "call_1")
+    tool_call.append_args_text('{"q": 1}')
+    tool_call.set_response("found")
+
+
+async def _fail(controller):
+    controller.append_text("partial")
+    raise ValueError("bad input")
+
+
+async def _wait_for_cancel(controller):
+    controller.append_text("started")
+    await controller.cancelled_event.wait()
+    controller.append_text("stopping")
+    await asyncio.sleep(10)
+
+
+async def _echo_blob(controller):
+    controller.append_text(str(len(controller.state["blob"])))
+    controller.state["echo"] = controller.state["blob"]
+
+
+async def _flood(controller):
+    for _ in range(5000):
+        controller.append_text("x" * 100)
+
+
+async def _report_cancel(controller):
+    controller.append_text("started")
+    await asyncio.sleep(0.3)
+    controller.append_text(str(controller.is_cancelled))
+
+
+@pytest.fixture
+def pool():
+    with RunProcessPool(max_workers=1) as pool:
+        yield pool
+
+
+@pytest.mark.anyio
+async def test_callback_runs_in_worker_process(pool):
+    chunks = [
+        chunk
+        async for chunk in create_process_run(
+            _emit_pid, pool=pool, state={"count": 1}
+        )
+    ]
+
+    text = [chunk.text_delta for chunk in chunks if chunk.type == "text-delta"]
+    assert text and text[0] != str(os.getpid())
+    assert {"type": "set", "path": ["count"], "value": 2} in [
+        op for chunk in chunks if chunk.type == "update-state" for op in chunk.operations
+    ]
+    results = [chunk for chunk in chunks if chunk.type == "tool-result"]
+    assert [chunk.result for chunk in results] == ["found"]
+
+
+@pytest.mark.anyio
+async def test_worker_error_fails_run(pool):
+    chunks = []
+    with pytest.raises(WorkerRunError, match="ValueError: bad input"):
+        async for chunk in create_process_run(_fail, pool=pool):
+            chunks.append(chunk)
+
+    assert chunks[0].text_delta == "partial"
+    assert chunks[-1].type == "error"
+
+
+@pytest.mark.anyio
+async def test_cancellation_is_forwarded_and_worker_reused(pool):
+    stream = create_process_run(_wait_for_cancel, pool=pool, cancel_grace_period=0.5)
+    first = await anext(stream)
+    assert first.text_delta == "started"
+    await stream.aclose()
+
+    # The single worker is handed back once the callback has wound down.
+    chunks = [
+        chunk
+        async for chunk in create_process_run(
+            _emit_pid, pool=pool, state={"count": 0}
+        )
+    ]
+    assert any(chunk.type == "tool-result" for chunk in chunks)
+
+
+@pytest.mark.anyio
+async def test_large_messages_cross_the_pipe(pool):
+    blob = "x" * (4 * 1024 * 1024)
+    chunks = [
+        chunk
+        async for chunk in create_process_run(
+            _echo_blob, pool=pool, state={"blob": blob}
+        )
+    ]
+
+    assert chunks[0].text_delta == str(len(blob))
+    assert {"type": "set", "path": ["echo"], "value": blob} in [
+        op for chunk in chunks if chunk.type == "update-state" for op in chunk.operations
+    ]
+
+
+@pytest.mark.anyio
+async def test_unpicklable_run_leaves_worker_usable(pool):
+    async def local_callback(controller):
+        pass
+
+    with pytest.raises(Exception):
+        async for _ in create_process_run(local_callback, pool=pool):
+            pass
+
+    chunks = [
+        chunk
+        async for chunk in create_process_run(
+            _emit_pid, pool=pool, state={"count": 0}
+        )
+    ]
+    assert any(chunk.type == "tool-result" for chunk in chunks)
+
+
+@pytest.mark.anyio
+async def test_slow_consumer_holds_back_the_worker(pool):
+    registry = RunRegistry()
+    stream = create_process_run(
+        _flood,
+        pool=pool,
+        run_id="run_1",
+        registry=registry,
+        max_buffered_chunks=4,
+    )
+    chunks = [await anext(stream)]
+    await asyncio.sleep(0.5)
+
+    [worker] = pool._workers
+    assert registry.get_controller("run_1")._queue.depth <= 4
+    # Reading stops once the inbox is full; one read may overshoot it.
+    assert worker._inbox.qsize() <= _MAX_INBOX + _READ_SIZE // 100
+
+    chunks += [chunk async for chunk in stream]
+    assert len(chunks) == 5000
+
+
+@pytest.mark.anyio
+async def test_stale_cancel_does_not_reach_the_next_run(pool):
+    [_ async for _ in create_process_run(_emit_pid, pool=pool, state={"count": 0})]
+    [worker] = pool._workers
+    stream = create_process_run(_report_cancel, pool=pool)
+    assert (await anext(stream)).text_delta == "started"
+
+    await worker.send(("cancel", worker.runs - 1))
+
+    assert [chunk.text_delta async for chunk in stream] == ["False"]
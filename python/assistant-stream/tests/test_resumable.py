@@ -0,0 +1,151 @@
+import asyncio
+
+import pytest
+
+from assistant_stream import RunController, create_run
+from assistant_stream.resumable import (
+    InMemoryResumableStreamStore,
+    ResumableStreamContext,
+    ResumableStreamError,
+    SQLiteResumableStreamStore,
+)
+from assistant_stream.serialization import DataStreamEncoder
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        yield InMemoryResumableStreamStore()
+    else:
+        store = SQLiteResumableStreamStore(str(tmp_path / "streams.db"), poll_interval=0.01)
+        yield store
+        store.close()
+
+
+def encoded_run(callback):
+    return lambda: DataStreamEncoder().encode_stream(create_run(callback))
+
+
+async def collect(stream) -> bytes:
+    return b"".join([chunk async for chunk in stream])
+
+
+@pytest.mark.anyio
+async def test_run_streams_encoded_output(store):
+    context = ResumableStreamContext(store)
+
+    async def run_callback(controller: RunController):
+        controller.append_text("Hello")
+        controller.append_text(" world")
+
+    stream = await context.run("stream_1", encoded_run(run_callback))
+
+    assert await collect(stream) == b'0:"Hello"\n0:" world"\n'
+    assert await context.status("stream_1") == "done"
+
+
+@pytest.mark.anyio
+async def test_second_run_joins_instead_of_regenerating(store):
+    context = ResumableStreamContext(store)
+    calls = 0
+    release = asyncio.Event()
+
+    async def run_callback(controller: RunController):
+        nonlocal calls
+        calls += 1
+        controller.append_text("a")
+        await release.wait()
+        controller.append_text("b")
+
+    first = await context.run("stream_1", encoded_run(run_callback))
+    second = await context.run("stream_1", encoded_run(run_callback))
+    release.set()
+
+    assert await collect(first) == await collect(second) == b'0:"a"\n0:"b"\n'
+    assert calls == 1
+
+
+@pytest.mark.anyio
+async def test_resume_replays_from_offset_after_disconnect(store):
+    context = ResumableStreamContext(store)
+    release = asyncio.Event()
+
+    async def run_callback(controller: RunController):
+        controller.append_text("first")
+        await release.wait()
+        controller.append_text("second")
+
+    stream = await context.run("stream_1", encoded_run(run_callback))
+    received = await anext(stream)
+    # Client disconnects; the producer keeps running.
+    await stream.aclose()
+    release.set()
+
+    resumed = await context.resume("stream_1", from_offset=len(received) - 3)
+    assert received + (await collect(resumed))[3:] == b'0:"first"\n0:"second"\n'
+
+    from_start = await context.resume("stream_1")
+    assert await collect(from_start) == b'0:"first"\n0:"second"\n'
+
+
+@pytest.mark.anyio
+async def test_resume_missing_stream(store):
+    context = ResumableStreamContext(store)
+
+    assert await context.resume("missing") is None
+    assert await context.status("missing") == "missing"
+    with pytest.raises(ResumableStreamError) as exc_info:
+        await context.require_resume("missing")
+    assert exc_info.value.code == "missing"
+
+
+@pytest.mark.anyio
+async def test_producer_error_is_surfaced_to_readers(store):
+    context = ResumableStreamContext(store)
+
+    async def failing_stream():
+        yield "partial"
+        raise RuntimeError("boom")
+
+    stream = await context.run("stream_1", failing_stream)
+
+    chunks = []
+    with pytest.raises(ResumableStreamError, match="boom"):
+        async for chunk in stream:
+            chunks.append(chunk)
+    assert chunks == [b"partial"]
+    assert await context.status("stream_1") == "error"
+
+
+@pytest.mark.anyio
+async def test_delete_removes_stream(store):
+    context = ResumableStreamContext(store)
+
+    async def run_callback(controller: RunController):
+        controller.append_text("a")
+
+    await collect(await context.run("stream_1", encoded_run(run_callback)))
+    await context.delete("stream_1")
+
+    assert await context.status("stream_1") == "missing"
+
+
+@pytest.mark.anyio
+async def test_invalid_stream_id_is_rejected(store):
+    context = ResumableStreamContext(store)
+
+    with pytest.raises(ResumableStreamError) as exc_info:
+        await context.run("bad id!", encoded_run(None))
+    assert exc_info.value.code == "invalid-id"
+
+
+@pytest.mark.anyio
+async def test_in_memory_store_expires_streams():
+    now = 0.0
+    store = InMemoryResumableStreamStore(default_ttl=10, now=lambda: now)
+
+    assert await store.acquire("stream_1") == "producer"
+    assert await store.acquire("stream_1") == "consumer"
+    now = 11
+    assert await store.status("stream_1") == "missing"
+    assert await store.acquire("stream_1") == "producer"
@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from assistant_stream import RunController, RunObserver, create_run
+
+
+class RecordingObserver(RunObserver):
+    def __init__(self):
+        self.events: list[tuple] = []
+
+    def on_run_start(self, controller):
+        self.events.append(("run_start",))
+
+    def on_run_end(self, controller, error):
+        self.events.append(("run_end", type(error).__name__ if error else None))
+
+    def on_first_chunk(self, controller, chunk):
+        self.events.append(("first_chunk", chunk.type))
+
+    def on_chunk_enqueued(self, controller, chunk_type, size):
+        assert size > 0
+        self.events.append(("enqueued", chunk_type))
+
+    def on_chunk_dequeued(self, controller, chunk_type, size):
+        assert size > 0
+        self.events.append(("dequeued", chunk_type))
+
+    def on_state_flush(self, controller, op_count):
+        self.events.append(("state_flush", op_count))
+
+    def on_tool_call_begin(self, controller, tool_call_id, tool_name):
+        self.events.append(("tool_call_begin", tool_call_id, tool_name))
+
+    def on_tool_result(self, controller, tool_call_id):
+        self.events.append(("tool_result", tool_call_id))
+
+    def on_cancel(self, controller, reason):
+        self.events.append(("cancel", reason))
+
+
+@pytest.mark.anyio
+async def test_observer_receives_run_events():
+    observer = RecordingObserver()
+
+    async def run_callback(controller: RunController):
+        controller.append_text("hi")
+        controller.state["a"] = 1
+        controller.state["b"] = 2
+        tool = await controller.add_tool_call("search", "call_1")
+        tool.set_response("ok")
+
+    chunks = [
+        chunk async for chunk in create_run(run_callback, state={}, observer=observer)
+    ]
+    await asyncio.sleep(0)
+
+    events = observer.events
+    assert events[0] == ("run_start",)
+    assert events[-1] == ("run_end", None)
+    assert ("first_chunk", "text-delta") in events
+    assert ("state_flush", 2) in events
+    assert ("tool_call_begin", "call_1", "search") in events
+    assert ("tool_result", "call_1") in events
+    enqueued = [event[1] for event in events if event[0] == "enqueued"]
+    dequeued = [event[1] for event in events if event[0] == "dequeued"]
+    assert enqueued == dequeued == [chunk.type for chunk in chunks]
+
+
+@pytest.mark.anyio
+async def test_observer_reports_callback_error():
+    observer = RecordingObserver()
+
+    async def run_callback(controller: RunController):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        async for _ in create_run(run_callback, observer=observer):
+            pass
+    await asyncio.sleep(0)
+
+    assert observer.events[-1] == ("run_end", "RuntimeError")
+
+
+@pytest.mark.anyio
+async def test_observer_reports_disconnect_cancellation():
+    observer = RecordingObserver()
+
+    async def run_callback(controller: RunController):
+        controller.append_text("start")
+        await controller.cancelled_event.wait()
+
+    stream = create_run(run_callback, observer=observer)
+    await anext(stream)
+    await stream.aclose()
+
+    assert ("cancel", "disconnect") in observer.events
+
+
+@pytest.mark.anyio
+async def test_default_observer_methods_are_no_ops():
+    async def run_callback(controller: RunController):
+        controller.append_text("hi")
+        tool = await controller.add_tool_call("search")
+        tool.set_response("ok")
+
+    chunks = [chunk async for chunk in create_run(run_callback, observer=RunObserver())]
+
+    assert [chunk.type for chunk in chunks] == [
+        "text-delta",
+        "tool-call-begin",
+        "tool-result",
+    ]
@@ -0,0 +1,182 @@
+import asyncio
+
+import pytest
+
+from assistant_stream import RunController, RunRegistry, create_run
+
+
+@pytest.mark.anyio
+async def test_registry_tracks_active_runs():
+    registry = RunRegistry()
+    observed: dict[str, object] = {}
+
+    async def run_callback(controller: RunController):
+        observed["runs"] = registry.list_runs()
+        observed["thread_runs"] = registry.list_runs(thread_id="other")
+        controller.append_text("hi")
+
+    chunks = [
+        chunk
+        async for chunk in create_run(
+            run_callback, registry=registry, run_id="run_1", thread_id="thread_1"
+        )
+    ]
+    await asyncio.sleep(0)
+
+    assert [chunk.type for chunk in chunks] == ["text-delta"]
+    runs = observed["runs"]
+    assert [(run.run_id, run.thread_id, run.is_cancelled) for run in runs] == [
+        ("run_1", "thread_1", False)
+    ]
+    assert observed["thread_runs"] == []
+    assert len(registry) == 0
+    assert registry.get("run_1") is None
+
+
+@pytest.mark.anyio
+async def test_registry_cancel_stops_cooperative_callback():
+    registry = RunRegistry()
+    observed: dict[str, object] = {}
+
+    async def run_callback(controller: RunController):
+        controller.append_text("start")
+        await controller.cancelled_event.wait()
+        observed["is_cancelled"] = controller.is_cancelled
+
+    chunks = []
+    async for chunk in create_run(run_callback, registry=registry, run_id="run_1"):
+        chunks.append(chunk)
+        assert registry.cancel("run_1") is True
+
+    assert [chunk.type for chunk in chunks] == ["text-delta"]
+    assert observed["is_cancelled"] is True
+    assert registry.cancel("missing") is False
+
+
+@pytest.mark.anyio
+async def test_registry_cancel_forces_non_cooperative_callback():
+    registry = RunRegistry()
+    callback_cancelled = asyncio.Event()
+
+    async def run_callback(controller: RunController):
+        controller.append_text("start")
+        try:
+            while True:
+                await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            callback_cancelled.set()
+            raise
+
+    async def consume():
+        return [
+            chunk
+            async for chunk in create_run(run_callback, registry=registry, run_id="run_1")
+        ]
+
+    consumer = asyncio.create_task(consume())
+    await asyncio.sleep(0.01)
+    registry.cancel("run_1")
+
+    chunks = await asyncio.wait_for(consumer, timeout=1)
+    assert [chunk.type for chunk in chunks] == ["text-delta"]
+    assert callback_cancelled.is_set()
+
+
+@pytest.mark.anyio
+async def test_registry_cancel_thread_cancels_all_runs_of_thread():
+    registry = RunRegistry()
+
+    async def run_callback(controller: RunController):
+        await controller.cancelled_event.wait()
+
+    async def consume(run_id: str, thread_id: str):
+        return [
+            chunk
+            async for chunk in create_run(
+                run_callback, registry=registry, run_id=run_id, thread_id=thread_id
+            )
+        ]
+
+    tasks = [
+        asyncio.create_task(consume("a", "thread_1")),
+        asyncio.create_task(consume("b", "thread_1")),
+        asyncio.create_task(consume("c", "thread_2")),
+    ]
+    await asyncio.sleep(0.01)
+
+    assert sorted(registry.cancel_thread("thread_1")) == ["a", "b"]
+    await asyncio.wait_for(asyncio.gather(*tasks[:2]), timeout=1)
+    assert [run.run_id for run in registry.list_runs()] == ["c"]
+
+    registry.cancel("c")
+    await asyncio.wait_for(tasks[2], timeout=1)
+
+
+@pytest.mark.anyio
+async def test_registry_rejects_duplicate_run_ids():
+    registry = RunRegistry()
+
+    async def run_callback(controller: RunController):
+        await controller.cancelled_event.wait()
+
+    first = create_run(run_callback, registry=registry, run_id="run_1")
+    first_task = asyncio.create_task(anext(first, None))
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(ValueError):
+        await anext(create_run(run_callback, registry=registry, run_id="run_1"))
+
+    registry.cancel("run_1")
+    await asyncio.wait_for(first_task, timeout=1)
+
+
+@pytest.mark.anyio
+async def test_tool_result_is_delivered_into_live_run():
+    registry = RunRegistry()
+
+    async def run_callback(controller: RunController):
+        tool_call = await controller.add_tool_call("approve", "call_1")
+        tool_call.append_args_text("{}")
+        result = await controller.wait_for_tool_result("call_1")
+        tool_call.set_response(result)
+
+    stream = create_run(run_callback, registry=registry, run_id="run_1")
+    assert (await anext(stream)).type == "tool-call-begin"
+    assert (await anext(stream)).type == "tool-call-delta"
+
+    delivered = registry.submit_commands(
+        "run_1",
+        [
+            {"type": "add-message", "message": {}},
+            {"type": "add-tool-result", "toolCallId": "call_1", "result": "approved"},
+        ],
+    )
+
+    assert delivered == ["call_1"]
+    rest = [chunk async for chunk in stream]
+    assert [chunk.type for chunk in rest] == ["tool-result"]
+    assert rest[0].result == "approved"
+
+
+@pytest.mark.anyio
+async def test_tool_result_submitted_early_is_kept():
+    registry = RunRegistry()
+    release = asyncio.Event()
+    results = []
+
+    async def run_callback(controller: RunController):
+        await release.wait()
+        results.append(await controller.wait_for_tool_result("call_1", timeout=1))
+
+    stream = create_run(run_callback, registry=registry, run_id="run_1")
+    task = asyncio.create_task(anext(stream, None))
+    await asyncio.sleep(0.01)
+
+    assert registry.submit_tool_result("run_1", "call_1", 42)
+    with pytest.raises(ValueError):
+        registry.submit_tool_result("run_1", "call_1", 43)
+    assert not registry.submit_tool_result("missing", "call_1", 42)
+    release.set()
+    await task
+
+    assert results == [42]
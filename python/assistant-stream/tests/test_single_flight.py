@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+from assistant_stream import RunController, create_run
+from assistant_stream.serialization import DataStreamEncoder
+from assistant_stream.single_flight import SingleFlight, single_flight_key
+
+
+def test_key_is_stable_for_equal_requests():
+    commands = [{"type": "add-message", "message": {"text": "hi", "role": "user"}}]
+    reordered = [{"message": {"role": "user", "text": "hi"}, "type": "add-message"}]
+
+    assert single_flight_key("thread_1", commands) == single_flight_key(
+        "thread_1", reordered
+    )
+    assert single_flight_key("thread_1", commands) != single_flight_key(
+        "thread_2", commands
+    )
+
+
+@pytest.mark.anyio
+async def test_duplicate_requests_share_one_run():
+    single_flight = SingleFlight()
+    calls = 0
+    release = asyncio.Event()
+
+    async def run_callback(controller: RunController):
+        nonlocal calls
+        calls += 1
+        controller.append_text("a")
+        await release.wait()
+        controller.append_text("b")
+
+    def start():
+        return single_flight.run("key", lambda: create_run(run_callback))
+
+    async def collect(stream):
+        return [chunk.text_delta async for chunk in stream]
+
+    first = asyncio.create_task(collect(start()))
+    await asyncio.sleep(0.01)
+    second = asyncio.create_task(collect(start()))
+    await asyncio.sleep(0.01)
+    release.set()
+
+    assert await first == await second == ["a", "b"]
+    assert calls == 1
+    assert "key" not in single_flight
+
+
+@pytest.mark.anyio
+async def test_finished_run_frees_key():
+    single_flight = SingleFlight()
+    calls = 0
+
+    async def run_callback(controller: RunController):
+        nonlocal calls
+        calls += 1
+        controller.append_text("a")
+
+    for _ in range(2):
+        encoded = [
+            item
+            async for item in single_flight.run_encoded(
+                "key", lambda: create_run(run_callback), DataStreamEncoder()
+            )
+        ]
+        assert encoded == ['0:"a"\n']
+        await asyncio.sleep(0)
+
+    assert calls == 2
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from assistant_stream import RunController, create_run
+from assistant_stream.assistant_stream_chunk import TextDeltaChunk
+
+
+@pytest.mark.anyio
+async def test_substream_concurrency_is_bounded():
+    active = 0
+    peak = 0
+
+    async def substream(i: int):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        yield TextDeltaChunk(text_delta=str(i))
+        active -= 1
+
+    async def run_callback(controller: RunController):
+        for i in range(6):
+            controller.add_stream(substream(i))
+
+    chunks = [
+        chunk async for chunk in create_run(run_callback, max_concurrent_substreams=2)
+    ]
+
+    assert sorted(chunk.text_delta for chunk in chunks) == [str(i) for i in range(6)]
+    assert peak == 2
+
+
+@pytest.mark.anyio
+async def test_substream_error_fails_run_fast():
+    sibling_cancelled = asyncio.Event()
+    callback_cancelled = asyncio.Event()
+
+    async def failing():
+        yield TextDeltaChunk(text_delta="a")
+        raise RuntimeError("boom")
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+            yield TextDeltaChunk(text_delta="never")
+        except asyncio.CancelledError:
+            sibling_cancelled.set()
+            raise
+
+    async def run_callback(controller: RunController):
+        controller.add_stream(slow())
+        controller.add_stream(failing())
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            callback_cancelled.set()
+            raise
+
+    chunk_types = []
+    with pytest.raises(RuntimeError, match="boom"):
+        async for chunk in create_run(run_callback):
+            chunk_types.append(chunk.type)
+
+    assert chunk_types == ["text-delta", "error"]
+    assert sibling_cancelled.is_set()
+    assert callback_cancelled.is_set()
+
+
+@pytest.mark.anyio
+async def test_early_close_cancels_substreams():
+    substream_cancelled = asyncio.Event()
+
+    async def substream():
+        yield TextDeltaChunk(text_delta="a")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            substream_cancelled.set()
+            raise
+
+    async def run_callback(controller: RunController):
+        controller.add_stream(substream())
+
+    stream = create_run(run_callback)
+    assert (await anext(stream)).text_delta == "a"
+    await stream.aclose()
+
+    assert substream_cancelled.is_set()
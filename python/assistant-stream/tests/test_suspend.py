@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+
+from assistant_stream import RunController, RunRegistry, create_run
+from assistant_stream.chunk_log import iter_chunk_log
+
+
+async def frontend_tool_run(controller: RunController):
+    tool_call = await controller.add_tool_call("confirm", "call_1")
+    tool_call.append_args_text('{"question": "Proceed?"}')
+    result = await controller.suspend_for_tool_result("call_1")
+    tool_call.set_response(result)
+    controller.append_text(f"User said {result}")
+
+
+@pytest.mark.anyio
+async def test_suspended_run_resumes_in_place():
+    registry = RunRegistry()
+
+    first = [
+        chunk.type
+        async for chunk in create_run(frontend_tool_run, registry=registry, run_id="run_1")
+    ]
+    assert first == ["tool-call-begin", "tool-call-delta"]
+    assert registry.get("run_1").suspended_for == "call_1"
+
+    rest = [chunk async for chunk in registry.resume("run_1", "call_1", "yes")]
+
+    by_type = {chunk.type: chunk for chunk in rest}
+    assert len(rest) == 2
+    assert by_type["tool-result"].result == "yes"
+    assert by_type["text-delta"].text_delta == "User said yes"
+    await asyncio.sleep(0)
+    assert "run_1" not in registry
+
+
+@pytest.mark.anyio
+async def test_chunk_log_covers_resumed_stream(tmp_path):
+    registry = RunRegistry()
+    path = tmp_path / "run.log"
+
+    first = [
+        chunk
+        async for chunk in create_run(
+            frontend_tool_run, registry=registry, run_id="run_1", chunk_log=path
+        )
+    ]
+    rest = [chunk async for chunk in registry.resume("run_1", "call_1", "yes")]
+
+    assert [record.chunk for record in iter_chunk_log(path)] == first + rest
+
+
+@pytest.mark.anyio
+async def test_registry_suspend_timeout_expires_abandoned_runs():
+    registry = RunRegistry(suspend_timeout=0.01)
+
+    [chunk async for chunk in create_run(frontend_tool_run, registry=registry, run_id="run_1")]
+    assert "run_1" in registry
+
+    for _ in range(100):
+        if "run_1" not in registry:
+            break
+        await asyncio.sleep(0.01)
+    assert "run_1" not in registry
+
+
+@pytest.mark.anyio
+async def test_resume_rejects_unknown_runs_and_tool_calls():
+    registry = RunRegistry()
+    [chunk async for chunk in create_run(frontend_tool_run, registry=registry, run_id="run_1")]
+
+    with pytest.raises(KeyError):
+        registry.resume("missing", "call_1", "yes")
+    with pytest.raises(ValueError):
+        registry.resume("run_1", "call_2", "yes")
+
+    registry.cancel("run_1")
+
+
+@pytest.mark.anyio
+async def test_suspend_timeout_cancels_run():
+    registry = RunRegistry()
+    cancelled = asyncio.Event()
+
+    async def run_callback(controller: RunController):
+        try:
+            await controller.suspend_for_tool_result("call_1", timeout=0.01)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    [chunk async for chunk in create_run(run_callback, registry=registry, run_id="run_1")]
+
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+    await asyncio.sleep(0)
+    assert "run_1" not in registry
+
+
+@pytest.mark.anyio
+async def test_suspend_requires_registry():
+    async def run_callback(controller: RunController):
+        await controller.suspend_for_tool_result("call_1")
+
+    chunk_types = []
+    with pytest.raises(RuntimeError):
+        async for chunk in create_run(run_callback):
+            chunk_types.append(chunk.type)
+    assert chunk_types == ["error"]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("handle", ["parent_id", "child"])
+async def test_suspend_through_derived_handle(handle):
+    registry = RunRegistry()
+
+    async def suspend(controller: RunController):
+        result = await controller.suspend_for_tool_result("call_1")
+        controller.append_text(f"User said {result}")
+
+    async def run_callback(controller: RunController):
+        if handle == "parent_id":
+            await suspend(controller.with_parent_id("agent"))
+        else:
+            await controller.spawn_child(suspend, parent_id="agent")
+
+    first = [
+        chunk
+        async for chunk in create_run(run_callback, registry=registry, run_id="run_1")
+    ]
+    assert first == []
+    assert registry.get("run_1").suspended_for == "call_1"
+
+    rest = [chunk async for chunk in registry.resume("run_1", "call_1", "yes")]
+
+    assert [chunk.text_delta for chunk in rest] == ["User said yes"]
+    assert rest[0].parent_id == "agent"
+    await asyncio.sleep(0)
+    assert "run_1" not in registry
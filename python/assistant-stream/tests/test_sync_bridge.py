@@ -0,0 +1,55 @@
+import asyncio
+import threading
+
+from assistant_stream import RunController
+from assistant_stream.sync_bridge import create_run_sync, get_background_loop
+
+
+def test_sync_iterator_yields_encoded_bytes():
+    async def run_callback(controller: RunController):
+        controller.append_text("Hello")
+        await asyncio.sleep(0.01)
+        controller.append_text(" world")
+
+    body = create_run_sync(run_callback)
+
+    assert body.media_type == "text/plain"
+    assert list(body) == [b'0:"Hello"\n', b'0:" world"\n']
+
+
+def test_concurrent_requests_share_one_loop():
+    loops = []
+
+    async def run_callback(controller: RunController):
+        loops.append(asyncio.get_running_loop())
+        controller.append_text("a")
+
+    results = []
+
+    def request():
+        results.append(list(create_run_sync(run_callback)))
+
+    threads = [threading.Thread(target=request) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [[b'0:"a"\n']] * 4
+    assert all(loop is get_background_loop() for loop in loops)
+
+
+def test_close_cancels_run():
+    cancelled = threading.Event()
+
+    async def run_callback(controller: RunController):
+        controller.append_text("a")
+        await controller.cancelled_event.wait()
+        cancelled.set()
+
+    body = create_run_sync(run_callback)
+    assert next(body) == b'0:"a"\n'
+    body.close()
+
+    assert cancelled.wait(timeout=1)
+    assert list(body) == []
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from assistant_stream import RunController, create_run
+
+
+@pytest.mark.anyio
+async def test_loop_thread_emits_skip_call_soon_threadsafe(monkeypatch):
+    loop = asyncio.get_running_loop()
+    calls: list[object] = []
+    original = loop.call_soon_threadsafe
+
+    def counting_call_soon_threadsafe(callback, *args, **kwargs):
+        calls.append(callback)
+        return original(callback, *args, **kwargs)
+
+    monkeypatch.setattr(loop, "call_soon_threadsafe", counting_call_soon_threadsafe)
+
+    async def run_callback(controller: RunController):
+        controller.append_text("a")
+        controller.append_reasoning("b")
+        controller.state["value"] = 1
+        tool = await controller.add_tool_call("tool", "call_1")
+        tool.append_args_text("{}")
+        tool.set_response("ok")
+
+    chunks = [chunk async for chunk in create_run(run_callback, state={})]
+
+    assert [chunk.type for chunk in chunks] == [
+        "text-delta",
+        "reasoning-delta",
+        "update-state",
+        "tool-call-begin",
+        "tool-call-delta",
+        "tool-result",
+    ]
+    assert calls == []
+
+
+@pytest.mark.anyio
+async def test_controller_emits_from_worker_thread():
+    async def run_callback(controller: RunController):
+        def produce():
+            for i in range(5):
+                controller.append_text(str(i))
+
+        await asyncio.to_thread(produce)
+
+    chunks = [chunk async for chunk in create_run(run_callback)]
+
+    assert [chunk.text_delta for chunk in chunks] == ["0", "1", "2", "3", "4"]
+
+
+@pytest.mark.anyio
+async def test_derived_handle_emits_from_worker_thread():
+    async def run_callback(controller: RunController):
+        await asyncio.to_thread(controller.with_parent_id("p1").append_text, "x")
+
+    chunks = [chunk async for chunk in create_run(run_callback)]
+
+    assert [(chunk.parent_id, chunk.text_delta) for chunk in chunks] == [("p1", "x")]
@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from assistant_stream import RunController, RunOptions, RunTimeoutError, create_run
+
+
+@pytest.mark.anyio
+async def test_deadline_emits_error_and_cancels_callback():
+    observed: dict[str, object] = {}
+
+    async def run_callback(controller: RunController):
+        controller.append_text("start")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            observed["is_cancelled"] = controller.is_cancelled
+            raise
+
+    chunks = []
+    with pytest.raises(RunTimeoutError, match="deadline"):
+        async for chunk in create_run(run_callback, deadline=0.05):
+            chunks.append(chunk)
+
+    assert [chunk.type for chunk in chunks] == ["text-delta", "error"]
+    assert "deadline of 0.05s" in chunks[-1].error
+    assert observed["is_cancelled"] is True
+
+
+@pytest.mark.anyio
+async def test_deadline_allows_cooperative_exit():
+    callback_done = asyncio.Event()
+
+    async def run_callback(controller: RunController):
+        await controller.cancelled_event.wait()
+        callback_done.set()
+
+    with pytest.raises(RunTimeoutError):
+        async for _ in create_run(run_callback, deadline=0.01):
+            pass
+
+    assert callback_done.is_set()
+
+
+@pytest.mark.anyio
+async def test_idle_timeout_resets_on_activity():
+    async def run_callback(controller: RunController):
+        for i in range(5):
+            controller.append_text(str(i))
+            await asyncio.sleep(0.02)
+        await asyncio.sleep(10)
+
+    chunks = []
+    with pytest.raises(RunTimeoutError, match="idle"):
+        async for chunk in create_run(run_callback, idle_timeout=0.06):
+            chunks.append(chunk)
+
+    assert [chunk.type for chunk in chunks] == ["text-delta"] * 5 + ["error"]
+
+
+@pytest.mark.anyio
+async def test_timeouts_do_not_affect_fast_runs():
+    async def run_callback(controller: RunController):
+        controller.append_text("done")
+
+    chunks = [
+        chunk
+        async for chunk in create_run(run_callback, deadline=1, idle_timeout=1)
+    ]
+
+    assert [chunk.type for chunk in chunks] == ["text-delta"]
+
+
+@pytest.mark.anyio
+async def test_deadline_delivers_buffered_chunks_first():
+    async def run_callback(controller: RunController):
+        for i in range(5):
+            controller.append_text(str(i))
+        await asyncio.sleep(10)
+
+    chunks = []
+    with pytest.raises(RunTimeoutError, match="deadline"):
+        async for chunk in create_run(run_callback, deadline=0.02):
+            chunks.append(chunk)
+            await asyncio.sleep(0.02)
+
+    assert [chunk.type for chunk in chunks] == ["text-delta"] * 5 + ["error"]
+
+
+@pytest.mark.anyio
+async def test_keyword_options_override_run_options():
+    async def run_callback(controller: RunController):
+        await asyncio.sleep(10)
+
+    options = RunOptions(deadline=10, idle_timeout=0.02)
+    with pytest.raises(RunTimeoutError, match="deadline"):
+        async for _ in create_run(
+            run_callback, options=options, deadline=0.01, idle_timeout=None
+        ):
+            pass
+
+    with pytest.raises(TypeError):
+        async for _ in create_run(run_callback, options=options, dedline=0.01):
+            pass